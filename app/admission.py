@@ -0,0 +1,360 @@
+"""
+VIBE CODER - ADMISSION CONTROL
+Nothing limited concurrency: two /agent calls on one thread_id ran the graph twice at once (racing
+on checkpoint writes and on the workspace files), and a burst of users could drain the Vertex AI
+quota for everyone.
+
+Runs (`RunScheduler`, applied by the app/server.py middleware in front of the LangServe routes):
+- Runs on the same thread_id are serialized, first come first served.
+- A run waits for its thread's turn before it queues for one of `max_running` global slots, so one
+  chatty thread never holds more than one slot or one place in the global queue.
+- Fast 503 (`Overloaded`, with a Retry-After estimate) instead of queueing without bound: when the
+  thread already has `max_per_thread` runs waiting, when `max_queued` runs are waiting overall, or
+  when a run has waited `queue_timeout` seconds.
+
+LLM calls (`ModelGate`, one per model name, used by the chat models in app/chain.py):
+- a token bucket (`rpm` requests per minute, bursts of `burst`) plus a cap on in-flight calls,
+- 429 RESOURCE_EXHAUSTED (and 503 UNAVAILABLE, 409 ABORTED, 504 DEADLINE_EXCEEDED) retried with
+  exponential backoff and full jitter, so throttled callers don't all come back at the same moment.
+
+Limits are per process (per Cloud Run instance). Stats go to /metrics.
+ADMISSION_MAX_RUNNING (8), ADMISSION_MAX_QUEUED (32), ADMISSION_MAX_PER_THREAD (2),
+ADMISSION_QUEUE_TIMEOUT (30 s). LLM_PRO_RPM / LLM_PRO_BURST / LLM_PRO_CONCURRENCY (60 / 10 / 8) and
+LLM_FLASH_* (300 / 30 / 32); 0 turns a limit off. LLM_MAX_RETRIES (4).
+"""
+
+import asyncio
+import os
+import random
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional
+
+from app.slots import Slots
+
+RETRYABLE_CODES = (409, 429, 503, 504)
+RETRYABLE_NAMES = ("ResourceExhausted", "TooManyRequests", "ServiceUnavailable", "Aborted", "DeadlineExceeded")
+
+
+class Overloaded(Exception):
+    """Raised instead of queueing a run; the server answers 503 with `retry_after`."""
+
+    def __init__(self, reason: str, retry_after: int = 1):
+        super().__init__(f"Server busy ({reason}), retry in {retry_after}s")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+# --- RUNS ---
+class Ticket:
+    """An admitted run's thread turn + global slot; `release()` is idempotent."""
+
+    def __init__(self, scheduler: "RunScheduler", thread_id: Optional[str]):
+        self.scheduler = scheduler
+        self.thread_id = thread_id
+        self.holds_thread = False
+        self.holds_slot = False
+        self.started: Optional[float] = None
+        self._released = False
+
+    def release(self) -> None:
+        if not self._released:
+            self._released = True
+            self.scheduler._release(self)
+
+
+class RunScheduler:
+    def __init__(self, max_running: int = 8, max_queued: int = 32, max_per_thread: int = 2, queue_timeout: float = 30.0):
+        self.max_running = max(1, max_running)
+        self.max_queued = max(0, max_queued)
+        self.max_per_thread = max(0, max_per_thread)
+        self.queue_timeout = queue_timeout
+        self._slots = asyncio.Semaphore(self.max_running)
+        self._threads: Dict[str, List[Any]] = {}  # thread_id -> [asyncio.Lock, runs holding or waiting]
+        self._waiting = 0
+        self._running = 0
+        self._avg_run = 1.0
+        self.counters = {"admitted": 0, "completed": 0, "shed_queue_full": 0, "shed_thread_busy": 0, "shed_timeout": 0}
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def _retry_after(self) -> int:
+        return max(1, round(self._avg_run * (self._waiting + 1) / self.max_running))
+
+    def _shed(self, reason: str) -> Overloaded:
+        self.counters[f"shed_{reason.replace(' ', '_')}"] += 1
+        return Overloaded(reason, self._retry_after())
+
+    async def acquire(self, thread_id: Optional[str]) -> Ticket:
+        """Waits for the thread's turn and a global slot, or raises Overloaded."""
+        if self._running >= self.max_running and self._waiting >= self.max_queued:
+            raise self._shed("queue full")
+        entry = None
+        if thread_id is not None:
+            entry = self._threads.setdefault(thread_id, [asyncio.Lock(), 0])
+            if entry[1] > self.max_per_thread:  # one running + max_per_thread waiting
+                raise self._shed("thread busy")
+            entry[1] += 1
+        ticket = Ticket(self, thread_id)
+        self._waiting += 1
+        start = time.monotonic()
+        try:
+            async with asyncio.timeout(self.queue_timeout):
+                if entry is not None:
+                    await entry[0].acquire()
+                    ticket.holds_thread = True
+                await self._slots.acquire()
+                ticket.holds_slot = True
+        except TimeoutError:
+            ticket.release()
+            raise self._shed("timeout")
+        except BaseException:
+            ticket.release()
+            raise
+        finally:
+            self._waiting -= 1
+        waited = time.monotonic() - start
+        self.wait_seconds += waited
+        self.max_wait_seconds = max(self.max_wait_seconds, waited)
+        self.counters["admitted"] += 1
+        self._running += 1
+        ticket.started = time.monotonic()
+        return ticket
+
+    def _release(self, ticket: Ticket) -> None:
+        if ticket.started is not None:
+            self._running -= 1
+            self.counters["completed"] += 1
+            self._avg_run = 0.8 * self._avg_run + 0.2 * (time.monotonic() - ticket.started)
+        if ticket.holds_slot:
+            self._slots.release()
+        if ticket.thread_id is not None:
+            entry = self._threads[ticket.thread_id]
+            if ticket.holds_thread:
+                entry[0].release()
+            entry[1] -= 1
+            if entry[1] == 0:
+                del self._threads[ticket.thread_id]
+
+    @asynccontextmanager
+    async def admit(self, thread_id: Optional[str]) -> AsyncIterator[Ticket]:
+        ticket = await self.acquire(thread_id)
+        try:
+            yield ticket
+        finally:
+            ticket.release()
+
+    def stats(self) -> Dict[str, Any]:
+        counters = dict(self.counters)
+        counters.update({
+            "running": self._running, "queued": self._waiting, "threads": len(self._threads),
+            "avg_wait_seconds": self.wait_seconds / counters["admitted"] if counters["admitted"] else 0.0,
+            "max_wait_seconds": self.max_wait_seconds, "avg_run_seconds": self._avg_run,
+        })
+        return counters
+
+
+# --- LLM CALLS ---
+class TokenBucket:
+    """Reservation-style bucket: each caller takes a token now and is told how long to sleep for it."""
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate  # tokens per second; 0 = unlimited
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+
+def is_retryable(error: BaseException) -> bool:
+    """429 / 503 / 409 (Aborted) / 504 (DeadlineExceeded) from Vertex AI; google.api_core
+    exceptions carry the HTTP status as `code`."""
+    return getattr(error, "code", None) in RETRYABLE_CODES or type(error).__name__ in RETRYABLE_NAMES
+
+
+class ModelGate:
+    def __init__(self, model: str, rpm: float = 0, burst: int = 1, concurrency: int = 0, max_retries: int = 4,
+                 base_delay: float = 1.0, max_delay: float = 20.0):
+        self.model = model
+        self.bucket = TokenBucket(rpm / 60.0, burst)
+        self.concurrency = concurrency
+        self._slots = Slots(concurrency) if concurrency > 0 else None
+        self.max_retries = max(0, max_retries)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._lock = threading.Lock()
+        self.counters = {"calls": 0, "retries": 0, "rate_limited": 0, "failures": 0, "in_flight": 0}
+        self.wait_seconds = 0.0
+
+    def _backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def _count(self, key: str, value: float = 1) -> None:
+        with self._lock:
+            self.counters[key] += value
+
+    def _failed(self, error: BaseException, attempt: int) -> bool:
+        """Records a failed attempt; True if it should be retried."""
+        if not is_retryable(error):
+            self._count("failures")
+            return False
+        self._count("rate_limited")
+        if attempt >= self.max_retries:
+            self._count("failures")
+            return False
+        self._count("retries")
+        return True
+
+    # Sync: the worker threads LangGraph runs sync nodes on.
+    def _enter(self) -> None:
+        start = time.monotonic()
+        delay = self.bucket.reserve()
+        if delay:
+            time.sleep(delay)
+        if self._slots is not None:
+            self._slots.acquire()
+        self._entered(start)
+
+    # Async: awaits a slot without blocking the event loop or a thread (cancellation never leaks a slot).
+    async def _aenter(self) -> None:
+        start = time.monotonic()
+        delay = self.bucket.reserve()
+        if delay:
+            await asyncio.sleep(delay)
+        if self._slots is not None:
+            await self._slots.aacquire()
+        self._entered(start)
+
+    def _entered(self, start: float) -> None:
+        with self._lock:
+            self.counters["calls"] += 1
+            self.counters["in_flight"] += 1
+            self.wait_seconds += time.monotonic() - start
+
+    def _exit(self) -> None:
+        self._count("in_flight", -1)
+        if self._slots is not None:
+            self._slots.release()
+
+    def call(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        for attempt in range(self.max_retries + 1):
+            self._enter()
+            try:
+                return func(*args, **kwargs)
+            except Exception as e:
+                if not self._failed(e, attempt):
+                    raise
+            finally:
+                self._exit()
+            time.sleep(self._backoff(attempt))
+
+    async def acall(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        for attempt in range(self.max_retries + 1):
+            await self._aenter()
+            try:
+                return await func(*args, **kwargs)
+            except Exception as e:
+                if not self._failed(e, attempt):
+                    raise
+            finally:
+                self._exit()
+            await asyncio.sleep(self._backoff(attempt))
+
+    def stream(self, func: Callable[..., Iterator[Any]], *args: Any, **kwargs: Any) -> Iterator[Any]:
+        """Holds a slot for the whole stream; only retries if nothing was yielded yet."""
+        for attempt in range(self.max_retries + 1):
+            self._enter()
+            started = False
+            try:
+                for chunk in func(*args, **kwargs):
+                    started = True
+                    yield chunk
+                return
+            except Exception as e:
+                if started or not self._failed(e, attempt):
+                    raise
+            finally:
+                self._exit()
+            time.sleep(self._backoff(attempt))
+
+    async def astream(self, func: Callable[..., AsyncIterator[Any]], *args: Any, **kwargs: Any) -> AsyncIterator[Any]:
+        for attempt in range(self.max_retries + 1):
+            await self._aenter()
+            started = False
+            try:
+                async for chunk in func(*args, **kwargs):
+                    started = True
+                    yield chunk
+                return
+            except Exception as e:
+                if started or not self._failed(e, attempt):
+                    raise
+            finally:
+                self._exit()
+            await asyncio.sleep(self._backoff(attempt))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self.counters)
+            wait = self.wait_seconds
+        counters["avg_wait_seconds"] = wait / counters["calls"] if counters["calls"] else 0.0
+        return counters
+
+
+# --- PROCESS-WIDE INSTANCES ---
+MODEL_DEFAULTS = {"PRO": (60, 10, 8), "FLASH": (300, 30, 32)}  # rpm, burst, concurrency
+
+_scheduler: Optional[RunScheduler] = None
+_gates: Dict[str, ModelGate] = {}
+_lock = threading.Lock()
+
+
+def _model_key(model: str) -> str:
+    for key in MODEL_DEFAULTS:
+        if key.lower() in model.lower():
+            return key
+    return "FLASH"
+
+
+def get_run_scheduler() -> RunScheduler:
+    global _scheduler
+    if _scheduler is None:
+        with _lock:
+            if _scheduler is None:
+                _scheduler = RunScheduler(
+                    max_running=int(os.environ.get("ADMISSION_MAX_RUNNING", "8")),
+                    max_queued=int(os.environ.get("ADMISSION_MAX_QUEUED", "32")),
+                    max_per_thread=int(os.environ.get("ADMISSION_MAX_PER_THREAD", "2")),
+                    queue_timeout=float(os.environ.get("ADMISSION_QUEUE_TIMEOUT", "30")),
+                )
+    return _scheduler
+
+
+def gate_for(model: str) -> ModelGate:
+    """The shared gate for a model name (limits from LLM_PRO_* / LLM_FLASH_*)."""
+    gate = _gates.get(model)
+    if gate is None:
+        with _lock:
+            gate = _gates.get(model)
+            if gate is None:
+                key = _model_key(model)
+                rpm, burst, concurrency = MODEL_DEFAULTS[key]
+                gate = _gates[model] = ModelGate(
+                    model,
+                    rpm=float(os.environ.get(f"LLM_{key}_RPM", rpm)),
+                    burst=int(os.environ.get(f"LLM_{key}_BURST", burst)),
+                    concurrency=int(os.environ.get(f"LLM_{key}_CONCURRENCY", concurrency)),
+                    max_retries=int(os.environ.get("LLM_MAX_RETRIES", "4")),
+                )
+    return gate
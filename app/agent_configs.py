@@ -0,0 +1,135 @@
+"""
+VIBE CODER - AGENT CONFIG REGISTRY
+Replaces the three blocking `agent_configs` reads that used to run at import time of app.chain.
+
+- Startup: load the on-disk snapshot if there is one (no network), otherwise one batched `get_all`.
+- Background: a Firestore snapshot listener on `agent_configs` pushes edits (e.g. from
+  update_pm_strict.py / update_architect.py) to subscribers, which rebuild their runnables in place.
+- Every change is written back to the snapshot, so the next start of the same process
+  environment (a dev machine, a warm container restart) skips Firestore. The snapshot lives in a
+  cache dir, never in the source tree: AGENT_CONFIG_SNAPSHOT, default
+  <tempdir>/vibe-coder/agent_configs.snapshot.json.
+- Production cold starts always read from Firestore (one get_all instead of three gets): a new
+  Cloud Run instance starts with an empty tempdir, and the Dockerfile bakes no snapshot in, since
+  the image build has no Firestore credentials. To ship one, point AGENT_CONFIG_SNAPSHOT at a path
+  in the image and run `python -m app.agent_configs` in a build that can reach Firestore.
+"""
+
+import json
+import os
+import tempfile
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from google.cloud import firestore
+
+COLLECTION_NAME = "agent_configs"
+DEFAULT_CONFIG = {"system_prompt": "You are a helpful AI assistant."}
+SNAPSHOT_PATH = os.environ.get("AGENT_CONFIG_SNAPSHOT") or os.path.join(tempfile.gettempdir(), "vibe-coder", "agent_configs.snapshot.json")
+
+
+class AgentConfigRegistry:
+    def __init__(self, client: firestore.Client, agent_ids: Iterable[str], *, snapshot_path: Optional[str] = SNAPSHOT_PATH, collection: str = COLLECTION_NAME):
+        self.client = client
+        self.agent_ids = list(agent_ids)
+        self.snapshot_path = snapshot_path
+        self.collection = collection
+        self._configs: Dict[str, Dict[str, Any]] = {}
+        self._listeners: List[Callable[[str, Dict[str, Any]], None]] = []
+        self._watch = None
+        self._lock = threading.Lock()
+        self.source = None
+
+    # --- LOADING ---
+    def load(self) -> "AgentConfigRegistry":
+        """Fills the registry from the disk snapshot, falling back to Firestore."""
+        snapshot = self._read_snapshot()
+        if snapshot is not None and all(agent_id in snapshot for agent_id in self.agent_ids):
+            self._configs = snapshot
+            self.source = "snapshot"
+        else:
+            self.refresh()
+        return self
+
+    def refresh(self) -> None:
+        """Fetches every config in one batched read."""
+        refs = [self.client.collection(self.collection).document(agent_id) for agent_id in self.agent_ids]
+        fetched = {snap.id: snap.to_dict() for snap in self.client.get_all(refs) if snap.exists}
+        with self._lock:
+            self._configs = {agent_id: fetched.get(agent_id, dict(DEFAULT_CONFIG)) for agent_id in self.agent_ids}
+        self.source = "firestore"
+        self._write_snapshot()
+
+    def get(self, agent_id: str) -> Dict[str, Any]:
+        with self._lock:
+            return self._configs.get(agent_id, dict(DEFAULT_CONFIG))
+
+    # --- HOT RELOAD ---
+    def subscribe(self, listener: Callable[[str, Dict[str, Any]], None]) -> None:
+        """`listener(agent_id, config)` runs (on the listener thread) whenever a config changes."""
+        self._listeners.append(listener)
+
+    def watch(self) -> None:
+        """Starts the background snapshot listener. Its first delivery also corrects a stale disk snapshot."""
+        if self._watch is None:
+            self._watch = self.client.collection(self.collection).on_snapshot(self._on_snapshot)
+
+    def stop(self) -> None:
+        if self._watch is not None:
+            self._watch.unsubscribe()
+            self._watch = None
+
+    def _on_snapshot(self, docs, changes, read_time) -> None:
+        changed = []
+        for change in changes:
+            doc = change.document
+            if doc.id not in self.agent_ids:
+                continue
+            config = doc.to_dict() if change.type.name != "REMOVED" else dict(DEFAULT_CONFIG)
+            with self._lock:
+                if self._configs.get(doc.id) == config:
+                    continue
+                self._configs[doc.id] = config
+            changed.append((doc.id, config))
+        if not changed:
+            return
+        self._write_snapshot()
+        for agent_id, config in changed:
+            print(f"--- AGENT CONFIG RELOADED: {agent_id} ---")
+            for listener in self._listeners:
+                try:
+                    listener(agent_id, config)
+                except Exception as e:
+                    print(f"--- AGENT CONFIG RELOAD FAILED ({agent_id}): {e} ---")
+
+    # --- DISK SNAPSHOT ---
+    def _read_snapshot(self) -> Optional[Dict[str, Dict[str, Any]]]:
+        if not self.snapshot_path or not os.path.exists(self.snapshot_path):
+            return None
+        try:
+            with open(self.snapshot_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_snapshot(self) -> None:
+        if not self.snapshot_path:
+            return
+        with self._lock:
+            data = dict(self._configs)
+        tmp_path = f"{self.snapshot_path}.tmp"
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.snapshot_path)), exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, default=str)
+            os.replace(tmp_path, self.snapshot_path)
+        except OSError as e:
+            print(f"--- AGENT CONFIG SNAPSHOT NOT WRITTEN: {e} ---")
+
+
+if __name__ == "__main__":
+    # Refresh the snapshot from Firestore (run before a deploy to bake it into the image).
+    import sys
+    registry = AgentConfigRegistry(firestore.Client(project=os.environ.get("GCP_PROJECT", "vibe-agent-final")), sys.argv[1:] or ["project_manager", "technical_architect", "head_of_frontend"])
+    registry.refresh()
+    print(f"✅ Wrote {len(registry.agent_ids)} agent configs to {registry.snapshot_path}")
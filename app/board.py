@@ -0,0 +1,162 @@
+"""
+VIBE CODER - PROJECT BOARD WRITE-BEHIND
+`update_board` used to do a blocking Firestore `set(merge=True)` inside the agent's ReAct loop,
+often several times in a row for the same thread.
+
+- `submit()` merges the update into a per-thread pending dict and returns immediately.
+- A background flusher writes each thread's merged update once its `window` has passed, in
+  Firestore batches (up to 500 docs) across threads.
+- `flush(thread_id)` writes synchronously; the graph calls it when a run ends so the final board
+  state is on Firestore before the response goes out. Also flushed at process exit.
+- `stats()` reports submitted updates, docs written, writes saved and estimated tool latency removed.
+
+BOARD_WRITE_WINDOW (seconds, default 1.0); 0 writes through synchronously as before.
+"""
+
+import atexit
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.clients import get_db
+
+BATCH_LIMIT = 500
+
+
+class BoardWriter:
+    def __init__(self, client_factory=get_db, collection: str = "project_boards", window: float = 1.0):
+        self.client_factory = client_factory
+        self.collection = collection
+        self.window = window
+        self._pending: Dict[str, Tuple[float, Dict[str, Any]]] = {}  # thread_id -> (first queued at, merged fields)
+        self._cond = threading.Condition()
+        # Held from taking entries until they are committed, so an older merge never lands after a newer one.
+        self._commit_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+        self.counters = {"submitted": 0, "docs_written": 0, "commits": 0, "failures": 0}
+        self.submit_seconds = 0.0
+        self.commit_seconds = 0.0
+
+    # --- PRODUCER ---
+    def submit(self, thread_id: str, fields: Dict[str, Any]) -> None:
+        start = time.perf_counter()
+        if self.window <= 0 or self._closed:
+            self._write([(thread_id, fields)], requeue=False)
+            with self._cond:
+                self.counters["submitted"] += 1
+                self.submit_seconds += time.perf_counter() - start
+            return
+        with self._cond:
+            queued_at, merged = self._pending.get(thread_id, (time.monotonic(), {}))
+            self._pending[thread_id] = (queued_at, {**merged, **fields})
+            self.counters["submitted"] += 1
+            self._ensure_thread()
+            self._cond.notify()
+            self.submit_seconds += time.perf_counter() - start
+
+    def _ensure_thread(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="board-writer", daemon=True)
+            self._thread.start()
+
+    # --- FLUSHING ---
+    def _take(self, thread_id: Optional[str] = None, due_only: bool = False) -> List[Tuple[str, Dict[str, Any]]]:
+        """Pops pending entries (caller holds self._cond)."""
+        now = time.monotonic()
+        keys = [
+            key for key, (queued_at, _) in self._pending.items()
+            if (thread_id is None or key == thread_id) and (not due_only or now - queued_at >= self.window)
+        ]
+        return [(key, self._pending.pop(key)[1]) for key in keys]
+
+    def _write(self, entries: List[Tuple[str, Dict[str, Any]]], requeue: bool = True) -> None:
+        if not entries:
+            return
+        db = self.client_factory()
+        collection = db.collection(self.collection)
+        for i in range(0, len(entries), BATCH_LIMIT):
+            chunk = entries[i:i + BATCH_LIMIT]
+            start = time.perf_counter()
+            try:
+                batch = db.batch()
+                for thread_id, fields in chunk:
+                    batch.set(collection.document(thread_id), fields, merge=True)
+                batch.commit()
+            except Exception as e:
+                if not requeue:
+                    raise
+                print(f"Board write failed for {len(chunk)} thread(s): {e}")
+                with self._cond:
+                    self.counters["failures"] += 1
+                    # Re-queue under anything newer that arrived meanwhile; retried one window later.
+                    for thread_id, fields in chunk:
+                        merged = self._pending.get(thread_id, (0.0, {}))[1]
+                        self._pending[thread_id] = (time.monotonic(), {**fields, **merged})
+                continue
+            with self._cond:
+                self.counters["commits"] += 1
+                self.counters["docs_written"] += len(chunk)
+                self.commit_seconds += time.perf_counter() - start
+
+    def flush(self, thread_id: Optional[str] = None) -> int:
+        """Writes what is pending for `thread_id` (all threads if None) now. Returns the docs written."""
+        with self._commit_lock:
+            with self._cond:
+                entries = self._take(thread_id)
+            self._write(entries)
+        return len(entries)
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if self._closed and not self._pending:
+                    return
+                oldest = min(queued_at for queued_at, _ in self._pending.values())
+                delay = oldest + self.window - time.monotonic()
+                if delay > 0 and not self._closed:
+                    self._cond.wait(delay)
+                    continue
+            with self._commit_lock:
+                with self._cond:
+                    entries = self._take(due_only=not self._closed)
+                self._write(entries)
+            if self._closed:
+                return  # close() flushes whatever is left
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self.flush()
+
+    # --- METRICS ---
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            counters = dict(self.counters)
+            counters["pending"] = len(self._pending)
+            submit_seconds, commit_seconds = self.submit_seconds, self.commit_seconds
+        avg_commit = commit_seconds / counters["commits"] if counters["commits"] else 0.0
+        counters["writes_saved"] = max(0, counters["submitted"] - counters["docs_written"] - counters["pending"])
+        counters["avg_commit_seconds"] = avg_commit
+        # Without the buffer every submit would have waited for one round trip like a commit.
+        counters["estimated_tool_seconds_removed"] = max(0.0, counters["submitted"] * avg_commit - submit_seconds)
+        return counters
+
+
+_writer: Optional[BoardWriter] = None
+_writer_lock = threading.Lock()
+
+
+def get_board_writer() -> BoardWriter:
+    """The process-wide board writer, created on first use."""
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = BoardWriter(window=float(os.environ.get("BOARD_WRITE_WINDOW", "1.0")))
+                atexit.register(_writer.close)
+    return _writer
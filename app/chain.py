@@ -2,52 +2,83 @@
 VIBE CODER - BACKEND BRAIN (v30.0 - Gemini Adapter)
 Updated: 2025-12-06
 Features:
-- GeminiToolAdapter: Automatically converts ToolMessages to HumanMessages before API call.
+- GeminiToolAdapter: Automatically converts ToolMessages to HumanMessages before API call (sync + async).
+- Native async nodes: the request path under LangServe never blocks a worker thread on an LLM call.
+- Token streaming: worker tokens and tool calls reach /agent/stream as they happen, tagged by node.
+- Agent config registry: prompts load in one batched read (or a local snapshot) and hot-reload from Firestore (app/agent_configs.py).
 - Re-enabled create_react_agent (now safe to use).
-- Custom Engine (Memory Solved).
+- Custom Engine (Memory Solved), now in app/checkpointer.py with delta checkpoints.
+- History budget: old worker reports reach the supervisor as cached Flash summaries (app/history.py).
+- Fast-path router: rule-based routing for obvious hops before the Pro model (app/router.py).
+- Response cache: optional exact + similarity LLM cache for Flash and Pro (app/response_cache.py).
+- Lazy startup: the HTTP app lives in app/server.py and imports this module on first use.
+- Batch edits: workers get write_files and apply_patch (atomic, temp file + rename; app/file_ops.py).
+- Board writes: update_board is write-behind and coalesced, flushed when a run ends (app/board.py).
+- Parallel delegation: delegate_parallel fans independent worker tasks out with Send (app/fanout.py).
+- Metrics: node / LLM / tool / checkpointer latency, tokens and payload sizes on /metrics (app/metrics.py).
+- Admission control: runs serialized per thread, per-model LLM rate limits, 503 when full (app/admission.py).
+- Checkpoint retention: keep-last-N + daily snapshots, superseded checkpoints pruned in batches (app/retention.py).
 """
 
+import asyncio
 import os
-import uuid
 import time
-import asyncio
-from google.cloud import firestore
-from fastapi import FastAPI
-from fastapi.middleware.cors import CORSMiddleware
-from typing import Optional, Any, Dict, AsyncIterator, Sequence, List
+from typing import Optional, Any, Dict, Sequence, List
 from typing_extensions import TypedDict, Annotated, Literal
 from langchain_core.messages import BaseMessage, HumanMessage, AIMessage, SystemMessage, ToolMessage
 from langgraph.graph.message import add_messages
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+from langchain_core.runnables import RunnableLambda
 from langchain_google_vertexai import ChatVertexAI, HarmBlockThreshold, HarmCategory
 from langgraph.graph import StateGraph, END
+from langgraph.constants import Send
 from langgraph.prebuilt import create_react_agent
-from langserve import add_routes
-from pydantic import BaseModel, Field
-from app.tools import inspector_tools, list_files, read_file, write_file, update_board
-
-from langgraph.checkpoint.base import BaseCheckpointSaver, Checkpoint, CheckpointMetadata, CheckpointTuple
-from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+from app.tools import inspector_tools, list_files, read_file, write_file, write_files, apply_patch, tree, search_code, update_board
+from app.checkpointer import CustomFirestoreSaver, CachedCheckpointSaver
+from app.streaming import node_tag
+from app.agent_configs import AgentConfigRegistry
+from app.board import get_board_writer
+from app.fanout import WorkerLimiter, combine_reports, merge_reports
+from app.clients import chat_model, get_db, PROJECT_ID
+from app.history import HistoryBudget, count_tokens, merge_summaries
+from app.router import PreRouter, RoutingDecision
+from app.response_cache import build_response_cache
+from app.admission import gate_for, get_run_scheduler
+from app.retention import get_compactor
+from app import metrics, startup
 
 # --- 1. INITIALIZATION ---
-db = firestore.Client(project=os.environ.get("GCP_PROJECT", "vibe-agent-final"))
-
-def get_agent_config(agent_id: str):
-    doc = db.collection("agent_configs").document(agent_id).get()
-    if doc.exists: return doc.to_dict()
-    return {"system_prompt": "You are a helpful AI assistant."}
+# Importing this module IS the warm-up (see app/server.py); /health never waits for it.
+db = get_db()
 
-pm_config = get_agent_config("project_manager")
-architect_config = get_agent_config("technical_architect")
-frontend_config = get_agent_config("head_of_frontend")
+# One batched get_all at startup (a disk snapshot if this environment has one); Firestore edits hot-reload the agents below.
+with startup.phase("agent configs"):
+    agent_configs = AgentConfigRegistry(db, ["project_manager", "technical_architect", "head_of_frontend"]).load()
 
 # --- 2. THE ADAPTER (Grok's Fix) ---
-class GeminiToolAdapter(ChatVertexAI):
+class GatedChatVertexAI(ChatVertexAI):
+    """ChatVertexAI behind its model's gate: token bucket, in-flight cap, jittered 429 retries (app/admission.py)."""
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager: Optional[Any] = None, **kwargs: Any):
+        return gate_for(self.model_name).call(super()._generate, messages, stop=stop, run_manager=run_manager, **kwargs)
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager: Optional[Any] = None, **kwargs: Any):
+        return await gate_for(self.model_name).acall(super()._agenerate, messages, stop=stop, run_manager=run_manager, **kwargs)
+
+    def _stream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager: Optional[Any] = None, **kwargs: Any):
+        yield from gate_for(self.model_name).stream(super()._stream, messages, stop=stop, run_manager=run_manager, **kwargs)
+
+    async def _astream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager: Optional[Any] = None, **kwargs: Any):
+        async for chunk in gate_for(self.model_name).astream(super()._astream, messages, stop=stop, run_manager=run_manager, **kwargs):
+            yield chunk
+
+class GeminiToolAdapter(GatedChatVertexAI):
     """
     Wraps ChatVertexAI to sanitize message history before sending to Google.
     Converts strict-breaking ToolMessages into friendly HumanMessages.
     """
-    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager: Optional[Any] = None, **kwargs: Any):
+    @staticmethod
+    def _sanitize(messages: List[BaseMessage]) -> List[BaseMessage]:
         sanitized_messages = []
         for msg in messages:
             if isinstance(msg, ToolMessage):
@@ -59,8 +90,21 @@ class GeminiToolAdapter(ChatVertexAI):
             else:
                 # Fallback for generic BaseMessage
                 sanitized_messages.append(HumanMessage(content=str(msg.content)))
-        
-        return super()._generate(sanitized_messages, stop=stop, run_manager=run_manager, **kwargs)
+        return sanitized_messages
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager: Optional[Any] = None, **kwargs: Any):
+        return super()._generate(self._sanitize(messages), stop=stop, run_manager=run_manager, **kwargs)
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager: Optional[Any] = None, **kwargs: Any):
+        return await super()._agenerate(self._sanitize(messages), stop=stop, run_manager=run_manager, **kwargs)
+
+    # Token streaming (used automatically under astream_events) must sanitize too.
+    def _stream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager: Optional[Any] = None, **kwargs: Any):
+        yield from super()._stream(self._sanitize(messages), stop=stop, run_manager=run_manager, **kwargs)
+
+    async def _astream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager: Optional[Any] = None, **kwargs: Any):
+        async for chunk in super()._astream(self._sanitize(messages), stop=stop, run_manager=run_manager, **kwargs):
+            yield chunk
 
 # --- 3. MODEL SETUP ---
 safety_settings = {
@@ -72,67 +116,115 @@ safety_settings = {
 
 REGION = "us-central1"
 
+# Optional shared response cache (RESPONSE_CACHE=memory | sqlite:<path> | firestore); off by default.
+response_cache = build_response_cache(
+    os.environ.get("RESPONSE_CACHE"),
+    client_factory=get_db,
+    ttl_seconds=float(os.environ.get("RESPONSE_CACHE_TTL", "86400")),
+    similarity=float(os.environ["RESPONSE_CACHE_SIMILARITY"]) if os.environ.get("RESPONSE_CACHE_SIMILARITY") else None,
+)
+
 # Use Adapter for Flash (Workers)
-llm_flash = GeminiToolAdapter(
+llm_flash = chat_model(
+    GeminiToolAdapter,
     model_name="gemini-2.5-flash",
-    project=os.environ.get("GCP_PROJECT", "vibe-agent-final"),
+    project=PROJECT_ID,
     location=REGION,
     temperature=0.1,
     safety_settings=safety_settings,
+    cache=response_cache,
+    callbacks=[metrics.callback_handler],
+    max_retries=1,  # 429s are retried with jitter by the gate instead
 )
 
 # Use Standard for PM (Supervisor handles its own simple history)
-llm_pro = ChatVertexAI(
+llm_pro = chat_model(
+    GatedChatVertexAI,
     model_name="gemini-2.5-pro",
-    project=os.environ.get("GCP_PROJECT", "vibe-agent-final"),
+    project=PROJECT_ID,
     location=REGION,
     temperature=0.5,
     safety_settings=safety_settings,
+    cache=response_cache,
+    callbacks=[metrics.callback_handler],
+    max_retries=1,
 )
 
 # --- 4. AGENTS (Restored create_react_agent) ---
-architect_agent = create_react_agent(
-    llm_flash, 
-    tools=[write_file, read_file, update_board], 
-    state_modifier=architect_config.get("system_prompt")
-)
+def build_architect_agent(config):
+    return create_react_agent(
+        llm_flash, 
+        tools=[write_file, write_files, apply_patch, read_file, tree, search_code, update_board], 
+        state_modifier=config.get("system_prompt")
+    )
 
-frontend_agent = create_react_agent(
-    llm_flash, 
-    tools=[write_file, read_file, list_files], 
-    state_modifier=frontend_config.get("system_prompt")
-)
+def build_frontend_agent(config):
+    return create_react_agent(
+        llm_flash, 
+        tools=[write_file, write_files, apply_patch, read_file, list_files, tree, search_code], 
+        state_modifier=config.get("system_prompt")
+    )
+
+architect_agent = build_architect_agent(agent_configs.get("technical_architect"))
+frontend_agent = build_frontend_agent(agent_configs.get("head_of_frontend"))
 
 # --- 5. SUPERVISOR ---
 class AgentState(TypedDict, total=False):
     messages: Annotated[Sequence[BaseMessage], add_messages]
-    next: Literal["supervisor", "technical_architect", "head_of_frontend", "__end__"]
-
-class RoutingDecision(BaseModel):
-    reasoning: str = Field(description="Brief thought process.")
-    action: Literal["delegate_to_architect", "delegate_to_frontend", "respond_to_user"] = Field(description="Next step.")
-    response_content: str = Field(description="Response text.")
+    next: Literal["supervisor", "technical_architect", "head_of_frontend", "parallel", "__end__"]
+    # Cached summaries of old worker reports, keyed by message id (see app/history.py).
+    summaries: Annotated[Dict[str, str], merge_summaries]
+    # Parallel delegation (see app/fanout.py): the tasks to fan out and the reports they return.
+    # Unset (None) until a thread first delegates in parallel, and cleared again by the join node.
+    delegations: Optional[List[Dict[str, str]]]
+    reports: Annotated[List[Dict[str, str]], merge_reports]
 
 supervisor_router = llm_pro.with_structured_output(RoutingDecision)
-supervisor_prompt = ChatPromptTemplate.from_messages([
-    ("system", pm_config.get("system_prompt")),
-    MessagesPlaceholder(variable_name="messages"),
-])
-supervisor = supervisor_prompt | supervisor_router
 
-def supervisor_node(state: AgentState, config):
-    print(f"--- SUPERVISOR NODE (History: {len(state['messages'])}) ---")
+def build_supervisor(config):
+    supervisor_prompt = ChatPromptTemplate.from_messages([
+        ("system", config.get("system_prompt")),
+        MessagesPlaceholder(variable_name="messages"),
+    ])
+    return (supervisor_prompt | supervisor_router).with_config(tags=[node_tag("supervisor")])
+
+supervisor = build_supervisor(agent_configs.get("project_manager"))
+
+def reload_agent(agent_id: str, config):
+    """Swaps the runnable for `agent_id`; nodes look these globals up on every call."""
+    global supervisor, architect_agent, frontend_agent
+    if agent_id == "project_manager":
+        supervisor = build_supervisor(config)
+    elif agent_id == "technical_architect":
+        architect_agent = build_architect_agent(config)
+    elif agent_id == "head_of_frontend":
+        frontend_agent = build_frontend_agent(config)
+
+agent_configs.subscribe(reload_agent)
+if os.environ.get("AGENT_CONFIG_WATCH", "1") != "0":
+    agent_configs.watch()
+
+# Old worker reports are summarized once by Flash and the prompt is kept under a token budget.
+history_budget = HistoryBudget(
+    llm_flash,
+    max_tokens=int(os.environ.get("SUPERVISOR_HISTORY_TOKENS", "32000")),
+    keep_last=int(os.environ.get("SUPERVISOR_KEEP_LAST", "8")),
+)
+
+def _supervisor_input(state: AgentState, messages: List[BaseMessage]):
+    print(f"--- SUPERVISOR NODE (History: {len(state['messages'])}, Prompt: {len(messages)} msgs / ~{count_tokens(messages)} tokens) ---")
     
     # We still perform basic sanitization for the Supervisor just in case
     # but the Adapter handles the heavy lifting for the workers.
     safe_messages = []
-    for msg in state["messages"]:
+    for msg in messages:
         if isinstance(msg, (HumanMessage, AIMessage, SystemMessage)):
             safe_messages.append(msg)
         else:
             safe_messages.append(HumanMessage(content=str(msg.content)))
+    return {"messages": safe_messages}
 
-    decision: RoutingDecision = supervisor.invoke({"messages": safe_messages})
+def _route(decision: RoutingDecision, config):
     print(f"--- DECISION: {decision.action} ---")
     
     thread_id = config["configurable"].get("thread_id", "unknown")
@@ -145,110 +237,156 @@ def supervisor_node(state: AgentState, config):
         instruction = f"Context Thread ID: {thread_id}. Instruction: {decision.response_content}"
         return {"messages": [HumanMessage(content=instruction, name="Supervisor")], "next": "head_of_frontend"}
     
+    elif decision.action == "delegate_parallel" and decision.delegations:
+        tasks = [
+            {"worker": d.worker, "instruction": f"Context Thread ID: {thread_id}. Instruction: {d.instruction}"}
+            for d in decision.delegations
+        ]
+        overview = "Running in parallel:\n" + "\n".join(f"- {d.worker}: {d.instruction}" for d in decision.delegations)
+        return {"messages": [HumanMessage(content=overview, name="Supervisor")], "next": "parallel", "delegations": tasks}
+    
     else:
         return {"messages": [AIMessage(content=decision.response_content)], "next": "__end__"}
 
-def architect_node(state: AgentState):
+# The node's config is passed down so callbacks (and the node: tags) reach the inner
+# model/tool runs, which is what lets /agent/stream surface worker tokens as they happen.
+# Obvious hops (e.g. right after a FRONTEND REPORT, or an explicit "Go ahead") skip the Pro model.
+pre_router = PreRouter(enabled=os.environ.get("FAST_ROUTER", "1") != "0")
+
+def _fast_route(state: AgentState, config):
+    fast = pre_router.route(state["messages"])
+    if fast is None:
+        return None
+    rule, decision = fast
+    print(f"--- FAST ROUTE ({rule}) ---")
+    return _route(decision, config)
+
+# Board updates are write-behind (app/board.py); a run ends when the supervisor answers the
+# user, so that thread's pending board state is flushed before the response goes out.
+def _finish(update, config):
+    if update.get("next") == "__end__":
+        get_board_writer().flush(config["configurable"].get("thread_id", "unknown"))
+    return update
+
+async def _afinish(update, config):
+    if update.get("next") == "__end__":
+        await asyncio.to_thread(get_board_writer().flush, config["configurable"].get("thread_id", "unknown"))
+    return update
+
+def supervisor_node(state: AgentState, config):
+    fast = _fast_route(state, config)
+    if fast is not None:
+        return _finish(fast, config)
+    messages, new_summaries = history_budget.prepare(state["messages"], state.get("summaries"))
+    start = time.perf_counter()
+    decision: RoutingDecision = supervisor.invoke(_supervisor_input(state, messages), config)
+    pre_router.record_llm(time.perf_counter() - start)
+    return _finish({**_route(decision, config), **({"summaries": new_summaries} if new_summaries else {})}, config)
+
+async def asupervisor_node(state: AgentState, config):
+    fast = _fast_route(state, config)
+    if fast is not None:
+        return await _afinish(fast, config)
+    messages, new_summaries = await history_budget.aprepare(state["messages"], state.get("summaries"))
+    start = time.perf_counter()
+    decision: RoutingDecision = await supervisor.ainvoke(_supervisor_input(state, messages), config)
+    pre_router.record_llm(time.perf_counter() - start)
+    return await _afinish({**_route(decision, config), **({"summaries": new_summaries} if new_summaries else {})}, config)
+
+# Workers get a Clean Slate Input (just the instruction) and their output is
+# wrapped as HumanMessage to prevent AI->AI crash in main loop.
+# They also get a clean config: only the callbacks (so their events stream under this node's run)
+# and the node tag. The node's `configurable` would make the sub-graph inherit the checkpointer and
+# write a checkpoint per ReAct step under a `<node>:<task_id>` namespace; it is set empty explicitly,
+# since LangChain otherwise merges the running node's config back in.
+def _worker_config(config, worker: str):
+    return {
+        "callbacks": config.get("callbacks"), "tags": [node_tag(worker)], "configurable": {},
+        "recursion_limit": config.get("recursion_limit", 25),
+    }
+
+def architect_node(state: AgentState, config):
     print("--- ARCHITECT NODE ---")
-    # Clean Slate Input for the Worker
-    last_msg = state["messages"][-1]
-    result = architect_agent.invoke({"messages": [last_msg]})
-    
-    # Wrap output as HumanMessage to prevent AI->AI crash in main loop
-    last_output = result["messages"][-1]
-    return {"messages": [HumanMessage(content=f"ARCHITECT REPORT:\n{last_output.content}", name="Architect")]}
+    result = architect_agent.invoke({"messages": [state["messages"][-1]]}, _worker_config(config, "technical_architect"))
+    return {"messages": [HumanMessage(content=f"ARCHITECT REPORT:\n{result['messages'][-1].content}", name="Architect")]}
+
+async def aarchitect_node(state: AgentState, config):
+    print("--- ARCHITECT NODE ---")
+    result = await architect_agent.ainvoke({"messages": [state["messages"][-1]]}, _worker_config(config, "technical_architect"))
+    return {"messages": [HumanMessage(content=f"ARCHITECT REPORT:\n{result['messages'][-1].content}", name="Architect")]}
 
-def frontend_node(state: AgentState):
+def frontend_node(state: AgentState, config):
     print("--- FRONTEND NODE ---")
-    last_msg = state["messages"][-1]
-    result = frontend_agent.invoke({"messages": [last_msg]})
-    
-    last_output = result["messages"][-1]
-    return {"messages": [HumanMessage(content=f"FRONTEND REPORT:\n{last_output.content}", name="Frontend")]}
+    result = frontend_agent.invoke({"messages": [state["messages"][-1]]}, _worker_config(config, "head_of_frontend"))
+    return {"messages": [HumanMessage(content=f"FRONTEND REPORT:\n{result['messages'][-1].content}", name="Frontend")]}
+
+async def afrontend_node(state: AgentState, config):
+    print("--- FRONTEND NODE ---")
+    result = await frontend_agent.ainvoke({"messages": [state["messages"][-1]]}, _worker_config(config, "head_of_frontend"))
+    return {"messages": [HumanMessage(content=f"FRONTEND REPORT:\n{result['messages'][-1].content}", name="Frontend")]}
+
+# Parallel tasks: one Send per delegation, all in the same superstep. Their reports are merged by
+# the `reports` reducer and folded into a single message by the join node.
+worker_limiter = WorkerLimiter(int(os.environ.get("WORKER_CONCURRENCY", "2")))
+
+def _worker_agent(worker: str):
+    return architect_agent if worker == "technical_architect" else frontend_agent
+
+def worker_task_node(task: Dict[str, str], config):
+    print(f"--- PARALLEL TASK ({task['worker']}) ---")
+    with worker_limiter.slot(task["worker"]):
+        result = _worker_agent(task["worker"]).invoke({"messages": [HumanMessage(content=task["instruction"], name="Supervisor")]}, _worker_config(config, task["worker"]))
+    return {"reports": [{"worker": task["worker"], "content": str(result["messages"][-1].content)}]}
+
+async def aworker_task_node(task: Dict[str, str], config):
+    print(f"--- PARALLEL TASK ({task['worker']}) ---")
+    async with worker_limiter.aslot(task["worker"]):
+        result = await _worker_agent(task["worker"]).ainvoke({"messages": [HumanMessage(content=task["instruction"], name="Supervisor")]}, _worker_config(config, task["worker"]))
+    return {"reports": [{"worker": task["worker"], "content": str(result["messages"][-1].content)}]}
+
+def join_reports_node(state: AgentState):
+    return {"messages": [HumanMessage(content=combine_reports(state.get("reports") or []), name="Workers")], "reports": None, "delegations": None}
+
+def _dispatch(state: AgentState):
+    if state.get("next") == "parallel":
+        return [Send("worker_task", task) for task in state.get("delegations") or []]
+    return state.get("next")
 
 # --- 6. TOPOLOGY ---
 workflow = StateGraph(AgentState)
-workflow.add_node("supervisor", supervisor_node)
-workflow.add_node("technical_architect", architect_node)
-workflow.add_node("head_of_frontend", frontend_node)
+# Each node has a sync and a native async body; LangServe (ainvoke/astream) takes the async one,
+# so an in-flight LLM call no longer pins a worker thread.
+# Every node body is timed into vibe_node_seconds (app/metrics.py).
+def _node(name: str, func, afunc=None):
+    timed = metrics.instrument_node(name)
+    return RunnableLambda(timed(func), afunc=timed(afunc) if afunc else None, name=name)
+
+workflow.add_node("supervisor", _node("supervisor", supervisor_node, asupervisor_node))
+workflow.add_node("technical_architect", _node("technical_architect", architect_node, aarchitect_node))
+workflow.add_node("head_of_frontend", _node("head_of_frontend", frontend_node, afrontend_node))
+workflow.add_node("worker_task", _node("worker_task", worker_task_node, aworker_task_node))
+workflow.add_node("join_reports", _node("join_reports", join_reports_node))
 workflow.set_entry_point("supervisor")
-workflow.add_conditional_edges("supervisor", lambda s: s.get("next"), {"technical_architect": "technical_architect", "head_of_frontend": "head_of_frontend", "__end__": END})
+workflow.add_conditional_edges("supervisor", _dispatch, {"technical_architect": "technical_architect", "head_of_frontend": "head_of_frontend", "worker_task": "worker_task", "__end__": END})
 workflow.add_edge("technical_architect", "supervisor")
 workflow.add_edge("head_of_frontend", "supervisor")
+workflow.add_edge("worker_task", "join_reports")
+workflow.add_edge("join_reports", "supervisor")
 
 # --- 7. CUSTOM SAVER ---
-class CustomFirestoreSaver(BaseCheckpointSaver):
-    def __init__(self, client: firestore.Client, collection: str = "checkpoints"):
-        super().__init__(serde=JsonPlusSerializer())
-        self.client = client
-        self.collection = collection
-
-    def get_tuple(self, config: Dict[str, Any]) -> Optional[CheckpointTuple]:
-        thread_id = config["configurable"]["thread_id"]
-        query = (
-            self.client.collection(self.collection)
-            .where("thread_id", "==", thread_id)
-            .order_by("checkpoint_id", direction=firestore.Query.DESCENDING)
-            .limit(1)
-        )
-        docs = list(query.stream())
-        if not docs: return None
-        data = docs[0].to_dict()
-        checkpoint = self.serde.loads(data["checkpoint"])
-        metadata = self.serde.loads(data["metadata"])
-        final_config = {
-            "configurable": {
-                "thread_id": thread_id,
-                "checkpoint_ns": data.get("checkpoint_ns", ""),
-                "checkpoint_id": data["checkpoint_id"]
-            }
-        }
-        return CheckpointTuple(final_config, checkpoint, metadata, None)
-
-    async def aget_tuple(self, config: Dict[str, Any]) -> Optional[CheckpointTuple]:
-        return await asyncio.to_thread(self.get_tuple, config)
-
-    def list(self, config: Optional[Dict[str, Any]], *, filter: Optional[Dict[str, Any]] = None, before: Optional[Dict[str, Any]] = None, limit: Optional[int] = None) -> AsyncIterator[CheckpointTuple]:
-        return []
-
-    async def alist(self, config: Optional[Dict[str, Any]], *, filter: Optional[Dict[str, Any]] = None, before: Optional[Dict[str, Any]] = None, limit: Optional[int] = None) -> AsyncIterator[CheckpointTuple]:
-        return []
-
-    async def aput(self, config: Dict[str, Any], checkpoint: Checkpoint, metadata: CheckpointMetadata, new_versions: Optional[Dict[str, Any]]) -> Dict[str, Any]:
-        thread_id = config["configurable"]["thread_id"]
-        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
-        if config["configurable"].get("checkpoint_id"):
-             checkpoint_id = config["configurable"]["checkpoint_id"]
-        else:
-             checkpoint_id = f"{int(time.time()*1000)}_{str(uuid.uuid4())[:8]}"
-        
-        doc_data = {
-            "thread_id": thread_id,
-            "checkpoint_ns": checkpoint_ns,
-            "checkpoint_id": checkpoint_id,
-            "checkpoint": self.serde.dumps(checkpoint),
-            "metadata": self.serde.dumps(metadata),
-            "created_at": firestore.SERVER_TIMESTAMP
-        }
-        doc_ref = self.client.collection(self.collection).document(f"{thread_id}_{checkpoint_id}")
-        await asyncio.to_thread(doc_ref.set, doc_data)
-        return {"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": checkpoint_id}}
-
-    def put(self, config: Dict[str, Any], checkpoint: Checkpoint, metadata: CheckpointMetadata, new_versions: Optional[Dict[str, Any]]) -> Dict[str, Any]:
-        return {}
-
-checkpointer = CustomFirestoreSaver(db, "custom_checkpoints")
-graph = workflow.compile(checkpointer=checkpointer)
-
-app = FastAPI(title="Vibe Coder LangGraph Agency")
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["http://localhost:3000", "https://vibe-coder-frontend-534939227554.australia-southeast1.run.app"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-add_routes(app, graph, path="/agent")
+checkpointer = CachedCheckpointSaver(CustomFirestoreSaver(db, "custom_checkpoints"))
+compactor = get_compactor(checkpointer.saver)
+compactor.start()  # only runs with CHECKPOINT_COMPACT_INTERVAL > 0
+with startup.phase("compile graph"):
+    graph = workflow.compile(checkpointer=checkpointer)
 
-@app.get("/health")
-def health(): return {"status": "IT WORKS"}
\ No newline at end of file
+# Component stats() on /metrics as gauges.
+metrics.register_stats("checkpoint_cache", checkpointer.stats)
+metrics.register_stats("router", pre_router.stats)
+metrics.register_stats("board", lambda: get_board_writer().stats())
+metrics.register_stats("retention", compactor.stats)
+metrics.register_stats("admission", get_run_scheduler().stats)
+metrics.register_stats("llm_pro_gate", gate_for(llm_pro.model_name).stats)
+metrics.register_stats("llm_flash_gate", gate_for(llm_flash.model_name).stats)
+if response_cache is not None:
+    metrics.register_stats("response_cache", response_cache.stats)
@@ -0,0 +1,104 @@
+"""
+VIBE CODER - CHECKPOINT ENCODING
+Compact binary encoding for the checkpoint payloads CustomFirestoreSaver stores.
+
+- Encoding: the serializer's typed form (`dumps_typed`: msgpack with compact extension types for
+  LangChain messages / pydantic models in current langgraph-checkpoint; JSON on older ones),
+  then zstd (if `zstandard` is installed) or zlib compression.
+- Every blob is self-describing (compression id + serializer type tag), so docs written with a
+  different codec setting still decode.
+- Documents record `format`: 1 = raw JsonPlusSerializer JSON (legacy), 2 = this codec.
+- `split` cuts blobs that are too big for one Firestore document into chunks.
+
+CHECKPOINT_CODEC = zstd (default) | zlib | none | json (keep writing format 1).
+"""
+
+import threading
+import zlib
+from typing import Any, List, Optional
+
+FORMAT_JSON = 1
+FORMAT_BINARY = 2
+
+_NONE, _ZLIB, _ZSTD = 0, 1, 2
+_COMPRESSION_IDS = {"none": _NONE, "zlib": _ZLIB, "zstd": _ZSTD}
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+class CheckpointCodec:
+    format = FORMAT_BINARY
+
+    def __init__(self, serde: Any, compression: str = "zstd", level: Optional[int] = None):
+        if compression not in _COMPRESSION_IDS:
+            raise ValueError(f"Unknown checkpoint compression: {compression}")
+        if compression == "zstd" and zstandard is None:
+            print("--- CHECKPOINT CODEC: zstandard not installed, using zlib ---")
+            compression = "zlib"
+        self.serde = serde
+        self.compression = compression
+        self.level = level
+        # zstd compressor objects are not thread-safe and the saver encodes from many threads (aput).
+        self._local = threading.local()
+
+    def _zstd_compressor(self):
+        compressor = getattr(self._local, "zstd", None)
+        if compressor is None:
+            compressor = self._local.zstd = zstandard.ZstdCompressor(level=self.level or 3)
+        return compressor
+
+    @property
+    def name(self) -> str:
+        return f"binary+{self.compression}"
+
+    def encode(self, obj: Any) -> bytes:
+        tag, payload = self.serde.dumps_typed(obj)
+        tag_bytes = tag.encode("utf-8")
+        if self.compression == "zstd":
+            payload = self._zstd_compressor().compress(payload)
+        elif self.compression == "zlib":
+            payload = zlib.compress(payload, 6 if self.level is None else self.level)
+        return bytes([_COMPRESSION_IDS[self.compression], len(tag_bytes)]) + tag_bytes + payload
+
+    def decode(self, blob: bytes) -> Any:
+        compression, tag_len = blob[0], blob[1]
+        tag = blob[2:2 + tag_len].decode("utf-8")
+        payload = blob[2 + tag_len:]
+        if compression == _ZSTD:
+            if zstandard is None:
+                raise RuntimeError("Checkpoint is zstd-compressed but zstandard is not installed")
+            payload = zstandard.ZstdDecompressor().decompress(payload)
+        elif compression == _ZLIB:
+            payload = zlib.decompress(payload)
+        return self.serde.loads_typed((tag, payload))
+
+
+class JsonCodec:
+    """Format 1: what the saver always wrote (serde.dumps JSON bytes, uncompressed)."""
+
+    format = FORMAT_JSON
+    name = "json"
+
+    def __init__(self, serde: Any):
+        self.serde = serde
+
+    def encode(self, obj: Any) -> bytes:
+        return self.serde.dumps(obj)
+
+    def decode(self, blob: bytes) -> Any:
+        return self.serde.loads(blob)
+
+
+def build_codec(spec: Optional[str], serde: Any):
+    """CHECKPOINT_CODEC spec -> codec; empty means zstd."""
+    spec = (spec or "zstd").lower()
+    if spec == "json":
+        return JsonCodec(serde)
+    return CheckpointCodec(serde, compression=spec)
+
+
+def split(blob: bytes, chunk_size: int) -> List[bytes]:
+    return [blob[i:i + chunk_size] for i in range(0, len(blob), chunk_size)] or [b""]
@@ -0,0 +1,626 @@
+"""
+VIBE CODER - CHECKPOINT ENGINE
+Firestore-backed LangGraph checkpointer (the "Custom Engine" that solved Amnesia).
+
+Delta Mode:
+- Every `base_interval` steps we write a full BASE snapshot of the checkpoint.
+- In between we only write a DELTA: the channels listed in `new_versions`.
+- Append-only lists (e.g. `messages`) are stored as the appended tail only.
+- Each delta records its `chain` (base -> parent), so a load is one read + one batched get_all.
+
+Layout:
+- {collection}/{thread_id}/checkpoints/{checkpoint_id}  every checkpoint (base or delta).
+- {collection}/{thread_id}/heads/{namespace}           small pointer to the latest checkpoint (id,
+  kind, chain ids; no payload), so "load the latest" is a point read plus one batched get_all of the
+  checkpoint and its chain instead of an indexed query. Older heads hold a full doc copy; still read.
+- {collection}/{thread_id}/checkpoints/{checkpoint_id}/chunks/{field}.{i}  spill-over for payloads
+  larger than `inline_limit`, so long sessions stay under Firestore's 1 MiB document limit.
+- {collection}/{thread_id}/writes/{checkpoint_id}.{task_id}.{idx}  pending writes (put_writes) of the
+  tasks run from a checkpoint (Send fan-out, multi-task supersteps); returned by get_tuple. put_writes
+  also sets `pending_writes` on the checkpoint doc, so only checkpoints that have writes pay the query.
+- Legacy flat docs ({collection}/{thread_id}_{checkpoint_id}) are still readable by get_tuple.
+- Superseded checkpoints (and their chunks) are pruned by app/retention.py.
+
+Encoding (app/checkpoint_codec.py):
+- Payloads are compact binary + zstd/zlib by default; each doc records its `format`, and docs
+  without one (format 1, plain JsonPlusSerializer JSON) still load.
+
+Cache:
+- CachedCheckpointSaver keeps the latest CheckpointTuple per (thread_id, checkpoint_ns) in memory,
+  write-through, LRU + max-bytes bounded. Entries are revalidated against the head's checkpoint_id
+  (a projected read, no payload, no parse) once they are older than `trust_seconds`.
+"""
+
+import asyncio
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Optional, Any, Dict, AsyncIterator, Iterator, List, Sequence, Tuple
+
+from google.cloud import firestore
+from langgraph.checkpoint.base import WRITES_IDX_MAP, BaseCheckpointSaver, Checkpoint, CheckpointMetadata, CheckpointTuple
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+from app.checkpoint_codec import FORMAT_BINARY, FORMAT_JSON, CheckpointCodec, build_codec, split
+from app.metrics import instrument_checkpointer, record_checkpoint_bytes
+
+KIND_BASE = "base"
+KIND_DELTA = "delta"
+CHECKPOINTS = "checkpoints"
+HEADS = "heads"
+CHUNKS = "chunks"
+WRITES = "writes"
+WRITES_MARKER = "pending_writes"
+PAYLOAD_FIELDS = ("checkpoint", "delta", "metadata")
+BATCH_BYTES = 8 * 1024 * 1024  # stay well under Firestore's 10 MiB request limit
+ROOT_NAMESPACE = "_root"
+HEAD_FIELDS = ("thread_id", "checkpoint_ns", "checkpoint_id", "parent_checkpoint_id", "kind", "base_id", "chain", "created_at")
+
+
+def _is_prefix(prev: List[Any], new: List[Any]) -> bool:
+    """True if `new` starts with every item of `prev` (identity first, then equality)."""
+    if len(prev) > len(new):
+        return False
+    return all(a is b or a == b for a, b in zip(prev, new))
+
+
+class CustomFirestoreSaver(BaseCheckpointSaver):
+    def __init__(self, client: firestore.Client, collection: str = "checkpoints", *, delta_mode: bool = True, base_interval: int = 20, max_tracked_threads: int = 1024, page_size: int = 50,
+                 codec: Optional[Any] = None, inline_limit: int = 256 * 1024, chunk_size: int = 512 * 1024):
+        super().__init__(serde=JsonPlusSerializer())
+        # Writes use `codec`; reads follow each doc's own `format`.
+        self.codec = codec if codec is not None else build_codec(os.environ.get("CHECKPOINT_CODEC"), self.serde)
+        self._binary = CheckpointCodec(self.serde, compression="none")
+        self.inline_limit = inline_limit
+        self.chunk_size = chunk_size
+        self.client = client
+        self.collection = collection
+        self.delta_mode = delta_mode
+        self.base_interval = max(1, base_interval)
+        # Last state written by THIS instance per (thread_id, checkpoint_ns).
+        # Used to diff the next write. If the parent doesn't match, we write a base.
+        self._last: "OrderedDict[Tuple[str, str], Dict[str, Any]]" = OrderedDict()
+        self.max_tracked_threads = max_tracked_threads
+        self._lock = threading.Lock()
+        self.page_size = max(1, page_size)
+
+    def _thread_ref(self, thread_id: str):
+        return self.client.collection(self.collection).document(thread_id)
+
+    def _doc_ref(self, thread_id: str, checkpoint_id: str):
+        return self._thread_ref(thread_id).collection(CHECKPOINTS).document(checkpoint_id)
+
+    def _head_ref(self, thread_id: str, checkpoint_ns: str):
+        return self._thread_ref(thread_id).collection(HEADS).document(checkpoint_ns or ROOT_NAMESPACE)
+
+    def _legacy_ref(self, thread_id: str, checkpoint_id: str):
+        return self.client.collection(self.collection).document(f"{thread_id}_{checkpoint_id}")
+
+    def _chunk_ref(self, thread_id: str, checkpoint_id: str, field: str, index: int, parent=None):
+        parent = parent if parent is not None else self._doc_ref(thread_id, checkpoint_id)
+        return parent.collection(CHUNKS).document(f"{field}.{index}")
+
+    def _write_ref(self, thread_id: str, checkpoint_id: str, task_id: str, idx: int):
+        return self._thread_ref(thread_id).collection(WRITES).document(f"{checkpoint_id}.{task_id}.{idx}")
+
+    # --- ENCODING ---
+    def _load(self, data: Dict[str, Any], field: str, parent=None) -> Any:
+        """Decodes one payload field of a stored doc, reassembling it from chunks if it spilled over.
+        Chunks live under `parent` (default: the checkpoint doc)."""
+        count = data.get(f"{field}_chunks")
+        if count:
+            refs = [self._chunk_ref(data["thread_id"], data["checkpoint_id"], field, i, parent) for i in range(count)]
+            parts = {snap.id: snap.get("data") for snap in self.client.get_all(refs) if snap.exists}
+            missing = [ref.id for ref in refs if ref.id not in parts]
+            if missing:
+                raise ValueError(f"Checkpoint {data['checkpoint_id']} is missing chunks: {missing}")
+            blob = b"".join(parts[ref.id] for ref in refs)
+        else:
+            blob = data[field]
+        if data.get("format", FORMAT_JSON) >= FORMAT_BINARY:
+            return self._binary.decode(blob)
+        return self.serde.loads(blob)
+
+    def _chunks(self, thread_id: str, checkpoint_id: str, doc_data: Dict[str, Any], fields=PAYLOAD_FIELDS, parent=None) -> List[Tuple[Any, bytes]]:
+        """Moves oversized payload fields out of `doc_data`; returns the (chunk ref, bytes) writes they need."""
+        writes = []
+        for field in fields:
+            blob = doc_data.get(field)
+            if blob is None or len(blob) <= self.inline_limit:
+                continue
+            chunks = split(blob, self.chunk_size)
+            writes.extend((self._chunk_ref(thread_id, checkpoint_id, field, i, parent), chunk) for i, chunk in enumerate(chunks))
+            del doc_data[field]
+            doc_data[f"{field}_chunks"] = len(chunks)
+        return writes
+
+    def _spill(self, thread_id: str, checkpoint_id: str, doc_data: Dict[str, Any], fields=PAYLOAD_FIELDS, parent=None) -> None:
+        """Writes oversized payload fields as chunk docs, committed before the doc that points at them."""
+        batch, batch_bytes = self.client.batch(), 0
+        for ref, chunk in self._chunks(thread_id, checkpoint_id, doc_data, fields, parent):
+            if batch_bytes and batch_bytes + len(chunk) > BATCH_BYTES:
+                batch.commit()
+                batch, batch_bytes = self.client.batch(), 0
+            batch.set(ref, {"data": chunk})
+            batch_bytes += len(chunk)
+        if batch_bytes:
+            batch.commit()
+
+    # --- READ PATH ---
+    def _rebuild(self, data: Dict[str, Any], known: Optional[Dict[str, Dict[str, Any]]] = None) -> Checkpoint:
+        """Turns a stored document (base or delta) back into a full Checkpoint.
+        `known` holds docs already fetched (e.g. the current list page) to skip re-reading them."""
+        checkpoint = self._load(data, "checkpoint")
+        if data.get("kind", KIND_BASE) == KIND_BASE:
+            return checkpoint
+
+        thread_id = data["thread_id"]
+        chain_ids = data.get("chain", [])
+        by_id = {cid: known[cid] for cid in chain_ids if known and cid in known}
+        to_fetch = [self._doc_ref(thread_id, cid) for cid in chain_ids if cid not in by_id]
+        if to_fetch:
+            for snap in self.client.get_all(to_fetch):
+                if snap.exists:
+                    doc = snap.to_dict()
+                    by_id[doc["checkpoint_id"]] = doc
+                    if known is not None:
+                        known[doc["checkpoint_id"]] = doc
+        missing = [cid for cid in chain_ids if cid not in by_id]
+        if missing:
+            raise ValueError(f"Checkpoint chain for {thread_id} is broken (missing: {missing})")
+
+        values: Dict[str, Any] = {}
+        for doc in [by_id[cid] for cid in chain_ids] + [data]:
+            if doc.get("kind", KIND_BASE) == KIND_BASE:
+                values = dict(self._load(doc, "checkpoint")["channel_values"])
+            else:
+                self._apply_delta(values, self._load(doc, "delta"))
+        checkpoint["channel_values"] = values
+        return checkpoint
+
+    @staticmethod
+    def _apply_delta(values: Dict[str, Any], delta: Dict[str, Any]) -> None:
+        for channel in delta.get("removed", []):
+            values.pop(channel, None)
+        for channel, value in delta.get("set", {}).items():
+            values[channel] = value
+        for channel, tail in delta.get("appended", {}).items():
+            values[channel] = list(values.get(channel, [])) + list(tail)
+
+    def _to_tuple(self, data: Dict[str, Any], known: Optional[Dict[str, Dict[str, Any]]] = None) -> CheckpointTuple:
+        thread_id = data["thread_id"]
+        checkpoint_ns = data.get("checkpoint_ns", "")
+        checkpoint = self._rebuild(data, known)
+        metadata = self._load(data, "metadata")
+        final_config = {
+            "configurable": {
+                "thread_id": thread_id,
+                "checkpoint_ns": checkpoint_ns,
+                "checkpoint_id": data["checkpoint_id"]
+            }
+        }
+        parent_config = None
+        if data.get("parent_checkpoint_id"):
+            parent_config = {
+                "configurable": {
+                    "thread_id": thread_id,
+                    "checkpoint_ns": checkpoint_ns,
+                    "checkpoint_id": data["parent_checkpoint_id"]
+                }
+            }
+        return CheckpointTuple(final_config, checkpoint, metadata, parent_config)
+
+    def _get_legacy(self, thread_id: str, checkpoint_id: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Reads checkpoints written before the per-thread layout (flat, full snapshots)."""
+        if checkpoint_id:
+            snap = self._legacy_ref(thread_id, checkpoint_id).get()
+            return snap.to_dict() if snap.exists else None
+        query = (
+            self.client.collection(self.collection)
+            .where("thread_id", "==", thread_id)
+            .order_by("checkpoint_id", direction=firestore.Query.DESCENDING)
+            .limit(1)
+        )
+        docs = list(query.stream())
+        return docs[0].to_dict() if docs else None
+
+    @instrument_checkpointer("firestore", "get_tuple")
+    def get_tuple(self, config: Dict[str, Any]) -> Optional[CheckpointTuple]:
+        found = self._get(config)
+        if found is None:
+            return None
+        saved, data = found
+        if not data.get(WRITES_MARKER):
+            return saved._replace(pending_writes=[])
+        configurable = saved.config["configurable"]
+        return saved._replace(pending_writes=self._pending_writes(configurable["thread_id"], configurable["checkpoint_id"]))
+
+    def _get(self, config: Dict[str, Any]) -> Optional[Tuple[CheckpointTuple, Dict[str, Any]]]:
+        """The checkpoint and the stored doc it was built from."""
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"].get("checkpoint_id")
+        if not checkpoint_id:
+            head = self._head_ref(thread_id, checkpoint_ns).get()
+            if head.exists:
+                return self._from_head(head.to_dict())
+        snap = self._doc_ref(thread_id, checkpoint_id).get() if checkpoint_id else None
+        # A doc holding only the writes marker belongs to a checkpoint whose put hasn't landed yet.
+        data = snap.to_dict() if snap is not None and snap.exists and snap.get("checkpoint_id") else self._get_legacy(thread_id, checkpoint_id)
+        if data is None: return None
+        return self._to_tuple(data), data
+
+    def _from_head(self, head: Dict[str, Any]) -> Tuple[CheckpointTuple, Dict[str, Any]]:
+        """Loads the checkpoint a head points at, fetching it and its whole chain in one get_all."""
+        if any(field in head or f"{field}_chunks" in head for field in PAYLOAD_FIELDS):
+            return self._to_tuple(head), head  # head written before heads became pointers: a full doc copy
+        thread_id = head["thread_id"]
+        ids = [head["checkpoint_id"]] + list(head.get("chain") or [])
+        known = {}
+        for snap in self.client.get_all([self._doc_ref(thread_id, cid) for cid in ids]):
+            if snap.exists:
+                doc = snap.to_dict()
+                known[doc["checkpoint_id"]] = doc
+        data = known.get(head["checkpoint_id"])
+        if data is None:
+            raise ValueError(f"Head of {thread_id} points at a missing checkpoint {head['checkpoint_id']}")
+        return self._to_tuple(data, known), data
+
+    async def aget_tuple(self, config: Dict[str, Any]) -> Optional[CheckpointTuple]:
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    @instrument_checkpointer("firestore", "head_id")
+    def head_id(self, thread_id: str, checkpoint_ns: str = "") -> Optional[str]:
+        """The latest checkpoint_id for a thread, read without fetching the checkpoint payload."""
+        snap = self._head_ref(thread_id, checkpoint_ns).get(field_paths=["checkpoint_id"])
+        return snap.get("checkpoint_id") if snap.exists else None
+
+    def _pages(self, config: Optional[Dict[str, Any]], before: Optional[Dict[str, Any]]) -> Iterator[List[Dict[str, Any]]]:
+        """Yields pages of raw docs, newest first, using the last snapshot of each page as the cursor."""
+        if config is not None:
+            query = self._thread_ref(config["configurable"]["thread_id"]).collection(CHECKPOINTS)
+        else:
+            query = self.client.collection_group(CHECKPOINTS)
+        query = query.order_by("checkpoint_id", direction=firestore.Query.DESCENDING)
+        if before is not None and before["configurable"].get("checkpoint_id"):
+            query = query.start_after({"checkpoint_id": before["configurable"]["checkpoint_id"]})
+        while True:
+            snaps = list(query.limit(self.page_size).stream())
+            if not snaps:
+                return
+            yield [snap.to_dict() for snap in snaps]
+            if len(snaps) < self.page_size:
+                return
+            query = query.start_after(snaps[-1])
+
+    def list(self, config: Optional[Dict[str, Any]], *, filter: Optional[Dict[str, Any]] = None, before: Optional[Dict[str, Any]] = None, limit: Optional[int] = None) -> Iterator[CheckpointTuple]:
+        """Streams checkpoints newest first. Each one is only deserialized when the caller consumes it."""
+        checkpoint_ns = config["configurable"].get("checkpoint_ns") if config is not None else None
+        remaining = limit
+        for page in self._pages(config, before):
+            known = {doc["checkpoint_id"]: doc for doc in page}
+            for data in page:
+                if checkpoint_ns is not None and data.get("checkpoint_ns", "") != checkpoint_ns:
+                    continue
+                if filter:
+                    metadata = self._load(data, "metadata")
+                    if not all(metadata.get(k) == v for k, v in filter.items()):
+                        continue
+                if remaining is not None and remaining <= 0:
+                    return
+                yield self._to_tuple(data, known)
+                if remaining is not None:
+                    remaining -= 1
+
+    async def alist(self, config: Optional[Dict[str, Any]], *, filter: Optional[Dict[str, Any]] = None, before: Optional[Dict[str, Any]] = None, limit: Optional[int] = None) -> AsyncIterator[CheckpointTuple]:
+        iterator = self.list(config, filter=filter, before=before, limit=limit)
+        done = object()
+        while True:
+            item = await asyncio.to_thread(next, iterator, done)
+            if item is done:
+                return
+            yield item
+
+    # --- WRITE PATH ---
+    def _build_delta(self, last: Dict[str, Any], values: Dict[str, Any], new_versions: Dict[str, Any]) -> Dict[str, Any]:
+        """Diffs `values` against the last written state, limited to the channels in `new_versions`."""
+        delta: Dict[str, Any] = {"set": {}, "appended": {}, "removed": []}
+        previous = last["values"]
+        for channel in new_versions:
+            if channel not in values:
+                if channel in previous:
+                    delta["removed"].append(channel)
+                continue
+            value, prev_value = values[channel], previous.get(channel)
+            if isinstance(value, list) and isinstance(prev_value, list) and _is_prefix(prev_value, value):
+                delta["appended"][channel] = value[len(prev_value):]
+            else:
+                delta["set"][channel] = value
+        return delta
+
+    @instrument_checkpointer("firestore", "put")
+    def put(self, config: Dict[str, Any], checkpoint: Checkpoint, metadata: CheckpointMetadata, new_versions: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        parent_id = config["configurable"].get("checkpoint_id")
+        # checkpoint["id"] is a time-sortable uuid6, unique per step (legacy ids sort before it).
+        checkpoint_id = checkpoint.get("id") or f"{int(time.time()*1000)}_{str(uuid.uuid4())[:8]}"
+        values = checkpoint.get("channel_values", {})
+
+        key = (thread_id, checkpoint_ns)
+        with self._lock:
+            last = self._last.get(key)
+            if last is not None:
+                self._last.move_to_end(key)
+        use_delta = (
+            self.delta_mode
+            and new_versions is not None
+            and last is not None
+            and parent_id is not None
+            and last["checkpoint_id"] == parent_id
+            and len(last["chain"]) < self.base_interval
+        )
+
+        doc_data = {
+            "thread_id": thread_id,
+            "checkpoint_ns": checkpoint_ns,
+            "checkpoint_id": checkpoint_id,
+            "parent_checkpoint_id": parent_id,
+            "format": self.codec.format,
+            "metadata": self.codec.encode(metadata),
+            "created_at": firestore.SERVER_TIMESTAMP
+        }
+        if use_delta:
+            chain = last["chain"] + [parent_id]
+            doc_data.update({
+                "kind": KIND_DELTA,
+                "base_id": chain[0],
+                "chain": chain,
+                "checkpoint": self.codec.encode({**checkpoint, "channel_values": {}}),
+                "delta": self.codec.encode(self._build_delta(last, values, new_versions)),
+            })
+        else:
+            chain = []
+            doc_data.update({"kind": KIND_BASE, "checkpoint": self.codec.encode(checkpoint)})
+        payload_bytes = sum(len(doc_data[field]) for field in PAYLOAD_FIELDS if field in doc_data)
+        self._spill(thread_id, checkpoint_id, doc_data)
+
+        # Checkpoint + head pointer in one atomic batch, so the head never points past a missing doc.
+        # Merged, since put_writes may already have set the writes marker on this checkpoint's doc.
+        batch = self.client.batch()
+        batch.set(self._doc_ref(thread_id, checkpoint_id), doc_data, merge=True)
+        batch.set(self._head_ref(thread_id, checkpoint_ns), {k: doc_data[k] for k in HEAD_FIELDS if k in doc_data})
+        batch.commit()
+        record_checkpoint_bytes("firestore", "put", payload_bytes)
+        snapshot = {k: (list(v) if isinstance(v, list) else v) for k, v in values.items()}
+        with self._lock:
+            self._last[key] = {"checkpoint_id": checkpoint_id, "chain": chain, "values": snapshot}
+            self._last.move_to_end(key)
+            while len(self._last) > self.max_tracked_threads:
+                self._last.popitem(last=False)
+        return {"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": checkpoint_id}}
+
+    async def aput(self, config: Dict[str, Any], checkpoint: Checkpoint, metadata: CheckpointMetadata, new_versions: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+
+    # --- PENDING WRITES ---
+    @instrument_checkpointer("firestore", "put_writes")
+    def put_writes(self, config: Dict[str, Any], writes: Sequence[Tuple[str, Any]], task_id: str) -> None:
+        """Stores a task's writes against the checkpoint it ran from (one doc per write, keyed task_id/idx),
+        then marks that checkpoint as having writes. put may not have landed yet (both run in the
+        background), so the marker is merged in and put merges around it."""
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+        docs = []
+        for idx, (channel, value) in enumerate(writes):
+            idx = WRITES_IDX_MAP.get(channel, idx)
+            ref = self._write_ref(thread_id, checkpoint_id, task_id, idx)
+            doc = {
+                "thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": checkpoint_id,
+                "task_id": task_id, "idx": idx, "channel": channel,
+                "format": self.codec.format, "value": self.codec.encode(value),
+            }
+            self._spill(thread_id, checkpoint_id, doc, ("value",), ref)
+            docs.append((ref, doc))
+        batch, batch_bytes, ops = self.client.batch(), 0, 0
+        for ref, doc in docs:
+            size = len(doc.get("value") or b"")
+            if ops and (ops >= 500 or batch_bytes + size > BATCH_BYTES):
+                batch.commit()
+                batch, batch_bytes, ops = self.client.batch(), 0, 0
+            batch.set(ref, doc)
+            batch_bytes, ops = batch_bytes + size, ops + 1
+        if ops:
+            batch.set(self._doc_ref(thread_id, checkpoint_id), {WRITES_MARKER: True}, merge=True)
+            batch.commit()
+
+    async def aput_writes(self, config: Dict[str, Any], writes: Sequence[Tuple[str, Any]], task_id: str) -> None:
+        await asyncio.to_thread(self.put_writes, config, writes, task_id)
+
+    def _pending_writes(self, thread_id: str, checkpoint_id: str) -> List[Tuple[str, str, Any]]:
+        query = self._thread_ref(thread_id).collection(WRITES).where("checkpoint_id", "==", checkpoint_id)
+        docs = sorted((snap.to_dict() for snap in query.stream()), key=lambda d: (d["task_id"], d["idx"]))
+        return [
+            (doc["task_id"], doc["channel"], self._load(doc, "value", self._write_ref(thread_id, checkpoint_id, doc["task_id"], doc["idx"])))
+            for doc in docs
+        ]
+
+
+def _approx_size(value: Any) -> int:
+    """Cheap recursive size estimate (string/bytes lengths) used for the cache byte budget."""
+    if isinstance(value, (str, bytes, bytearray)):
+        return len(value)
+    if isinstance(value, dict):
+        return sum(len(str(k)) + _approx_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return sum(_approx_size(v) for v in value)
+    content = getattr(value, "content", None)
+    if content is not None:
+        return _approx_size(content) + 64
+    return 8
+
+
+def _copy_tuple(saved: CheckpointTuple) -> CheckpointTuple:
+    """Hands out a copy so graph runs can't mutate the cached checkpoint's channel values."""
+    checkpoint = dict(saved.checkpoint)
+    checkpoint["channel_values"] = {
+        k: (list(v) if isinstance(v, list) else v) for k, v in saved.checkpoint.get("channel_values", {}).items()
+    }
+    return saved._replace(checkpoint=checkpoint, pending_writes=list(saved.pending_writes or []))
+
+
+class CachedCheckpointSaver(BaseCheckpointSaver):
+    """Write-through LRU of the latest checkpoint per (thread_id, checkpoint_ns) in front of a CustomFirestoreSaver."""
+
+    def __init__(self, saver: CustomFirestoreSaver, *, max_entries: int = 256, max_bytes: int = 64 * 1024 * 1024, trust_seconds: float = 5.0):
+        super().__init__(serde=saver.serde)
+        self.saver = saver
+        self.max_entries = max(1, max_entries)
+        self.max_bytes = max_bytes
+        self.trust_seconds = trust_seconds
+        self._entries: "OrderedDict[Tuple[str, str], Dict[str, Any]]" = OrderedDict()
+        # put and put_writes run as independent background tasks, so a checkpoint's writes can land
+        # before its put is cached: (thread_id, checkpoint_ns) -> (checkpoint_id, writes) until then.
+        self._early_writes: Dict[Tuple[str, str], Tuple[str, List[Tuple[str, str, Any]]]] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.evictions = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "hits": self.hits, "misses": self.misses, "stale": self.stale, "evictions": self.evictions,
+                "entries": len(self._entries), "bytes": self._bytes,
+            }
+
+    def _store(self, key: Tuple[str, str], saved: CheckpointTuple, *, merge_early: bool = False) -> None:
+        size = _approx_size(saved.checkpoint.get("channel_values", {}))
+        with self._lock:
+            early = self._early_writes.pop(key, None)
+            if merge_early and early is not None and early[0] == saved.config["configurable"]["checkpoint_id"]:
+                saved = saved._replace(pending_writes=list(saved.pending_writes or []) + early[1])
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old["size"]
+            if size > self.max_bytes:
+                return
+            self._entries[key] = {"tuple": saved, "size": size, "stored_at": time.monotonic()}
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted["size"]
+                self.evictions += 1
+
+    def _drop(self, key: Tuple[str, str]) -> None:
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old["size"]
+
+    def _lookup(self, config: Dict[str, Any]) -> Optional[CheckpointTuple]:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"].get("checkpoint_id")
+        key = (thread_id, checkpoint_ns)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+        if entry is None:
+            return None
+        cached_id = entry["tuple"].config["configurable"]["checkpoint_id"]
+        if checkpoint_id:
+            # Checkpoints are immutable, so an id match never needs revalidation.
+            return entry["tuple"] if checkpoint_id == cached_id else None
+        if time.monotonic() - entry["stored_at"] > self.trust_seconds:
+            if self.saver.head_id(thread_id, checkpoint_ns) != cached_id:
+                # Another instance wrote to this thread since we cached it.
+                self._drop(key)
+                with self._lock:
+                    self.stale += 1
+                return None
+            with self._lock:
+                entry["stored_at"] = time.monotonic()
+        return entry["tuple"]
+
+    @instrument_checkpointer("cache", "get_tuple")
+    def get_tuple(self, config: Dict[str, Any]) -> Optional[CheckpointTuple]:
+        cached = self._lookup(config)
+        if cached is not None:
+            with self._lock:
+                self.hits += 1
+            return _copy_tuple(cached)
+        with self._lock:
+            self.misses += 1
+        saved = self.saver.get_tuple(config)
+        if saved is not None and not config["configurable"].get("checkpoint_id"):
+            self._store((config["configurable"]["thread_id"], config["configurable"].get("checkpoint_ns", "")), saved)
+            return _copy_tuple(saved)
+        return saved
+
+    @instrument_checkpointer("cache", "aget_tuple")
+    async def aget_tuple(self, config: Dict[str, Any]) -> Optional[CheckpointTuple]:
+        cached = self._lookup(config) if not self._needs_check(config) else None
+        if cached is not None:
+            with self._lock:
+                self.hits += 1
+            return _copy_tuple(cached)
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    def _needs_check(self, config: Dict[str, Any]) -> bool:
+        """True if serving this config from cache would need a Firestore round trip (so run it off the loop)."""
+        key = (config["configurable"]["thread_id"], config["configurable"].get("checkpoint_ns", ""))
+        with self._lock:
+            entry = self._entries.get(key)
+        return (
+            entry is not None
+            and not config["configurable"].get("checkpoint_id")
+            and time.monotonic() - entry["stored_at"] > self.trust_seconds
+        )
+
+    def list(self, config: Optional[Dict[str, Any]], *, filter: Optional[Dict[str, Any]] = None, before: Optional[Dict[str, Any]] = None, limit: Optional[int] = None) -> Iterator[CheckpointTuple]:
+        return self.saver.list(config, filter=filter, before=before, limit=limit)
+
+    def alist(self, config: Optional[Dict[str, Any]], *, filter: Optional[Dict[str, Any]] = None, before: Optional[Dict[str, Any]] = None, limit: Optional[int] = None) -> AsyncIterator[CheckpointTuple]:
+        return self.saver.alist(config, filter=filter, before=before, limit=limit)
+
+    @instrument_checkpointer("cache", "put")
+    def put(self, config: Dict[str, Any], checkpoint: Checkpoint, metadata: CheckpointMetadata, new_versions: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        next_config = self.saver.put(config, checkpoint, metadata, new_versions)
+        parent_config = None
+        if config["configurable"].get("checkpoint_id"):
+            parent_config = {"configurable": {**next_config["configurable"], "checkpoint_id": config["configurable"]["checkpoint_id"]}}
+        saved = CheckpointTuple(next_config, checkpoint, metadata, parent_config, [])
+        self._store((next_config["configurable"]["thread_id"], next_config["configurable"]["checkpoint_ns"]), _copy_tuple(saved), merge_early=True)
+        return next_config
+
+    @instrument_checkpointer("cache", "aput")
+    async def aput(self, config: Dict[str, Any], checkpoint: Checkpoint, metadata: CheckpointMetadata, new_versions: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+
+    @instrument_checkpointer("cache", "put_writes")
+    def put_writes(self, config: Dict[str, Any], writes: Sequence[Tuple[str, Any]], task_id: str) -> None:
+        self.saver.put_writes(config, writes, task_id)
+        # Keep a cached tuple of the same checkpoint complete, or a resume from cache would lose the writes.
+        key = (config["configurable"]["thread_id"], config["configurable"].get("checkpoint_ns", ""))
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+        added = [(task_id, channel, value) for channel, value in writes]
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry["tuple"].config["configurable"]["checkpoint_id"] == checkpoint_id:
+                entry["tuple"] = entry["tuple"]._replace(pending_writes=list(entry["tuple"].pending_writes or []) + added)
+                return
+            early = self._early_writes.get(key)
+            if early is not None and early[0] == checkpoint_id:
+                early[1].extend(added)
+            else:
+                self._early_writes[key] = (checkpoint_id, added)
+
+    async def aput_writes(self, config: Dict[str, Any], writes: Sequence[Tuple[str, Any]], task_id: str) -> None:
+        await asyncio.to_thread(self.put_writes, config, writes, task_id)
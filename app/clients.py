@@ -0,0 +1,43 @@
+"""
+VIBE CODER - SHARED CLIENTS
+One lazily-built Firestore client per process, shared by the graph, the checkpointer and the tools.
+Both the client and the chat-model constructor can be swapped before `app.chain` is imported
+(benchmarks run the real graph against in-memory stand-ins this way).
+"""
+
+import os
+import threading
+
+PROJECT_ID = os.environ.get("GCP_PROJECT", "vibe-agent-final")
+
+_db = None
+_chat_model_factory = None
+_lock = threading.Lock()
+
+
+def get_db():
+    """Returns the process-wide Firestore client, creating it on first use."""
+    global _db
+    if _db is None:
+        with _lock:
+            if _db is None:
+                from google.cloud import firestore
+                _db = firestore.Client(project=PROJECT_ID)
+    return _db
+
+
+def set_db(client) -> None:
+    """Installs a client (e.g. an in-memory stand-in) before anything asks for one."""
+    global _db
+    with _lock:
+        _db = client
+
+
+def set_chat_model_factory(factory) -> None:
+    """Installs `factory(cls, **kwargs)`, called instead of `cls(**kwargs)` for every chat model app.chain builds."""
+    global _chat_model_factory
+    _chat_model_factory = factory
+
+
+def chat_model(cls, **kwargs):
+    return _chat_model_factory(cls, **kwargs) if _chat_model_factory is not None else cls(**kwargs)
@@ -0,0 +1,68 @@
+"""
+VIBE CODER - PARALLEL DELEGATION
+Lets one supervisor step run several independent worker tasks at once.
+
+- The supervisor answers `delegate_parallel` with a list of delegations; the graph fans them out
+  with LangGraph `Send` to a `worker_task` node, so they run in the same superstep.
+- Each task appends its report to the `reports` channel (`merge_reports` reducer); a join node
+  folds them into one "PARALLEL REPORTS" message for the supervisor and clears the channel.
+- `WorkerLimiter` caps concurrent tasks per worker (WORKER_CONCURRENCY, default 2), across sync and
+  async nodes (app/slots.py). Writes to the same path are serialized separately by the file tools
+  (`file_ops.locked`).
+"""
+
+import threading
+from contextlib import asynccontextmanager, contextmanager
+from typing import AsyncIterator, Dict, Iterator, List, Optional
+
+from app.slots import Slots
+
+REPORT_PREFIX = "PARALLEL REPORTS"
+WORKER_LABELS = {"technical_architect": "ARCHITECT REPORT", "head_of_frontend": "FRONTEND REPORT"}
+
+
+def merge_reports(left: Optional[List[Dict[str, str]]], right: Optional[List[Dict[str, str]]]) -> List[Dict[str, str]]:
+    """State reducer for the `reports` channel; an update of None clears it."""
+    if right is None:
+        return []
+    return list(left or []) + list(right)
+
+
+def combine_reports(reports: List[Dict[str, str]]) -> str:
+    """One message with a section per task, in a stable worker order."""
+    order = list(WORKER_LABELS)
+    ordered = sorted(reports, key=lambda r: order.index(r["worker"]) if r["worker"] in order else len(order))
+    sections = [f"{WORKER_LABELS.get(r['worker'], r['worker'].upper())}:\n{r['content']}" for r in ordered]
+    return f"{REPORT_PREFIX}:\n\n" + "\n\n".join(sections)
+
+
+class WorkerLimiter:
+    def __init__(self, limit: int = 2):
+        self.limit = max(1, limit)
+        self._semaphores: Dict[str, Slots] = {}
+        self._lock = threading.Lock()
+
+    def _semaphore(self, worker: str) -> Slots:
+        with self._lock:
+            if worker not in self._semaphores:
+                self._semaphores[worker] = Slots(self.limit)
+            return self._semaphores[worker]
+
+    @contextmanager
+    def slot(self, worker: str) -> Iterator[None]:
+        semaphore = self._semaphore(worker)
+        semaphore.acquire()
+        try:
+            yield
+        finally:
+            semaphore.release()
+
+    @asynccontextmanager
+    async def aslot(self, worker: str) -> AsyncIterator[None]:
+        # Awaits the slot without holding a thread; shares the limit with `slot()` callers.
+        semaphore = self._semaphore(worker)
+        await semaphore.aacquire()
+        try:
+            yield
+        finally:
+            semaphore.release()
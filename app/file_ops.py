@@ -0,0 +1,255 @@
+"""
+VIBE CODER - ATOMIC FILE CHANGES
+Backs the `write_files` and `apply_patch` tools.
+
+- Every change is computed in memory first; if any patch does not apply, nothing is written.
+- New contents go to temp files next to their targets, then each is `os.replace`d into place.
+  If a rename fails part way, the files already replaced are restored from backups.
+- `locked(paths)` serializes writers of the same paths, so workers running in parallel can't
+  interleave a read-modify-write on one file.
+- Patches: unified diffs (`--- a/x` / `+++ b/x` / `@@` hunks, /dev/null to create or delete) or
+  search/replace blocks:
+      path/to/file
+      <<<<<<< SEARCH
+      old text
+      =======
+      new text
+      >>>>>>> REPLACE
+"""
+
+import os
+import re
+import shutil
+import tempfile
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+DELETE = None  # sentinel content meaning "remove this file"
+_HUNK = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+
+
+class PatchError(ValueError):
+    pass
+
+
+# --- PATCH PARSING ---
+def _strip_prefix(path: str) -> str:
+    path = path.strip().split("\t", 1)[0]
+    return path[2:] if path.startswith(("a/", "b/")) else path
+
+
+def _apply_hunks(path: str, original: str, hunks: List[Tuple[int, List[str]]]) -> str:
+    lines = original.splitlines(keepends=True)
+    offset = 0
+    for start, body in hunks:
+        old = [l[1:] for l in body if l[:1] in (" ", "-")]
+        new = [l[1:] for l in body if l[:1] in (" ", "+")]
+        at = max(0, start - 1 + offset)
+        if lines[at:at + len(old)] != old:
+            # The line numbers may be stale; look for the unique exact context anywhere.
+            hits = [i for i in range(len(lines) - len(old) + 1) if lines[i:i + len(old)] == old]
+            if len(hits) != 1:
+                raise PatchError(f"{path}: hunk @@ -{start} does not apply ({'ambiguous' if hits else 'context not found'})")
+            at = hits[0]
+        lines[at:at + len(old)] = new
+        offset += len(new) - len(old)
+    return "".join(lines)
+
+
+def _file_header(lines: List[str], i: int) -> bool:
+    return lines[i].startswith("--- ") and i + 1 < len(lines) and lines[i + 1].startswith("+++ ")
+
+
+def parse_unified_diff(patch: str) -> List[Tuple[Optional[str], Optional[str], List[Tuple[int, List[str]]]]]:
+    """[(source path, target path, hunks)]; None stands for /dev/null (create / delete)."""
+    files, lines, i = [], patch.splitlines(keepends=True), 0
+    while i < len(lines):
+        if not _file_header(lines, i):
+            i += 1
+            continue
+        source, target = lines[i][4:].strip(), lines[i + 1][4:].strip()
+        i += 2
+        hunks = []
+        while i < len(lines) and not lines[i].startswith("--- "):
+            match = _HUNK.match(lines[i])
+            if not match:
+                i += 1
+                continue
+            start, body = int(match.group(1)), []
+            # The @@ counts say where the hunk ends: a removed "-- " line or a blank context line
+            # must not end it early.
+            old_left = int(match.group(2)) if match.group(2) is not None else 1
+            new_left = int(match.group(4)) if match.group(4) is not None else 1
+            i += 1
+            while old_left > 0 or new_left > 0:
+                if i >= len(lines):
+                    raise PatchError(f"{target}: hunk @@ -{start} ends early ({old_left} old / {new_left} new lines missing)")
+                line = lines[i]
+                i += 1
+                if line.startswith("\\"):  # "\ No newline at end of file"
+                    continue
+                if line.rstrip("\r\n") == "":
+                    line = " \n"  # editors and models drop the space of blank context lines
+                kind = line[:1]
+                if kind not in (" ", "-", "+"):
+                    raise PatchError(f"{target}: hunk @@ -{start} has an unexpected line: {line.rstrip()!r}")
+                old_left -= kind in (" ", "-")
+                new_left -= kind in (" ", "+")
+                if old_left < 0 or new_left < 0:
+                    raise PatchError(f"{target}: hunk @@ -{start} has more lines than its @@ counts")
+                body.append(line if line.endswith("\n") else line + "\n")
+            while i < len(lines) and lines[i].startswith("\\"):
+                i += 1
+            if i < len(lines) and lines[i][:1] in (" ", "-", "+") and not _file_header(lines, i):
+                raise PatchError(f"{target}: hunk @@ -{start} has more lines than its @@ counts")
+            hunks.append((start, body))
+        files.append((
+            None if source.startswith("/dev/null") else _strip_prefix(source),
+            None if target.startswith("/dev/null") else _strip_prefix(target),
+            hunks,
+        ))
+    return files
+
+
+_BLOCK = re.compile(r"^(?P<path>[^\n]+?)\n<<<<<<< SEARCH\n(?P<search>.*?)^=======\n(?P<replace>.*?)^>>>>>>> REPLACE\n?", re.DOTALL | re.MULTILINE)
+
+
+def parse_search_replace(patch: str) -> List[Tuple[str, str, str]]:
+    return [(m.group("path").strip().strip("`"), m.group("search"), m.group("replace")) for m in _BLOCK.finditer(patch)]
+
+
+def _read(path: str) -> Optional[str]:
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def plan_patch(patch: str) -> Dict[str, Optional[str]]:
+    """path -> new content (or DELETE). Raises PatchError if any part does not apply."""
+    planned: Dict[str, Optional[str]] = {}
+
+    def current(path: str) -> Optional[str]:
+        return planned[path] if path in planned else _read(path)
+
+    blocks = parse_search_replace(patch)
+    if blocks:
+        for path, search, replace in blocks:
+            text = current(path)
+            if search == "":
+                if text is not None and text != "":
+                    raise PatchError(f"{path}: empty SEARCH only creates new files, but the file exists")
+                planned[path] = replace
+                continue
+            if text is None:
+                raise PatchError(f"{path}: file not found")
+            count = text.count(search)
+            if count != 1:
+                raise PatchError(f"{path}: SEARCH block {'not found' if count == 0 else f'matches {count} times'}")
+            planned[path] = text.replace(search, replace, 1)
+        return planned
+
+    diffs = parse_unified_diff(patch)
+    if not diffs:
+        raise PatchError("No unified diff or SEARCH/REPLACE blocks found in patch")
+    for source, target, hunks in diffs:
+        if target is None:
+            if source is None or current(source) is None:
+                raise PatchError(f"{source}: cannot delete, file not found")
+            planned[source] = DELETE
+            continue
+        text = "" if source is None else current(source)
+        if text is None:
+            raise PatchError(f"{source}: file not found")
+        planned[target] = _apply_hunks(target, text, hunks)
+    return planned
+
+
+def patch_paths(patch: str) -> List[str]:
+    """Every path a patch touches, without reading any file."""
+    blocks = parse_search_replace(patch)
+    if blocks:
+        return sorted({path for path, _, _ in blocks})
+    return sorted({path for source, target, _ in parse_unified_diff(patch) for path in (source, target) if path})
+
+
+# --- PER-PATH LOCKS ---
+_path_locks: Dict[str, threading.Lock] = {}
+_path_locks_guard = threading.Lock()
+
+
+@contextmanager
+def locked(paths: Iterable[str]) -> Iterator[None]:
+    """Holds one lock per path; always taken in sorted order, so two batches can't deadlock."""
+    keys = sorted({os.path.abspath(p) for p in paths})
+    with _path_locks_guard:
+        locks = [_path_locks.setdefault(key, threading.Lock()) for key in keys]
+    for lock in locks:
+        lock.acquire()
+    try:
+        yield
+    finally:
+        for lock in reversed(locks):
+            lock.release()
+
+
+# --- ATOMIC COMMIT ---
+def commit(changes: Dict[str, Optional[str]]) -> List[str]:
+    """Writes every change or none of them. Returns one result line per file."""
+    staged: List[Tuple[str, Optional[str]]] = []
+    backups: Dict[str, Optional[str]] = {}
+    try:
+        for path, content in changes.items():
+            if content is DELETE:
+                staged.append((path, None))
+                continue
+            directory = os.path.dirname(path) or "."
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".vibe-", suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(content)
+            if os.path.exists(path):
+                shutil.copymode(path, tmp_path)
+            staged.append((path, tmp_path))
+    except Exception:
+        for _, tmp_path in staged:
+            if tmp_path and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        raise
+
+    results = []
+    try:
+        for path, tmp_path in staged:
+            if os.path.exists(path):
+                fd, backup = tempfile.mkstemp(dir=os.path.dirname(path) or ".", prefix=".vibe-", suffix=".bak")
+                os.close(fd)
+                try:
+                    shutil.copy2(path, backup)
+                except Exception:
+                    os.remove(backup)  # not tracked yet, so the rollback below wouldn't see it
+                    raise
+                backups[path] = backup
+            else:
+                backups[path] = None
+            if tmp_path is None:
+                os.remove(path)
+                results.append(f"{path}: deleted")
+            else:
+                os.replace(tmp_path, path)
+                results.append(f"{path}: {'updated' if backups[path] else 'created'} ({len(changes[path])} chars)")
+    except Exception:
+        for path, backup in backups.items():
+            if backup is None:
+                if os.path.exists(path):
+                    os.remove(path)
+            else:
+                os.replace(backup, path)
+        for _, tmp_path in staged:
+            if tmp_path and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        raise
+    for backup in backups.values():
+        if backup and os.path.exists(backup):
+            os.remove(backup)
+    return results
@@ -0,0 +1,96 @@
+"""
+VIBE CODER - SUPERVISOR HISTORY BUDGET
+Keeps the supervisor's prompt bounded as a project goes on.
+
+- The last `keep_last` messages are always sent verbatim.
+- Older worker reports ("ARCHITECT REPORT" / "FRONTEND REPORT") are replaced by a short summary
+  written by the cheap model. Summaries are keyed by message id and returned to the caller, which
+  stores them in the graph state (so they are checkpointed and computed once per report).
+- If the history is still over `max_tokens`, the oldest messages are dropped.
+"""
+
+import asyncio
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+
+REPORT_PREFIXES = ("ARCHITECT REPORT", "FRONTEND REPORT", "PARALLEL REPORTS")
+WORKER_NAMES = ("Architect", "Frontend", "Workers")
+
+SUMMARY_PROMPT = (
+    "Summarize this report from a worker agent for the project manager in at most 120 words. "
+    "Keep file paths, decisions, blockers and anything the user must confirm. No preamble.\n\n{report}"
+)
+
+
+def approx_tokens(text: str) -> int:
+    """~4 characters per token; good enough for budgeting without a tokenizer round trip."""
+    return len(text) // 4 + 1
+
+
+def count_tokens(messages: Sequence[BaseMessage], counter: Callable[[str], int] = approx_tokens) -> int:
+    return sum(counter(str(m.content)) + 4 for m in messages)
+
+
+def is_worker_report(msg: BaseMessage) -> bool:
+    return isinstance(msg, HumanMessage) and (
+        msg.name in WORKER_NAMES or str(msg.content).startswith(REPORT_PREFIXES)
+    )
+
+
+def merge_summaries(left: Optional[Dict[str, str]], right: Optional[Dict[str, str]]) -> Dict[str, str]:
+    """State reducer for the `summaries` channel."""
+    return {**(left or {}), **(right or {})}
+
+
+class HistoryBudget:
+    def __init__(self, summarizer: Any, *, max_tokens: int = 32_000, keep_last: int = 8, min_report_tokens: int = 200, counter: Callable[[str], int] = approx_tokens):
+        self.summarizer = summarizer
+        self.max_tokens = max_tokens
+        self.keep_last = keep_last
+        self.min_report_tokens = min_report_tokens
+        self.counter = counter
+
+    def _pending(self, messages: Sequence[BaseMessage], summaries: Dict[str, str]) -> List[BaseMessage]:
+        """Older reports that are worth summarizing and don't have a cached summary yet."""
+        older = messages[:-self.keep_last] if self.keep_last else messages
+        return [
+            m for m in older
+            if is_worker_report(m) and m.id and m.id not in summaries
+            and self.counter(str(m.content)) >= self.min_report_tokens
+        ]
+
+    def _apply(self, messages: Sequence[BaseMessage], summaries: Dict[str, str]) -> List[BaseMessage]:
+        cutoff = len(messages) - self.keep_last
+        compacted = []
+        for i, msg in enumerate(messages):
+            if i < cutoff and msg.id in summaries:
+                label = str(msg.content).split(":", 1)[0] if str(msg.content).startswith(REPORT_PREFIXES) else "WORKER REPORT"
+                compacted.append(HumanMessage(content=f"{label} (summary):\n{summaries[msg.id]}", name=msg.name, id=msg.id))
+            else:
+                compacted.append(msg)
+        # Still over budget: drop the oldest, but never start the prompt on a model turn.
+        while len(compacted) > self.keep_last and count_tokens(compacted, self.counter) > self.max_tokens:
+            compacted.pop(0)
+            while compacted and isinstance(compacted[0], AIMessage) and len(compacted) > 1:
+                compacted.pop(0)
+        return compacted
+
+    @staticmethod
+    def _text(result: Any) -> str:
+        return str(getattr(result, "content", result)).strip()
+
+    def prepare(self, messages: Sequence[BaseMessage], summaries: Optional[Dict[str, str]] = None) -> Tuple[List[BaseMessage], Dict[str, str]]:
+        """Returns (messages for the prompt, summaries newly computed on this call)."""
+        summaries = dict(summaries or {})
+        new = {m.id: self._text(self.summarizer.invoke(SUMMARY_PROMPT.format(report=m.content))) for m in self._pending(messages, summaries)}
+        summaries.update(new)
+        return self._apply(messages, summaries), new
+
+    async def aprepare(self, messages: Sequence[BaseMessage], summaries: Optional[Dict[str, str]] = None) -> Tuple[List[BaseMessage], Dict[str, str]]:
+        summaries = dict(summaries or {})
+        pending = self._pending(messages, summaries)
+        results = await asyncio.gather(*(self.summarizer.ainvoke(SUMMARY_PROMPT.format(report=m.content)) for m in pending))
+        new = {m.id: self._text(r) for m, r in zip(pending, results)}
+        summaries.update(new)
+        return self._apply(messages, summaries), new
@@ -0,0 +1,312 @@
+"""
+VIBE CODER - METRICS
+Latency, token and payload instrumentation, exported in the Prometheus text format on /metrics
+(app/server.py). No client library needed.
+
+- Graph nodes: `instrument_node(name)` wraps a node body (sync or async).
+- LLM calls and tools: `callback_handler` is attached to llm_flash / llm_pro and to every tool, and
+  records latency, prompt / completion tokens, estimated cost and payload sizes per model / tool.
+- Checkpointer: `instrument_checkpointer(layer, op)` wraps get_tuple / put (cache and Firestore
+  layers separately); `record_checkpoint_bytes` adds the serialized size of each write.
+- Existing `stats()` dicts (checkpoint cache, router, board writer, response cache) are exported
+  as gauges through `register_stats`.
+
+OTEL_ENABLED=1 also opens an OpenTelemetry span per node / LLM call / tool / checkpointer call
+(needs opentelemetry-api; exporters are configured the usual OTel way).
+"""
+
+import functools
+import inspect
+import os
+import threading
+import time
+from contextlib import nullcontext
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+BYTES_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+# USD per 1M tokens (input, output), list prices; matched by model-name prefix.
+MODEL_PRICES = {
+    "gemini-2.5-pro": (1.25, 10.0),
+    "gemini-2.5-flash": (0.30, 2.50),
+}
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+# --- REGISTRY ---
+class Counter:
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name, self.help, self.label_names = name, help, tuple(labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels: str, value: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        lines += [f"{self.name}{_labels(self.label_names, key)} {value}" for key, value in items]
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = SECONDS_BUCKETS):
+        self.name, self.help, self.label_names = name, help, tuple(labels)
+        self.buckets = tuple(buckets)
+        self._values: Dict[Tuple[str, ...], List[float]] = {}  # per bucket counts + [sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str) -> None:
+        with self._lock:
+            row = self._values.setdefault(labels, [0.0] * (len(self.buckets) + 2))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    row[i] += 1
+            row[-2] += value
+            row[-1] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((key, list(row)) for key, row in self._values.items())
+        bounds = [f'le="{bound}"' for bound in self.buckets] + ['le="+Inf"']
+        for key, row in items:
+            for le, count in zip(bounds, row[:-2] + [row[-1]]):
+                lines.append(f"{self.name}_bucket{_labels(self.label_names, key, le)} {count:g}")
+            lines.append(f"{self.name}_sum{_labels(self.label_names, key)} {row[-2]}")
+            lines.append(f"{self.name}_count{_labels(self.label_names, key)} {row[-1]:g}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: List[Any] = []
+        self._stats: Dict[str, Callable[[], Dict[str, Any]]] = {}
+
+    def counter(self, name: str, help: str, labels: Sequence[str] = ()) -> Counter:
+        metric = Counter(name, help, labels)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = SECONDS_BUCKETS) -> Histogram:
+        metric = Histogram(name, help, labels, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def register_stats(self, component: str, stats: Callable[[], Dict[str, Any]]) -> None:
+        """Exports the numeric values of a component's stats() dict as gauges vibe_<component>_<key>."""
+        self._stats[component] = stats
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines += metric.render()
+        for component, stats in sorted(self._stats.items()):
+            try:
+                values = stats()
+            except Exception as e:
+                lines.append(f"# {component} stats unavailable: {_escape(e)}")
+                continue
+            for key, value in sorted(values.items()):
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    name = f"vibe_{component}_{key}"
+                    lines += [f"# TYPE {name} gauge", f"{name} {value}"]
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+register_stats = REGISTRY.register_stats
+
+NODE_SECONDS = REGISTRY.histogram("vibe_node_seconds", "Graph node latency.", ["node"])
+NODE_ERRORS = REGISTRY.counter("vibe_node_errors_total", "Graph node exceptions.", ["node"])
+LLM_SECONDS = REGISTRY.histogram("vibe_llm_seconds", "LLM call latency.", ["model"])
+LLM_ERRORS = REGISTRY.counter("vibe_llm_errors_total", "Failed LLM calls.", ["model"])
+LLM_TOKENS = REGISTRY.counter("vibe_llm_tokens_total", "LLM tokens by kind (prompt / completion).", ["model", "kind"])
+LLM_COST = REGISTRY.counter("vibe_llm_cost_usd_total", "Estimated LLM spend from list prices.", ["model"])
+LLM_BYTES = REGISTRY.histogram("vibe_llm_payload_bytes", "LLM prompt / completion size in characters.", ["model", "direction"], BYTES_BUCKETS)
+TOOL_SECONDS = REGISTRY.histogram("vibe_tool_seconds", "Tool call latency.", ["tool"])
+TOOL_ERRORS = REGISTRY.counter("vibe_tool_errors_total", "Tool calls that raised or returned an error.", ["tool"])
+TOOL_BYTES = REGISTRY.histogram("vibe_tool_payload_bytes", "Tool input / output size in characters.", ["tool", "direction"], BYTES_BUCKETS)
+CHECKPOINT_SECONDS = REGISTRY.histogram("vibe_checkpointer_seconds", "Checkpointer call latency.", ["layer", "op"])
+CHECKPOINT_BYTES = REGISTRY.histogram("vibe_checkpointer_payload_bytes", "Serialized checkpoint size per write.", ["layer", "op"], BYTES_BUCKETS)
+
+
+# --- OPENTELEMETRY (optional) ---
+_tracer = None
+if os.environ.get("OTEL_ENABLED", "0") == "1":
+    try:
+        from opentelemetry import trace
+        _tracer = trace.get_tracer("vibe-coder")
+    except ImportError:
+        print("OTEL_ENABLED=1 but opentelemetry-api is not installed; spans disabled.")
+
+
+def span(name: str, **attributes: Any):
+    if _tracer is None:
+        return nullcontext()
+    return _tracer.start_as_current_span(name, attributes={k: str(v) for k, v in attributes.items()})
+
+
+# --- WRAPPERS ---
+def _timed(observe: Callable[[float, bool], None], span_name: str, attributes: Dict[str, Any]):
+    """Decorator for a sync or async callable: observe(seconds, failed) after every call."""
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                start, failed = time.perf_counter(), True
+                try:
+                    with span(span_name, **attributes):
+                        result = await func(*args, **kwargs)
+                    failed = False
+                    return result
+                finally:
+                    observe(time.perf_counter() - start, failed)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start, failed = time.perf_counter(), True
+            try:
+                with span(span_name, **attributes):
+                    result = func(*args, **kwargs)
+                failed = False
+                return result
+            finally:
+                observe(time.perf_counter() - start, failed)
+        return wrapper
+    return decorator
+
+
+def instrument_node(name: str):
+    def observe(seconds: float, failed: bool) -> None:
+        NODE_SECONDS.observe(seconds, name)
+        if failed:
+            NODE_ERRORS.inc(name)
+    return _timed(observe, f"node {name}", {"node": name})
+
+
+def instrument_checkpointer(layer: str, op: str):
+    return _timed(lambda seconds, failed: CHECKPOINT_SECONDS.observe(seconds, layer, op), f"checkpointer {layer}.{op}", {"layer": layer, "op": op})
+
+
+def record_checkpoint_bytes(layer: str, op: str, size: int) -> None:
+    CHECKPOINT_BYTES.observe(size, layer, op)
+
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    for prefix, (input_price, output_price) in MODEL_PRICES.items():
+        if model.startswith(prefix):
+            return (prompt_tokens * input_price + completion_tokens * output_price) / 1_000_000
+    return 0.0
+
+
+def _usage(response: Any) -> Tuple[int, int]:
+    """(prompt, completion) tokens from an LLMResult: message usage_metadata, else the provider's llm_output."""
+    prompt = completion = 0
+    for generations in response.generations:
+        for generation in generations:
+            usage = getattr(getattr(generation, "message", None), "usage_metadata", None) or {}
+            prompt += usage.get("input_tokens", 0)
+            completion += usage.get("output_tokens", 0)
+    if not (prompt or completion):
+        usage = (response.llm_output or {}).get("usage_metadata") or {}
+        prompt = usage.get("prompt_token_count", 0)
+        completion = usage.get("candidates_token_count", 0)
+    return prompt, completion
+
+
+class MetricsCallbackHandler(BaseCallbackHandler):
+    """Times LLM and tool runs by run_id. Runs inline: it only touches counters."""
+
+    run_inline = True
+
+    def __init__(self):
+        self._runs: Dict[UUID, Tuple[str, str, float, Any]] = {}  # run_id -> (kind, label, start, span)
+        self._lock = threading.Lock()
+
+    def _start(self, run_id: UUID, kind: str, label: str) -> None:
+        otel_span = _tracer.start_span(f"{kind} {label}", attributes={kind: label}) if _tracer is not None else None
+        with self._lock:
+            self._runs[run_id] = (kind, label, time.perf_counter(), otel_span)
+
+    def _end(self, run_id: UUID) -> Optional[Tuple[str, float]]:
+        with self._lock:
+            run = self._runs.pop(run_id, None)
+        if run is None:
+            return None
+        kind, label, start, otel_span = run
+        if otel_span is not None:
+            otel_span.end()
+        return label, time.perf_counter() - start
+
+    # LLM
+    def on_chat_model_start(self, serialized: Dict[str, Any], messages: List[List[Any]], *, run_id: UUID, metadata: Optional[Dict[str, Any]] = None, **kwargs: Any) -> None:
+        model = (metadata or {}).get("ls_model_name") or (serialized or {}).get("kwargs", {}).get("model_name") or "unknown"
+        self._start(run_id, "llm", model)
+        LLM_BYTES.observe(sum(len(str(m.content)) for batch in messages for m in batch), model, "prompt")
+
+    def on_llm_end(self, response: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        ended = self._end(run_id)
+        if ended is None:
+            return
+        model, seconds = ended
+        LLM_SECONDS.observe(seconds, model)
+        prompt, completion = _usage(response)
+        LLM_TOKENS.inc(model, "prompt", value=prompt)
+        LLM_TOKENS.inc(model, "completion", value=completion)
+        LLM_COST.inc(model, value=estimate_cost(model, prompt, completion))
+        LLM_BYTES.observe(sum(len(g.text) for batch in response.generations for g in batch), model, "completion")
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        ended = self._end(run_id)
+        if ended is not None:
+            LLM_SECONDS.observe(ended[1], ended[0])
+            LLM_ERRORS.inc(ended[0])
+
+    # TOOLS
+    def on_tool_start(self, serialized: Dict[str, Any], input_str: str, *, run_id: UUID, **kwargs: Any) -> None:
+        tool = (serialized or {}).get("name") or kwargs.get("name") or "unknown"
+        self._start(run_id, "tool", tool)
+        TOOL_BYTES.observe(len(input_str or ""), tool, "input")
+
+    def on_tool_end(self, output: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        ended = self._end(run_id)
+        if ended is None:
+            return
+        tool, seconds = ended
+        text = str(getattr(output, "content", output))
+        TOOL_SECONDS.observe(seconds, tool)
+        TOOL_BYTES.observe(len(text), tool, "output")
+        if text.startswith("Error"):  # the tools report failures as text rather than raising
+            TOOL_ERRORS.inc(tool)
+
+    def on_tool_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        ended = self._end(run_id)
+        if ended is not None:
+            TOOL_SECONDS.observe(ended[1], ended[0])
+            TOOL_ERRORS.inc(ended[0])
+
+
+callback_handler = MetricsCallbackHandler()
+
+
+def render() -> str:
+    return REGISTRY.render()
@@ -0,0 +1,278 @@
+"""
+VIBE CODER - RESPONSE CACHE
+Optional LLM response cache, plugged into the models through LangChain's `cache=` hook.
+
+- Exact layer: key = sha256(normalized message list + model params). Normalizing drops message /
+  tool-call ids and response / usage metadata, so the same discovery prompt hits across threads.
+  Content is hashed verbatim (whitespace matters in code, diffs and Markdown).
+- Similarity layer (opt-in): same conversation prefix + a last message whose local hashed
+  bag-of-words embedding is within `similarity` cosine of a cached one.
+- TTL on every entry, LRU bound per backend. Backends: in-memory, SQLite, Firestore.
+- `stats()` counts exact hits, similar hits, misses, expired entries and writes.
+
+Enabled with RESPONSE_CACHE=memory | sqlite:<path> | firestore (default: off).
+"""
+
+import hashlib
+import json
+import math
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from langchain_core._api import suppress_langchain_beta_warning
+from langchain_core.caches import BaseCache
+from langchain_core.load import dumps, loads
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+# --- NORMALIZATION ---
+def _strip_ids(value: Any) -> Any:
+    """Drops per-run noise: string ids (message / tool-call uuids; the lc class path "id" is a list) and metadata."""
+    if isinstance(value, dict):
+        return {
+            k: _strip_ids(v) for k, v in value.items()
+            if not (k == "id" and not isinstance(v, list)) and k not in ("response_metadata", "usage_metadata")
+        }
+    if isinstance(value, list):
+        return [_strip_ids(v) for v in value]
+    return value
+
+
+def normalize_prompt(prompt: str) -> Tuple[str, str]:
+    """(normalized prefix, text of the last message) for a LangChain cache prompt (a dumps()'d message list)."""
+    try:
+        messages = json.loads(prompt)
+    except ValueError:
+        return "", prompt
+    if not isinstance(messages, list) or not messages:
+        return json.dumps(_strip_ids(messages), sort_keys=True), ""
+    normalized = _strip_ids(messages)
+    last = normalized[-1]
+    if not isinstance(last, dict) or not isinstance(last.get("kwargs"), dict):
+        return json.dumps(normalized, sort_keys=True), ""
+    content = last["kwargs"].get("content", "")
+    # The prefix keeps the last message's shape (type, name, tool calls) so only its text is fuzzy.
+    shape = {**last, "kwargs": {**last["kwargs"], "content": ""}}
+    text = content if isinstance(content, str) else json.dumps(content, sort_keys=True)
+    return json.dumps(normalized[:-1] + [shape], sort_keys=True), text
+
+
+def _hash(*parts: str) -> str:
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+def hashed_embedding(text: str, dims: int = 512) -> List[float]:
+    """Local, dependency-free embedding: feature-hashed word unigrams + bigrams, L2 normalized."""
+    words = _WORD.findall(text.lower())
+    vector = [0.0] * dims
+    for token in words + [f"{a} {b}" for a, b in zip(words, words[1:])]:
+        digest = hashlib.md5(token.encode("utf-8")).digest()
+        vector[int.from_bytes(digest[:4], "little") % dims] += 1.0 if digest[4] & 1 else -1.0
+    norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+    return [v / norm for v in vector]
+
+
+# --- BACKENDS ---
+class InMemoryBackend:
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._data: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Tuple[str, float]]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                self._data.move_to_end(key)
+            return entry
+
+    def set(self, key: str, payload: str, expires_at: float) -> None:
+        with self._lock:
+            self._data[key] = (payload, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+class SQLiteBackend:
+    def __init__(self, path: str, max_entries: int = 10_000):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS response_cache (key TEXT PRIMARY KEY, payload TEXT, expires_at REAL, last_used REAL)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[Tuple[str, float]]:
+        with self._lock:
+            row = self._conn.execute("SELECT payload, expires_at FROM response_cache WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                self._conn.execute("UPDATE response_cache SET last_used = ? WHERE key = ?", (time.time(), key))
+                self._conn.commit()
+            return row
+
+    def set(self, key: str, payload: str, expires_at: float) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO response_cache (key, payload, expires_at, last_used) VALUES (?, ?, ?, ?)",
+                (key, payload, expires_at, time.time()),
+            )
+            self._conn.execute(
+                "DELETE FROM response_cache WHERE key IN (SELECT key FROM response_cache ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            self._conn.commit()
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM response_cache WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM response_cache")
+            self._conn.commit()
+
+
+class FirestoreBackend:
+    """Shared across instances. Set a Firestore TTL policy on `expires_at_ts` to have expired docs purged."""
+
+    def __init__(self, client: Any, collection: str = "llm_response_cache"):
+        self.client = client
+        self.collection = collection
+
+    def get(self, key: str) -> Optional[Tuple[str, float]]:
+        snap = self.client.collection(self.collection).document(key).get()
+        if not snap.exists:
+            return None
+        data = snap.to_dict()
+        return data["payload"], data["expires_at"]
+
+    def set(self, key: str, payload: str, expires_at: float) -> None:
+        from datetime import datetime, timezone
+        self.client.collection(self.collection).document(key).set({
+            "payload": payload,
+            "expires_at": expires_at,
+            "expires_at_ts": datetime.fromtimestamp(expires_at, tz=timezone.utc),
+        })
+
+    def delete(self, key: str) -> None:
+        self.client.collection(self.collection).document(key).delete()
+
+    def clear(self) -> None:
+        for snap in self.client.collection(self.collection).stream():
+            snap.reference.delete()
+
+
+# --- CACHE ---
+class ResponseCache(BaseCache):
+    def __init__(self, backend: Any = None, *, ttl_seconds: float = 24 * 3600, similarity: Optional[float] = None,
+                 embed: Callable[[str], List[float]] = hashed_embedding, max_index_entries: int = 2048):
+        self.backend = backend if backend is not None else InMemoryBackend()
+        self.ttl_seconds = ttl_seconds
+        self.similarity = similarity
+        self.embed = embed
+        self.max_index_entries = max_index_entries
+        # prefix key -> [(embedding, exact key)], only for entries written by this process.
+        self._index: "OrderedDict[str, List[Tuple[List[float], str]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.counters = {"exact_hits": 0, "similar_hits": 0, "misses": 0, "expired": 0, "writes": 0}
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self.counters[name] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self.counters)
+        lookups = counters["exact_hits"] + counters["similar_hits"] + counters["misses"]
+        counters["hit_rate"] = (counters["exact_hits"] + counters["similar_hits"]) / lookups if lookups else 0.0
+        return counters
+
+    def _keys(self, prompt: str, llm_string: str) -> Tuple[str, str, str]:
+        prefix, last = normalize_prompt(prompt)
+        prefix_key = _hash(prefix, llm_string)
+        return _hash(prefix_key, last), prefix_key, last
+
+    def _load(self, key: str) -> Optional[Sequence[Any]]:
+        entry = self.backend.get(key)
+        if entry is None:
+            return None
+        payload, expires_at = entry
+        if expires_at < time.time():
+            self.backend.delete(key)
+            self._count("expired")
+            return None
+        with suppress_langchain_beta_warning():  # `loads` is beta and warns on every call, i.e. every hit
+            return loads(payload)
+
+    def _nearest(self, prefix_key: str, last: str) -> Optional[str]:
+        vector = self.embed(last)
+        with self._lock:
+            candidates = list(self._index.get(prefix_key, []))
+        best, best_key = self.similarity, None
+        for other, key in candidates:
+            score = sum(a * b for a, b in zip(vector, other))
+            if score >= best:
+                best, best_key = score, key
+        return best_key
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[Sequence[Any]]:
+        key, prefix_key, last = self._keys(prompt, llm_string)
+        result = self._load(key)
+        if result is not None:
+            self._count("exact_hits")
+            return result
+        if self.similarity is not None and last:
+            near = self._nearest(prefix_key, last)
+            result = self._load(near) if near else None
+            if result is not None:
+                self._count("similar_hits")
+                return result
+        self._count("misses")
+        return None
+
+    def update(self, prompt: str, llm_string: str, return_val: Sequence[Any]) -> None:
+        key, prefix_key, last = self._keys(prompt, llm_string)
+        self.backend.set(key, dumps(list(return_val)), time.time() + self.ttl_seconds)
+        self._count("writes")
+        if self.similarity is not None and last:
+            with self._lock:
+                self._index.setdefault(prefix_key, []).append((self.embed(last), key))
+                self._index.move_to_end(prefix_key)
+                while sum(len(v) for v in self._index.values()) > self.max_index_entries:
+                    self._index.popitem(last=False)
+
+    def clear(self, **kwargs: Any) -> None:
+        self.backend.clear()
+        with self._lock:
+            self._index.clear()
+
+
+def build_response_cache(spec: Optional[str], *, client_factory: Optional[Callable[[], Any]] = None, ttl_seconds: float = 24 * 3600, similarity: Optional[float] = None) -> Optional[ResponseCache]:
+    """RESPONSE_CACHE spec -> cache: "memory", "sqlite:<path>", "firestore"; empty / "off" -> None."""
+    if not spec or spec == "off":
+        return None
+    if spec == "memory":
+        backend = InMemoryBackend()
+    elif spec.startswith("sqlite:"):
+        backend = SQLiteBackend(spec[len("sqlite:"):] or "/tmp/vibe_response_cache.db")
+    elif spec == "firestore":
+        backend = FirestoreBackend(client_factory())
+    else:
+        raise ValueError(f"Unknown RESPONSE_CACHE backend: {spec}")
+    return ResponseCache(backend, ttl_seconds=ttl_seconds, similarity=similarity)
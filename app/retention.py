@@ -0,0 +1,367 @@
+"""
+VIBE CODER - CHECKPOINT RETENTION
+Nothing used to delete checkpoints: every graph step adds a doc under the checkpoint collection, forever.
+
+Policy (per thread and namespace, newest first by checkpoint_id):
+- keep the last `keep_last` checkpoints (the head is always one of them),
+- plus the newest checkpoint of each UTC day for the last `daily_days` days,
+- threads whose head is older than `ttl_days` are deleted entirely (checkpoints, chunks, writes, heads, legacy docs).
+Everything else is superseded and deleted, chunk docs and pending writes included, in batches of up to 500 deletes.
+
+Delta chains: a kept delta needs its base and every delta before it.
+- The chains behind the recent window are kept as they are (the live writer keeps extending them).
+- An older kept daily snapshot is compacted instead: rewritten as a standalone base (doc + chunks in
+  one atomic batch), so the chain behind it can go. If that batch would be too big, its chain is kept.
+Legacy flat docs ({collection}/{thread_id}_{checkpoint_id}) go through the same policy; their ids
+sort before every per-thread checkpoint.
+
+Run it with `python -m app.retention [--dry-run]`, POST /admin/checkpoints/compact, or the background
+Compactor (every CHECKPOINT_COMPACT_INTERVAL seconds).
+
+CHECKPOINT_KEEP_LAST (default 20), CHECKPOINT_KEEP_DAILY_DAYS (default 7), CHECKPOINT_TTL_DAYS
+(default off), CHECKPOINT_COMPACT_INTERVAL (seconds, default 0 = no background thread).
+"""
+
+import os
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from app.checkpointer import BATCH_BYTES, CHECKPOINTS, HEADS, KIND_BASE, KIND_DELTA, PAYLOAD_FIELDS, WRITES, WRITES_MARKER, CustomFirestoreSaver
+
+COLLECTION = "custom_checkpoints"
+BATCH_LIMIT = 500
+# Projected on every scan, so listing a thread never downloads checkpoint payloads.
+INDEX_FIELDS = ["thread_id", "checkpoint_ns", "checkpoint_id", "kind", "chain", "created_at"] + [f"{f}_chunks" for f in PAYLOAD_FIELDS]
+WRITE_FIELDS = ["checkpoint_id", "task_id", "idx", "value_chunks"]
+
+
+def _created(entry: Dict[str, Any]) -> Optional[datetime]:
+    value = entry.get("created_at")
+    if not isinstance(value, datetime):
+        return None
+    return value if value.tzinfo is not None else value.replace(tzinfo=timezone.utc)
+
+
+class RetentionPolicy:
+    def __init__(self, keep_last: int = 20, daily_days: int = 7, ttl_days: Optional[float] = None):
+        self.keep_last = max(1, keep_last)
+        self.daily_days = max(0, daily_days)
+        self.ttl_days = ttl_days
+
+    @classmethod
+    def from_env(cls) -> "RetentionPolicy":
+        ttl = os.environ.get("CHECKPOINT_TTL_DAYS")
+        return cls(
+            keep_last=int(os.environ.get("CHECKPOINT_KEEP_LAST", "20")),
+            daily_days=int(os.environ.get("CHECKPOINT_KEEP_DAILY_DAYS", "7")),
+            ttl_days=float(ttl) if ttl else None,
+        )
+
+    def expired(self, newest: Optional[datetime], now: datetime) -> bool:
+        return self.ttl_days is not None and newest is not None and newest < now - timedelta(days=self.ttl_days)
+
+    def select(self, entries: List[Dict[str, Any]], now: datetime) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Splits one namespace's entries (newest first) into (recent window, daily snapshots) to keep."""
+        recent = entries[:self.keep_last]
+        days = {_created(e).date() for e in recent if _created(e) is not None}
+        cutoff = now - timedelta(days=self.daily_days)
+        daily = []
+        for entry in entries[self.keep_last:]:
+            created = _created(entry)
+            if created is None or created < cutoff or created.date() in days:
+                continue
+            days.add(created.date())
+            daily.append(entry)
+        return recent, daily
+
+    def describe(self) -> Dict[str, Any]:
+        return {"keep_last": self.keep_last, "daily_days": self.daily_days, "ttl_days": self.ttl_days}
+
+
+class _BatchDeleter:
+    """Queues deletes and commits them BATCH_LIMIT at a time (nothing is written on a dry run)."""
+
+    def __init__(self, client, dry_run: bool):
+        self.client = client
+        self.dry_run = dry_run
+        self._batch = None
+        self._pending = 0
+        self.commits = 0
+
+    def delete(self, ref) -> None:
+        if self.dry_run:
+            return
+        if self._batch is None:
+            self._batch = self.client.batch()
+        self._batch.delete(ref)
+        self._pending += 1
+        if self._pending >= BATCH_LIMIT:
+            self.flush()
+
+    def flush(self) -> None:
+        if self._batch is not None and self._pending:
+            self._batch.commit()
+            self.commits += 1
+        self._batch, self._pending = None, 0
+
+
+class Compactor:
+    def __init__(self, saver: CustomFirestoreSaver, policy: Optional[RetentionPolicy] = None, interval: float = 0.0):
+        self.saver = saver
+        self.client = saver.client
+        self.policy = policy or RetentionPolicy()
+        self.interval = interval
+        self._run_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.counters = {"runs": 0, "failures": 0, "deleted": 0, "chunks_deleted": 0, "writes_deleted": 0, "compacted": 0, "threads_expired": 0, "commits": 0}
+        self.last_run: Optional[Dict[str, Any]] = None
+
+    # --- SCAN ---
+    def _scan(self, thread_ids: Optional[Iterable[str]]) -> Dict[str, Dict[str, List[Dict[str, Any]]]]:
+        """thread_id -> {"heads": [...], "legacy": [...]}, from projected reads only."""
+        threads: Dict[str, Dict[str, List[Dict[str, Any]]]] = defaultdict(lambda: {"heads": [], "legacy": []})
+        legacy = self.client.collection(self.saver.collection)
+        if thread_ids is not None:
+            for thread_id in thread_ids:
+                threads[thread_id]["heads"].extend(
+                    snap.to_dict() for snap in self.saver._thread_ref(thread_id).collection(HEADS).select(INDEX_FIELDS).stream()
+                )
+                threads[thread_id]["legacy"].extend(
+                    snap.to_dict() for snap in legacy.where("thread_id", "==", thread_id).select(INDEX_FIELDS).stream()
+                )
+            return threads
+        # Heads live in every thread's subcollection; other savers' collections share the group name.
+        prefix = f"{self.saver.collection}/"
+        for snap in self.client.collection_group(HEADS).select(INDEX_FIELDS).stream():
+            if snap.reference.path.startswith(prefix):
+                threads[snap.get("thread_id")]["heads"].append(snap.to_dict())
+        # Per-thread docs only exist as parents of subcollections, so the top level holds legacy docs only.
+        for snap in legacy.select(INDEX_FIELDS).stream():
+            data = snap.to_dict()
+            if data.get("thread_id") and data.get("checkpoint_id"):
+                threads[data["thread_id"]]["legacy"].append(data)
+        return threads
+
+    def _checkpoints(self, thread_id: str) -> List[Dict[str, Any]]:
+        # A doc with only the writes marker is a checkpoint whose put hasn't landed yet: not ours to prune.
+        return [data for data in (snap.to_dict() for snap in self.saver._thread_ref(thread_id).collection(CHECKPOINTS).select(INDEX_FIELDS).stream()) if data.get("checkpoint_id")]
+
+    def _writes(self, thread_id: str) -> Dict[str, List[Dict[str, Any]]]:
+        """checkpoint_id -> its pending-write docs (projected)."""
+        writes: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        for snap in self.saver._thread_ref(thread_id).collection(WRITES).select(WRITE_FIELDS).stream():
+            data = snap.to_dict()
+            writes[data["checkpoint_id"]].append(data)
+        return writes
+
+    # --- DELETE / COMPACT ---
+    def _delete_checkpoint(self, deleter: _BatchDeleter, entry: Dict[str, Any], report: Dict[str, Any]) -> None:
+        thread_id, checkpoint_id = entry["thread_id"], entry["checkpoint_id"]
+        if entry.get("legacy"):
+            deleter.delete(self.saver._legacy_ref(thread_id, checkpoint_id))
+        else:
+            for field in PAYLOAD_FIELDS:
+                for i in range(entry.get(f"{field}_chunks") or 0):
+                    deleter.delete(self.saver._chunk_ref(thread_id, checkpoint_id, field, i))
+                    report["chunks_deleted"] += 1
+            deleter.delete(self.saver._doc_ref(thread_id, checkpoint_id))
+        report["deleted"] += 1
+
+    def _delete_writes(self, deleter: _BatchDeleter, thread_id: str, writes: List[Dict[str, Any]], report: Dict[str, Any]) -> None:
+        for write in writes:
+            ref = self.saver._write_ref(thread_id, write["checkpoint_id"], write["task_id"], write["idx"])
+            for i in range(write.get("value_chunks") or 0):
+                deleter.delete(self.saver._chunk_ref(thread_id, write["checkpoint_id"], "value", i, ref))
+                report["chunks_deleted"] += 1
+            deleter.delete(ref)
+            report["writes_deleted"] += 1
+
+    def _rebase(self, entry: Dict[str, Any]) -> bool:
+        """Rewrites a delta checkpoint as a standalone base. False if it can't be done in one atomic batch."""
+        thread_id, checkpoint_id = entry["thread_id"], entry["checkpoint_id"]
+        snap = self.saver._doc_ref(thread_id, checkpoint_id).get()
+        if not snap.exists:
+            return False
+        data = snap.to_dict()
+        saved = self.saver._to_tuple(data)
+        doc = {k: v for k, v in data.items() if k in ("thread_id", "checkpoint_ns", "checkpoint_id", "parent_checkpoint_id", "created_at", WRITES_MARKER)}
+        doc.update({
+            "kind": KIND_BASE,
+            "format": self.saver.codec.format,
+            "checkpoint": self.saver.codec.encode(saved.checkpoint),
+            "metadata": self.saver.codec.encode(saved.metadata),
+        })
+        chunks = self.saver._chunks(thread_id, checkpoint_id, doc)
+        new_refs = {ref.id for ref, _ in chunks}
+        stale = [
+            self.saver._chunk_ref(thread_id, checkpoint_id, field, i)
+            for field in PAYLOAD_FIELDS for i in range(data.get(f"{field}_chunks") or 0)
+        ]
+        stale = [ref for ref in stale if ref.id not in new_refs]
+        size = sum(len(chunk) for _, chunk in chunks) + sum(len(doc[f]) for f in PAYLOAD_FIELDS if f in doc)
+        if size > BATCH_BYTES or len(chunks) + len(stale) + 1 > BATCH_LIMIT:
+            return False
+        batch = self.client.batch()
+        for ref, chunk in chunks:
+            batch.set(ref, {"data": chunk})
+        batch.set(self.saver._doc_ref(thread_id, checkpoint_id), doc)
+        for ref in stale:
+            batch.delete(ref)
+        batch.commit()
+        return True
+
+    def _expire(self, deleter: _BatchDeleter, thread_id: str, heads, checkpoints, legacy, report: Dict[str, Any]) -> None:
+        for writes in self._writes(thread_id).values():
+            self._delete_writes(deleter, thread_id, writes, report)
+        for entry in sorted(checkpoints + legacy, key=lambda e: e["checkpoint_id"], reverse=True):
+            self._delete_checkpoint(deleter, entry, report)
+        for head in heads:
+            deleter.delete(self.saver._head_ref(thread_id, head.get("checkpoint_ns", "")))
+        report["threads_expired"] += 1
+
+    def _compact_thread(self, deleter: _BatchDeleter, thread_id: str, heads, legacy, now: datetime, report: Dict[str, Any]) -> None:
+        checkpoints = self._checkpoints(thread_id)
+        for entry in legacy:
+            entry["legacy"] = True
+        report["scanned"] += len(checkpoints) + len(legacy)
+        newest = [_created(e) for e in (heads or legacy) if _created(e) is not None]
+        if self.policy.expired(max(newest) if newest else None, now):
+            self._expire(deleter, thread_id, heads, checkpoints, legacy, report)
+            return
+
+        by_ns: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        for entry in checkpoints + legacy:
+            by_ns[entry.get("checkpoint_ns", "")].append(entry)
+        keep: Set[str] = set()
+        # Chains of the heads first, in case a head was written after the checkpoint listing.
+        for entry in heads:
+            keep.add(entry["checkpoint_id"])
+            keep.update(entry.get("chain") or [])
+        daily: List[Dict[str, Any]] = []
+        for entries in by_ns.values():
+            entries.sort(key=lambda e: e["checkpoint_id"], reverse=True)
+            recent, snapshots = self.policy.select(entries, now)
+            for entry in recent:
+                keep.add(entry["checkpoint_id"])
+                keep.update(entry.get("chain") or [])
+            daily.extend(snapshots)
+        for entry in daily:
+            keep.add(entry["checkpoint_id"])
+        for entry in daily:
+            chain = entry.get("chain") or []
+            if entry.get("kind") != KIND_DELTA or all(cid in keep for cid in chain):
+                continue
+            if deleter.dry_run or self._rebase(entry):
+                report["compacted"] += 1
+            else:
+                keep.update(chain)
+
+        doomed = [e for e in checkpoints + legacy if e["checkpoint_id"] not in keep]
+        # Writes go with their checkpoint; writes of a checkpoint not listed yet (put still in flight) stay.
+        writes = self._writes(thread_id) if doomed else {}
+        for entry in doomed:
+            self._delete_writes(deleter, thread_id, writes.get(entry["checkpoint_id"], []), report)
+        # Newest first, so a delta never outlives its base while the batches go out.
+        for entry in sorted(doomed, key=lambda e: e["checkpoint_id"], reverse=True):
+            self._delete_checkpoint(deleter, entry, report)
+        report["kept"] += len(checkpoints) + len(legacy) - len(doomed)
+
+    # --- RUN ---
+    def run(self, dry_run: bool = False, thread_ids: Optional[Iterable[str]] = None, now: Optional[datetime] = None) -> Dict[str, Any]:
+        """One compaction pass over every thread (or just `thread_ids`). Returns what was (or would be) removed."""
+        now = now or datetime.now(timezone.utc)
+        report = {
+            "dry_run": dry_run, "policy": self.policy.describe(), "threads": 0, "scanned": 0, "kept": 0,
+            "deleted": 0, "chunks_deleted": 0, "writes_deleted": 0, "compacted": 0, "threads_expired": 0, "commits": 0,
+        }
+        start = time.perf_counter()
+        with self._run_lock:
+            deleter = _BatchDeleter(self.client, dry_run)
+            for thread_id, found in self._scan(thread_ids).items():
+                report["threads"] += 1
+                self._compact_thread(deleter, thread_id, found["heads"], found["legacy"], now, report)
+            deleter.flush()
+        report["commits"] = deleter.commits
+        report["seconds"] = round(time.perf_counter() - start, 3)
+        with self._stats_lock:
+            self.counters["runs"] += 1
+            if not dry_run:
+                for key in ("deleted", "chunks_deleted", "writes_deleted", "compacted", "threads_expired", "commits"):
+                    self.counters[key] += report[key]
+            self.last_run = report
+        return report
+
+    def start(self) -> None:
+        """Starts the background loop (no-op unless `interval` > 0)."""
+        if self.interval <= 0 or (self._thread is not None and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="checkpoint-compactor", daemon=True)
+        self._thread.start()
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                report = self.run()
+                print(f"--- CHECKPOINT COMPACTION: {report['deleted']} deleted, {report['compacted']} compacted ---")
+            except Exception as e:
+                print(f"Checkpoint compaction failed: {e}")
+                with self._stats_lock:
+                    self.counters["failures"] += 1
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    # --- METRICS ---
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            counters = dict(self.counters)
+            last = self.last_run
+        counters["last_run_seconds"] = last["seconds"] if last else 0.0
+        counters["last_run_scanned"] = last["scanned"] if last else 0
+        return counters
+
+
+_compactor: Optional[Compactor] = None
+_compactor_lock = threading.Lock()
+
+
+def get_compactor(saver: Optional[CustomFirestoreSaver] = None) -> Compactor:
+    """The process-wide compactor. The graph passes its saver; otherwise one is built on the shared client."""
+    global _compactor
+    if _compactor is None:
+        with _compactor_lock:
+            if _compactor is None:
+                if saver is None:
+                    from app.clients import get_db
+                    saver = CustomFirestoreSaver(get_db(), COLLECTION)
+                _compactor = Compactor(saver, RetentionPolicy.from_env(), interval=float(os.environ.get("CHECKPOINT_COMPACT_INTERVAL", "0")))
+    return _compactor
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Prune superseded checkpoints.")
+    parser.add_argument("--dry-run", action="store_true", help="report what would be removed without deleting")
+    parser.add_argument("--thread", action="append", dest="threads", help="only this thread (repeatable)")
+    parser.add_argument("--keep-last", type=int, help="overrides CHECKPOINT_KEEP_LAST")
+    parser.add_argument("--daily-days", type=int, help="overrides CHECKPOINT_KEEP_DAILY_DAYS")
+    parser.add_argument("--ttl-days", type=float, help="overrides CHECKPOINT_TTL_DAYS")
+    args = parser.parse_args()
+
+    compactor = get_compactor()
+    policy = compactor.policy
+    if args.keep_last is not None:
+        policy.keep_last = max(1, args.keep_last)
+    if args.daily_days is not None:
+        policy.daily_days = max(0, args.daily_days)
+    if args.ttl_days is not None:
+        policy.ttl_days = args.ttl_days
+    print(json.dumps(compactor.run(dry_run=args.dry_run, thread_ids=args.threads), indent=2))
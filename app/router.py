@@ -0,0 +1,133 @@
+"""
+VIBE CODER - FAST-PATH ROUTER
+Rule-based pre-router in front of the supervisor's gemini-2.5-pro call.
+
+Rules follow the PM prompt's phases. Each rule looks at the history and either returns a
+RoutingDecision (confident) or None. The first rule that answers wins; if none does, the supervisor
+asks the LLM as before. Every hop is counted so `stats()` shows how many skipped the Pro model and
+roughly how much latency that saved (fast hits x average observed LLM routing latency).
+"""
+
+import re
+import threading
+from typing import Callable, Dict, List, Literal, Optional, Sequence, Tuple
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+from pydantic import BaseModel, Field
+
+
+class Delegation(BaseModel):
+    worker: Literal["technical_architect", "head_of_frontend"] = Field(description="Worker to run this task.")
+    instruction: str = Field(description="Self-contained instruction for the worker.")
+
+
+class RoutingDecision(BaseModel):
+    reasoning: str = Field(description="Brief thought process.")
+    action: Literal["delegate_to_architect", "delegate_to_frontend", "delegate_parallel", "respond_to_user"] = Field(description="Next step.")
+    response_content: str = Field(description="Response text.")
+    delegations: List[Delegation] = Field(
+        default_factory=list,
+        description="Only for delegate_parallel: independent tasks that can run at the same time (e.g. frontend scaffolding while the architect updates docs).",
+    )
+
+
+Rule = Callable[[Sequence[BaseMessage]], Optional[RoutingDecision]]
+
+# Short, unambiguous approvals only ("yes, but change the colours" must still go to the LLM).
+APPROVAL = re.compile(
+    r"^\s*(yes[,!.]?\s*)?(approved|go ahead|looks good|lgtm|ship it|let'?s go|do it|build it|yes, that is it)[.! ]*$",
+    re.IGNORECASE,
+)
+
+
+def _report(msg: BaseMessage, prefix: str) -> Optional[str]:
+    if isinstance(msg, HumanMessage) and str(msg.content).startswith(prefix):
+        return str(msg.content)[len(prefix):].lstrip(":\n ")
+    return None
+
+
+def _last_report_prefix(messages: Sequence[BaseMessage]) -> Optional[str]:
+    for msg in reversed(messages):
+        for prefix in ("ARCHITECT REPORT", "FRONTEND REPORT", "PARALLEL REPORTS"):
+            if _report(msg, prefix) is not None:
+                return prefix
+    return None
+
+
+def frontend_done(messages: Sequence[BaseMessage]) -> Optional[RoutingDecision]:
+    """PHASE 3: when the Frontend finishes, present the results."""
+    body = _report(messages[-1], "FRONTEND REPORT") if messages else None
+    if body is None:
+        return None
+    return RoutingDecision(reasoning="Frontend finished; presenting results.", action="respond_to_user",
+                           response_content=f"The frontend team has finished. Here is their report:\n\n{body}")
+
+
+def plan_review(messages: Sequence[BaseMessage]) -> Optional[RoutingDecision]:
+    """PHASE 2: the Architect returned the plan; present it and wait for explicit approval."""
+    body = _report(messages[-1], "ARCHITECT REPORT") if messages else None
+    if body is None:
+        return None
+    return RoutingDecision(reasoning="Architect returned the plan; plan review gate.", action="respond_to_user",
+                           response_content=f"Here is the Master Plan from our architect:\n\n{body}\n\nDoes this plan look good to you?")
+
+
+def approval(messages: Sequence[BaseMessage]) -> Optional[RoutingDecision]:
+    """An explicit "Go ahead": to the Frontend if a plan is under review, to the Architect before any plan."""
+    if len(messages) < 2 or not isinstance(messages[-1], HumanMessage) or messages[-1].name:
+        return None
+    if not APPROVAL.match(str(messages[-1].content)) or not isinstance(messages[-2], AIMessage):
+        return None
+    context = str(messages[-2].content)
+    last_report = _last_report_prefix(messages)
+    if last_report in ("FRONTEND REPORT", "PARALLEL REPORTS"):
+        return None  # Approval of what? Let the LLM decide.
+    if last_report == "ARCHITECT REPORT":
+        return RoutingDecision(reasoning="User approved the plan.", action="delegate_to_frontend",
+                               response_content=f"The user approved the plan. Execute master_plan.md. Plan as presented:\n{context}")
+    return RoutingDecision(reasoning="User signed off on the vision.", action="delegate_to_architect",
+                           response_content=f"The user signed off on this vision. Create the Master Plan:\n{context}")
+
+
+DEFAULT_RULES: List[Rule] = [frontend_done, plan_review, approval]
+
+
+class PreRouter:
+    def __init__(self, rules: Optional[List[Rule]] = None, enabled: bool = True):
+        self.rules = list(DEFAULT_RULES if rules is None else rules)
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self.fast_hits: Dict[str, int] = {}
+        self.llm_calls = 0
+        self.llm_seconds = 0.0
+
+    def route(self, messages: Sequence[BaseMessage]) -> Optional[Tuple[str, RoutingDecision]]:
+        if not self.enabled or not messages:
+            return None
+        for rule in self.rules:
+            decision = rule(messages)
+            if decision is not None:
+                name = getattr(rule, "__name__", type(rule).__name__)
+                with self._lock:
+                    self.fast_hits[name] = self.fast_hits.get(name, 0) + 1
+                return name, decision
+        return None
+
+    def record_llm(self, seconds: float) -> None:
+        with self._lock:
+            self.llm_calls += 1
+            self.llm_seconds += seconds
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            fast = sum(self.fast_hits.values())
+            total = fast + self.llm_calls
+            avg_llm = self.llm_seconds / self.llm_calls if self.llm_calls else 0.0
+            return {
+                "hops": total,
+                "fast_hits": dict(self.fast_hits),
+                "llm_calls": self.llm_calls,
+                "fast_fraction": fast / total if total else 0.0,
+                "avg_llm_seconds": avg_llm,
+                "estimated_seconds_saved": fast * avg_llm,
+            }
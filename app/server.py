@@ -0,0 +1,138 @@
+"""
+VIBE CODER - HTTP ENTRYPOINT
+Keeps uvicorn's import cheap: `app.chain` (langchain, langgraph, vertexai, Firestore, the compiled
+graph) is only imported by `warm_up()`.
+
+- /health answers immediately, before any warm-up (liveness).
+- /ready runs the warm-up if needed and returns the startup profile (readiness / startup probe).
+- The first /agent/* request also waits for the warm-up, after which the LangServe routes exist.
+- /agent run endpoints (invoke, batch, stream*) go through admission control (app/admission.py):
+  one run per thread_id at a time, a bounded global queue, and a fast 503 + Retry-After when full.
+- /metrics serves Prometheus text (app/metrics.py); it does not trigger the warm-up.
+- POST /admin/checkpoints/compact runs one checkpoint retention pass (app/retention.py). Needs
+  ADMIN_TOKEN set and sent as X-Admin-Token; `dry_run` and `thread_id` are query parameters.
+"""
+
+import asyncio
+import hmac
+import json
+import os
+import threading
+from typing import List, Optional
+
+from fastapi import FastAPI, Header, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, PlainTextResponse
+from fastapi.middleware.cors import CORSMiddleware
+
+from app import startup
+from app.admission import Overloaded, get_run_scheduler
+
+RUN_ENDPOINTS = ("/invoke", "/batch", "/stream", "/stream_log", "/stream_events")
+
+app = FastAPI(title="Vibe Coder LangGraph Agency")
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=["http://localhost:3000", "https://vibe-coder-frontend-534939227554.australia-southeast1.run.app"],
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
+
+_ready = False
+_warm_lock = threading.Lock()
+
+
+def warm_up() -> None:
+    global _ready
+    if _ready:
+        return
+    with _warm_lock:
+        if _ready:
+            return
+        with startup.phase("import app.chain"):
+            from app.chain import graph
+        with startup.phase("langserve routes"):
+            from langserve import add_routes
+            from app.streaming import TokenStreamingGraph
+            # /agent/invoke is unchanged; /agent/stream yields node-tagged token/tool events then the final state.
+            add_routes(app, TokenStreamingGraph(graph), path="/agent")
+        _ready = True
+
+
+async def ensure_ready() -> None:
+    if not _ready:
+        await asyncio.to_thread(warm_up)
+
+
+@app.middleware("http")
+async def warm_up_on_first_agent_request(request: Request, call_next):
+    if request.url.path.startswith("/agent"):
+        await ensure_ready()
+    return await call_next(request)
+
+
+async def _thread_id(request: Request) -> Optional[str]:
+    """thread_id from a LangServe request body ({"config": {"configurable": {...}}}; a list for /batch)."""
+    try:
+        body = json.loads(await request.body() or b"{}")
+    except ValueError:
+        return None
+    config = body.get("config") if isinstance(body, dict) else None
+    if isinstance(config, list):
+        config = config[0] if config else None
+    configurable = config.get("configurable") if isinstance(config, dict) else None
+    thread_id = configurable.get("thread_id") if isinstance(configurable, dict) else None
+    return str(thread_id) if thread_id is not None else None
+
+
+async def _release_after(body_iterator, ticket):
+    """Keeps the run admitted until a streamed response has been fully sent (or the client left)."""
+    try:
+        async for chunk in body_iterator:
+            yield chunk
+    finally:
+        ticket.release()
+
+
+# Registered after the warm-up middleware, so it runs first: a full queue answers 503 without waiting.
+@app.middleware("http")
+async def admit_agent_runs(request: Request, call_next):
+    path = request.url.path
+    if request.method != "POST" or not path.startswith("/agent") or not path.endswith(RUN_ENDPOINTS):
+        return await call_next(request)
+    try:
+        ticket = await get_run_scheduler().acquire(await _thread_id(request))
+    except Overloaded as e:
+        return JSONResponse({"detail": str(e)}, status_code=503, headers={"Retry-After": str(e.retry_after)})
+    try:
+        response = await call_next(request)
+    except BaseException:
+        ticket.release()
+        raise
+    response.body_iterator = _release_after(response.body_iterator, ticket)
+    return response
+
+
+@app.get("/health")
+def health(): return {"status": "IT WORKS"}
+
+
+@app.get("/ready")
+async def ready():
+    await ensure_ready()
+    return {"status": "READY", "startup": startup.report()}
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def prometheus_metrics():
+    from app.metrics import render
+    return PlainTextResponse(render(), media_type="text/plain; version=0.0.4")
+
+
+@app.post("/admin/checkpoints/compact")
+async def compact_checkpoints(dry_run: bool = False, thread_id: Optional[List[str]] = Query(None), x_admin_token: Optional[str] = Header(None)):
+    token = os.environ.get("ADMIN_TOKEN")
+    if not token or not x_admin_token or not hmac.compare_digest(token, x_admin_token):
+        raise HTTPException(status_code=403, detail="Forbidden")
+    from app.retention import get_compactor
+    return await asyncio.to_thread(get_compactor().run, dry_run=dry_run, thread_ids=thread_id)
@@ -0,0 +1,85 @@
+"""
+VIBE CODER - SHARED SLOTS
+A counting semaphore that threads and coroutines can wait on together.
+
+- The graph runs sync nodes on worker threads and async nodes on the event loop, and both kinds
+  must count against one limit (per worker in app/fanout.py, per model in app/admission.py).
+- `acquire()` blocks a thread; `aacquire()` awaits a future, so a waiting coroutine costs no
+  thread and no polling. Waiters are served FIFO and `release()` hands the slot straight to the
+  next one (on its own loop, via call_soon_threadsafe).
+- A coroutine cancelled while waiting never keeps a slot: if one was handed over in the meantime
+  it is passed on.
+"""
+
+import asyncio
+import threading
+from collections import deque
+from typing import Deque, Union
+
+_Waiter = Union[threading.Event, "asyncio.Future[None]"]
+
+
+def _grant(future: "asyncio.Future[None]") -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+class Slots:
+    def __init__(self, limit: int):
+        self.limit = max(1, limit)
+        self._free = self.limit
+        self._waiters: Deque[_Waiter] = deque()
+        self._lock = threading.Lock()
+
+    def _try_take(self) -> bool:
+        if self._free and not self._waiters:
+            self._free -= 1
+            return True
+        return False
+
+    def acquire(self) -> None:
+        with self._lock:
+            if self._try_take():
+                return
+            event = threading.Event()
+            self._waiters.append(event)
+        event.wait()
+
+    async def aacquire(self) -> None:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._try_take():
+                return
+            future = loop.create_future()
+            self._waiters.append(future)
+        try:
+            await future
+        except asyncio.CancelledError:
+            with self._lock:
+                granted = future not in self._waiters
+                if not granted:
+                    self._waiters.remove(future)
+            if granted:
+                self.release()
+            raise
+
+    def release(self) -> None:
+        with self._lock:
+            if not self._waiters:
+                if self._free >= self.limit:
+                    raise ValueError("Slots released too many times")
+                self._free += 1
+                return
+            waiter = self._waiters.popleft()
+        if isinstance(waiter, threading.Event):
+            waiter.set()
+            return
+        try:
+            waiter.get_loop().call_soon_threadsafe(_grant, waiter)
+        except RuntimeError:  # its loop is closed; nobody will take the slot there
+            self.release()
+
+    @property
+    def waiting(self) -> int:
+        with self._lock:
+            return len(self._waiters)
@@ -0,0 +1,60 @@
+"""
+VIBE CODER - STARTUP PROFILE
+- `phase(name)` times a warm-up step; `report()` returns the timings (served on /ready).
+- `python -m app.startup [module]` runs `python -X importtime -c "import <module>"` in a fresh
+  interpreter and prints the slowest imports by cumulative time, so cold-start regressions show up
+  before they reach Cloud Run.
+"""
+
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List, Tuple
+
+_started = time.perf_counter()
+_phases: List[Tuple[str, float]] = []
+
+
+@contextmanager
+def phase(name: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        _phases.append((name, elapsed))
+        print(f"--- STARTUP: {name} {elapsed * 1000:.0f}ms ---")
+
+
+def report() -> Dict[str, Any]:
+    return {
+        "phases_ms": {name: round(elapsed * 1000, 1) for name, elapsed in _phases},
+        "since_process_start_ms": round((time.perf_counter() - _started) * 1000, 1),
+    }
+
+
+def import_profile(module: str = "app.chain") -> List[Tuple[str, int, int]]:
+    """(package, self_us, cumulative_us) for every import made by `import module`."""
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"], capture_output=True, text=True)
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = (part.strip() for part in line[len("import time:"):].split("|", 2))
+        rows.append((name, int(self_us), int(cumulative_us)))
+    if proc.returncode != 0 and not rows:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else f"import {module} failed")
+    return rows
+
+
+if __name__ == "__main__":
+    module = sys.argv[1] if len(sys.argv) > 1 else "app.chain"
+    top = int(sys.argv[2]) if len(sys.argv) > 2 else 25
+    rows = import_profile(module)
+    total = max((cumulative for name, _, cumulative in rows if name == module), default=sum(s for _, s, _ in rows))
+    print(f"import {module}: {total / 1000:.0f}ms cumulative, {len(rows)} modules")
+    print(f"{'cumulative ms':>14} | {'self ms':>8} | module")
+    print("-" * 60)
+    for name, self_us, cumulative_us in sorted(rows, key=lambda r: r[2], reverse=True)[:top]:
+        print(f"{cumulative_us / 1000:>14.1f} | {self_us / 1000:>8.1f} | {name}")
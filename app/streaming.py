@@ -0,0 +1,102 @@
+"""
+VIBE CODER - TOKEN STREAMING
+Wraps the compiled graph so LangServe's /agent/stream carries live worker output.
+
+- Runnables inside a node are tagged `node:<name>` (see `node_tag`); the tag is inherited by
+  every model and tool run below it. The worker ReAct sub-graphs get it in the config their node
+  invokes them with (`_worker_config` in app/chain.py), next to the node's callbacks.
+- `astream` turns the graph's `astream_events` into small chunks:
+    {"node": ..., "token": ...}                 text tokens as the model produces them
+    {"node": ..., "tool": ..., "status": ...}   tool call start / end
+    {"node": ..., "output": {...}}              the node's state update once it finishes
+  and finally the full graph output, same shape as /agent/invoke.
+- `/agent/stream_events` is passed straight through, so the `node:` tags are visible there too.
+"""
+
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+
+from langchain_core.runnables import Runnable, RunnableConfig
+
+NODE_TAG_PREFIX = "node:"
+
+
+def node_tag(name: str) -> str:
+    return f"{NODE_TAG_PREFIX}{name}"
+
+
+def _node_of(event: Dict[str, Any]) -> Optional[str]:
+    for tag in event.get("tags") or []:
+        if tag.startswith(NODE_TAG_PREFIX):
+            return tag[len(NODE_TAG_PREFIX):]
+    return None
+
+
+def _text(content: Any) -> str:
+    """Gemini chunks can carry a list of content parts; keep only the text."""
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return "".join(p if isinstance(p, str) else p.get("text", "") for p in content if isinstance(p, (str, dict)))
+    return ""
+
+
+class TokenStreamingGraph(Runnable):
+    """Delegates to `graph` for everything except `astream`, which streams node-tagged tokens."""
+
+    def __init__(self, graph: Runnable):
+        self.graph = graph
+
+    @property
+    def InputType(self) -> Any:
+        return self.graph.InputType
+
+    @property
+    def OutputType(self) -> Any:
+        return self.graph.OutputType
+
+    def get_input_schema(self, config: Optional[RunnableConfig] = None):
+        return self.graph.get_input_schema(config)
+
+    def get_output_schema(self, config: Optional[RunnableConfig] = None):
+        return self.graph.get_output_schema(config)
+
+    @property
+    def config_specs(self) -> List[Any]:
+        return self.graph.config_specs
+
+    def invoke(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any) -> Any:
+        return self.graph.invoke(input, config, **kwargs)
+
+    async def ainvoke(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any) -> Any:
+        return await self.graph.ainvoke(input, config, **kwargs)
+
+    def stream(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any) -> Iterator[Any]:
+        return self.graph.stream(input, config, **kwargs)
+
+    def astream_events(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any) -> AsyncIterator[Dict[str, Any]]:
+        return self.graph.astream_events(input, config, **kwargs)
+
+    async def astream(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any) -> AsyncIterator[Any]:
+        root_run_id = None
+        async for event in self.graph.astream_events(input, config, version="v2", **kwargs):
+            kind = event["event"]
+            if root_run_id is None:
+                root_run_id = event["run_id"]
+            if kind == "on_chain_end" and event["run_id"] == root_run_id:
+                yield event["data"].get("output")
+                continue
+            if kind == "on_chain_end" and event.get("parent_ids") == [root_run_id]:
+                # Direct children of the graph run are its nodes (skip internal __start__).
+                if not event["name"].startswith("__"):
+                    yield {"node": event["name"], "output": event["data"].get("output")}
+                continue
+
+            node = _node_of(event)
+            if node is None:
+                continue
+            if kind == "on_chat_model_stream":
+                token = _text(event["data"]["chunk"].content)
+                if token:
+                    yield {"node": node, "token": token}
+            elif kind in ("on_tool_start", "on_tool_end"):
+                yield {"node": node, "tool": event["name"], "status": "start" if kind == "on_tool_start" else "end"}
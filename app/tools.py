@@ -1,11 +1,15 @@
+import mmap
 import os
-from typing import List, Optional
+import re
+from typing import Dict, List, Optional, Tuple
 from langchain_core.tools import tool
 from langgraph.prebuilt import ToolNode
 from google.cloud import firestore
-
-# Initialize DB for Tools
-db = firestore.Client(project=os.environ.get("GCP_PROJECT", "vibe-agent-final"))
+from pydantic import BaseModel, Field
+from app import file_ops
+from app.board import get_board_writer
+from app.metrics import callback_handler
+from app.workspace import get_index, format_mtime
 
 @tool
 def list_files(path: str = ".") -> str:
@@ -15,13 +19,102 @@ def list_files(path: str = ".") -> str:
     except Exception as e:
         return f"Error: {e}"
 
+READ_MAX_CHARS = 200_000
+_CHUNK = 1 << 20
+_line_counts: Dict[Tuple[str, int, int], int] = {}
+
+def _count_lines(mm: mmap.mmap, key: Tuple[str, int, int]) -> int:
+    """Newline count, scanned 1MB at a time and cached per (path, size, mtime)."""
+    if key not in _line_counts:
+        count = sum(mm[i:i + _CHUNK].count(b"\n") for i in range(0, len(mm), _CHUNK))
+        if len(mm) and mm[-1:] != b"\n":
+            count += 1
+        if len(_line_counts) > 256:
+            _line_counts.clear()
+        _line_counts[key] = count
+    return _line_counts[key]
+
+def _line_start(mm: mmap.mmap, line: int) -> int:
+    """Byte offset where 0-based `line` starts (len(mm) if past the end)."""
+    pos, seen = 0, 0
+    while seen < line:
+        chunk = mm[pos:pos + _CHUNK]
+        if not chunk:
+            return len(mm)
+        count = chunk.count(b"\n")
+        if seen + count < line:
+            seen += count
+            pos += len(chunk)
+            continue
+        for _ in range(line - seen):
+            pos = mm.find(b"\n", pos) + 1
+        return pos
+    return pos
+
+def _tail_start(mm: mmap.mmap, lines: int) -> int:
+    end = len(mm) - 1 if mm[-1:] == b"\n" else len(mm)
+    pos = end
+    for _ in range(lines):
+        pos = mm.rfind(b"\n", 0, pos)
+        if pos < 0:
+            return 0
+    return pos + 1
+
+def _grep(mm: mmap.mmap, pattern: str, limit: int) -> List[str]:
+    regex = re.compile(pattern.encode("utf-8"), re.MULTILINE)
+    matches, line_no, counted_to, last_line = [], 1, 0, -1
+    for match in regex.finditer(mm):
+        start = mm.rfind(b"\n", 0, match.start()) + 1
+        line_no += mm[counted_to:start].count(b"\n")
+        counted_to = start
+        if start == last_line:
+            continue
+        last_line = start
+        end = mm.find(b"\n", match.start())
+        text = mm[start:end if end >= 0 else len(mm)].decode("utf-8", errors="replace")
+        matches.append(f"{line_no}: {text[:500]}")
+        if len(matches) >= limit:
+            break
+    return matches
+
 @tool
-def read_file(path: str) -> str:
-    """Read a file."""
+def read_file(path: str, mode: str = "range", offset: int = 0, limit: int = 400, unit: str = "lines", pattern: Optional[str] = None) -> str:
+    """
+    Read part of a file. Starts with a header: size in bytes, total lines and the window returned.
+    Args:
+        path: File to read.
+        mode: 'range' (from offset), 'head' (first `limit` lines), 'tail' (last `limit` lines) or 'grep' (lines matching `pattern`).
+        offset: First line (unit='lines') or byte (unit='bytes') to return, 0-based. Page with offset += limit.
+        limit: Max lines or bytes to return (grep: max matching lines).
+        unit: 'lines' or 'bytes'.
+        pattern: Regex for mode='grep'.
+    """
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            content = f.read()
-        return content[:200_000] + ("\n...[truncated]" if len(content) > 200_000 else "")
+        size = os.path.getsize(path)
+        if size == 0:
+            return f"[{path}: 0 bytes, 0 lines]"
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            total_lines = _count_lines(mm, (os.path.abspath(path), size, int(os.path.getmtime(path))))
+            limit = max(1, limit)
+            if mode == "grep":
+                if not pattern:
+                    return "Error: mode='grep' needs a pattern."
+                hits = _grep(mm, pattern, limit)
+                header = f"[{path}: {size} bytes, {total_lines} lines, {len(hits)} matches for /{pattern}/{' (limit reached)' if len(hits) >= limit else ''}]"
+                return header + "\n" + "\n".join(hits)
+            if unit == "bytes" and mode == "range":
+                start, end = max(0, offset), min(size, max(0, offset) + limit)
+                window = f"bytes {start}-{end} of {size}"
+            else:
+                first = max(0, total_lines - limit) if mode == "tail" else (0 if mode == "head" else max(0, offset))
+                start = _tail_start(mm, limit) if mode == "tail" else _line_start(mm, first)
+                end = _line_start(mm, first + limit) if mode != "tail" else size
+                last = min(total_lines, first + limit)
+                window = f"lines {first + 1}-{last} of {total_lines}" if last > first else f"no lines at offset {first} (file has {total_lines})"
+            content = mm[start:end].decode("utf-8", errors="replace")
+        truncated = len(content) > READ_MAX_CHARS
+        more = " - more available, increase offset" if end < size else ""
+        return f"[{path}: {size} bytes, {total_lines} lines, {window}{more}]\n" + content[:READ_MAX_CHARS] + ("\n...[truncated]" if truncated else "")
     except Exception as e:
         return f"Error reading {path}: {e}"
 
@@ -33,12 +126,94 @@ def write_file(path: str, content: str, append: bool = False) -> str:
         if dir_name:
             os.makedirs(dir_name, exist_ok=True)
         mode = 'a' if append else 'w'
-        with open(path, mode, encoding="utf-8") as f:
+        with file_ops.locked([path]), open(path, mode, encoding="utf-8") as f:
             f.write(content)
+        get_index().update(path)
         return f"Successfully wrote to {path}."
     except Exception as e:
         return f"Error writing to {path}: {e}"
 
+class FileWrite(BaseModel):
+    path: str = Field(description="File to create or overwrite.")
+    content: str = Field(description="Full new content of the file.")
+
+def _commit(changes: Dict[str, Optional[str]]) -> str:
+    results = file_ops.commit(changes)
+    index = get_index()
+    for path in changes:
+        index.update(path)
+    return "\n".join(results)
+
+@tool
+def write_files(files: List[FileWrite]) -> str:
+    """
+    Write several files in one call, all or nothing (temp file + rename per file). Prefer this over
+    repeated write_file calls when scaffolding. Returns one result line per file.
+    """
+    try:
+        changes: Dict[str, Optional[str]] = {}
+        for f in files:
+            f = f if isinstance(f, FileWrite) else FileWrite(**f)
+            changes[f.path] = f.content
+        if not changes:
+            return "Error: no files given."
+        with file_ops.locked(changes):
+            return _commit(changes)
+    except Exception as e:
+        return f"Error: no changes applied: {e}"
+
+@tool
+def apply_patch(patch: str) -> str:
+    """
+    Edit existing files without resending them. Accepts a unified diff (--- a/path, +++ b/path, @@ hunks;
+    /dev/null creates or deletes) or SEARCH/REPLACE blocks:
+        path/to/file
+        <<<<<<< SEARCH
+        exact existing text (must match once)
+        =======
+        replacement text
+        >>>>>>> REPLACE
+    Every file is patched or none is. Returns one result line per file.
+    """
+    try:
+        # Planning reads the files, so the lock covers the whole read-modify-write.
+        with file_ops.locked(file_ops.patch_paths(patch)):
+            return _commit(file_ops.plan_patch(patch))
+    except Exception as e:
+        return f"Error: no changes applied: {e}"
+
+@tool
+def tree(path: str = ".", max_depth: int = 6) -> str:
+    """List every file under a directory recursively (skips node_modules, .git, .next), with size and last-modified time."""
+    try:
+        rows = get_index().tree(path, max_depth=max_depth)
+        if not rows:
+            return f"No files under {path}."
+        lines = [f"{rel}  {size}B  {format_mtime(mtime)}" for rel, size, mtime in rows[:2000]]
+        if len(rows) > 2000:
+            lines.append(f"...[{len(rows) - 2000} more files, narrow the path]")
+        return "\n".join(lines)
+    except Exception as e:
+        return f"Error listing {path}: {e}"
+
+@tool
+def search_code(query: str, regex: bool = False, path_glob: Optional[str] = None, max_results: int = 50) -> str:
+    """
+    Search all workspace files at once (case-insensitive). Returns 'path:line: text' for each match.
+    Args:
+        query: Text to find, or a Python regex if regex=True.
+        regex: Treat query as a regex.
+        path_glob: Only search matching paths, e.g. 'frontend/*.tsx'.
+        max_results: Max matching lines to return.
+    """
+    try:
+        hits = get_index().search(query, regex=regex, path_glob=path_glob, max_results=max_results)
+        if not hits:
+            return f"No matches for {query!r}."
+        return "\n".join(f"{rel}:{line_no}: {text}" for rel, line_no, text in hits)
+    except Exception as e:
+        return f"Error searching for {query!r}: {e}"
+
 @tool
 def update_board(thread_id: str, phase: str, tasks: List[str], status: str) -> str:
     """
@@ -50,16 +225,21 @@ def update_board(thread_id: str, phase: str, tasks: List[str], status: str) -> s
         status: A brief status update (e.g., 'Architecting the solution...').
     """
     try:
-        doc_ref = db.collection("project_boards").document(thread_id)
-        doc_ref.set({
+        # Write-behind: merged with other updates for this thread and flushed in the background.
+        get_board_writer().submit(thread_id, {
             "phase": phase,
             "tasks": tasks,
             "status": status,
             "updated_at": firestore.SERVER_TIMESTAMP
-        }, merge=True)
+        })
         return f"Successfully updated Board for thread {thread_id}."
     except Exception as e:
         return f"Error updating board: {e}"
 
+ALL_TOOLS = [list_files, read_file, write_file, write_files, apply_patch, tree, search_code, update_board]
+# Latency / payload / error metrics for every tool call, whichever agent makes it (app/metrics.py).
+for _tool in ALL_TOOLS:
+    _tool.callbacks = [callback_handler]
+
 # Export the tools list
-inspector_tools = ToolNode([list_files, read_file, write_file, update_board])
\ No newline at end of file
+inspector_tools = ToolNode(ALL_TOOLS)
\ No newline at end of file
@@ -0,0 +1,218 @@
+"""
+VIBE CODER - WORKSPACE INDEX
+In-memory index of the files the agents work on, so one tool call can answer what used to take a
+`list_files` per directory and a `read_file` per file.
+
+- Built lazily on first use (one walk of the root), then kept current by `write_file` calling
+  `update(path)`; `refresh()` rescans everything.
+- `tree()` lists files recursively with size and mtime.
+- `search()` uses a trigram index to pick candidate files, then confirms with the real
+  substring / regex on the cached text. Regexes without a 3+ char literal scan every file.
+"""
+
+import fnmatch
+import os
+import re
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+SKIP_DIRS = {".git", "node_modules", ".next", "__pycache__", ".venv", "venv", "dist", "build", ".pytest_cache"}
+MAX_FILE_BYTES = 1024 * 1024
+_CHAR_CLASS = re.compile(r"\[\^?\]?(?:\\.|[^\]])*\]")
+_QUANTIFIER = re.compile(r"\{(\d*)(?:,(\d*))?\}")
+
+
+def _trigrams(text: str) -> Set[str]:
+    text = text.lower()
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _regex_literals(pattern: str) -> List[str]:
+    """Literal runs every match must contain. Conservative: only top-level literals count (group
+    contents are skipped), top-level alternation gives none, and an optional char (?, *, {0,...})
+    is dropped from its run. Escapes with a letter or digit (\\b, \\s, \\1) are not literals."""
+    runs: List[str] = []
+    run = ""
+    depth = 0
+    i = 0
+
+    def close() -> None:
+        nonlocal run
+        if len(run) >= 3:
+            runs.append(run)
+        run = ""
+
+    while i < len(pattern):
+        char = pattern[i]
+        if char == "\\" and i + 1 < len(pattern):
+            i += 2
+            if depth == 0:
+                if pattern[i - 1].isalnum():
+                    close()  # class, anchor or backreference
+                else:
+                    run += pattern[i - 1]
+            continue
+        if char == "[":
+            match = _CHAR_CLASS.match(pattern, i)
+            i = match.end() if match else len(pattern)
+            close()
+            continue
+        if char == "(":
+            depth += 1
+            close()
+        elif char == ")":
+            depth = max(0, depth - 1)
+        elif char == "|":
+            if depth == 0:
+                return []
+        elif char in "?*+" or (char == "{" and _QUANTIFIER.match(pattern, i)):
+            quantifier = _QUANTIFIER.match(pattern, i) if char == "{" else None
+            optional = char in "?*" or (quantifier is not None and not int(quantifier.group(1) or 0))
+            if optional and depth == 0:
+                run = run[:-1]
+            close()
+            i = quantifier.end() if quantifier else i + 1
+            if i < len(pattern) and pattern[i] in "?+":  # lazy / possessive
+                i += 1
+            continue
+        elif depth == 0:
+            if char in ".^$":
+                close()
+            else:
+                run += char
+        i += 1
+    close()
+    return runs
+
+
+class WorkspaceIndex:
+    def __init__(self, root: str = "."):
+        self.root = os.path.abspath(root)
+        self._files: Dict[str, Tuple[int, float, Optional[str]]] = {}  # rel path -> (size, mtime, text)
+        self._postings: Dict[str, Set[str]] = {}
+        self._built = False
+        self._lock = threading.RLock()
+
+    # --- BUILD / UPDATE ---
+    def _rel(self, path: str) -> str:
+        return os.path.relpath(os.path.abspath(path), self.root)
+
+    def _walk(self) -> Iterable[str]:
+        for dirpath, dirnames, filenames in os.walk(self.root):
+            dirnames[:] = sorted(d for d in dirnames if d not in SKIP_DIRS)
+            for name in sorted(filenames):
+                yield os.path.join(dirpath, name)
+
+    def _index_file(self, abs_path: str) -> None:
+        rel = self._rel(abs_path)
+        self._forget(rel)
+        try:
+            stat = os.stat(abs_path)
+        except OSError:
+            return
+        text = None
+        if stat.st_size <= MAX_FILE_BYTES:
+            try:
+                with open(abs_path, "rb") as f:
+                    raw = f.read()
+                if b"\0" not in raw[:8192]:
+                    text = raw.decode("utf-8", errors="replace")
+            except OSError:
+                pass
+        self._files[rel] = (stat.st_size, stat.st_mtime, text)
+        for gram in _trigrams(text) if text else ():
+            self._postings.setdefault(gram, set()).add(rel)
+
+    def _forget(self, rel: str) -> None:
+        old = self._files.pop(rel, None)
+        if old and old[2]:
+            for gram in _trigrams(old[2]):
+                paths = self._postings.get(gram)
+                if paths:
+                    paths.discard(rel)
+                    if not paths:
+                        del self._postings[gram]
+
+    def refresh(self) -> None:
+        with self._lock:
+            self._files.clear()
+            self._postings.clear()
+            for path in self._walk():
+                self._index_file(path)
+            self._built = True
+
+    def _ensure_built(self) -> None:
+        if not self._built:
+            self.refresh()
+
+    def update(self, path: str) -> None:
+        """Re-index one file after it was written (or drop it if it is gone). No-op before the first build."""
+        abs_path = os.path.abspath(path)
+        if not abs_path.startswith(self.root + os.sep):
+            return
+        with self._lock:
+            if not self._built:
+                return
+            if os.path.isfile(abs_path):
+                self._index_file(abs_path)
+            else:
+                self._forget(self._rel(abs_path))
+
+    # --- QUERIES ---
+    def tree(self, path: str = ".", max_depth: Optional[int] = None) -> List[Tuple[str, int, float]]:
+        with self._lock:
+            self._ensure_built()
+            prefix = self._rel(path)
+            prefix = "" if prefix == "." else prefix.rstrip(os.sep) + os.sep
+            rows = []
+            for rel, (size, mtime, _) in sorted(self._files.items()):
+                if not rel.startswith(prefix):
+                    continue
+                if max_depth is not None and rel[len(prefix):].count(os.sep) >= max_depth:
+                    continue
+                rows.append((rel, size, mtime))
+            return rows
+
+    def search(self, query: str, *, regex: bool = False, path_glob: Optional[str] = None, max_results: int = 50) -> List[Tuple[str, int, str]]:
+        compiled = re.compile(query if regex else re.escape(query), re.IGNORECASE)
+        literals = _regex_literals(query) if regex else ([query] if len(query) >= 3 else [])
+        with self._lock:
+            self._ensure_built()
+            if literals:
+                candidates: Optional[Set[str]] = None
+                for literal in literals:
+                    for gram in _trigrams(literal):
+                        paths = self._postings.get(gram, set())
+                        candidates = set(paths) if candidates is None else candidates & paths
+                candidates = candidates or set()
+            else:
+                candidates = {rel for rel, entry in self._files.items() if entry[2]}
+            texts = {rel: self._files[rel][2] for rel in candidates}
+        results = []
+        for rel in sorted(texts):
+            if path_glob and not fnmatch.fnmatch(rel, path_glob):
+                continue
+            for line_no, line in enumerate(texts[rel].splitlines(), 1):
+                if compiled.search(line):
+                    results.append((rel, line_no, line.strip()[:300]))
+                    if len(results) >= max_results:
+                        return results
+        return results
+
+
+_indexes: Dict[str, WorkspaceIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_index(root: str = ".") -> WorkspaceIndex:
+    """One shared index per workspace root."""
+    key = os.path.abspath(root)
+    with _indexes_lock:
+        if key not in _indexes:
+            _indexes[key] = WorkspaceIndex(key)
+        return _indexes[key]
+
+
+def format_mtime(mtime: float) -> str:
+    return time.strftime("%Y-%m-%d %H:%M", time.localtime(mtime))
@@ -0,0 +1,127 @@
+"""
+BENCHMARK - A burst of /agent runs against a quota-limited model, with and without admission control.
+The fake upstream accepts `--quota` concurrent calls and answers anything beyond that with a 429
+(like Vertex AI RESOURCE_EXHAUSTED). `--requests` runs arrive over `--arrival` seconds, spread over
+`--thread-pool` thread_ids (so the same thread gets several runs); each run makes `--calls` model calls.
+  unguarded: every run starts at once and calls the model directly (no limits, no retries)
+  admitted:  RunScheduler (per-thread serialization, bounded queue, 503 shedding) + ModelGate
+Reports completed / failed / shed runs, p50 / p99 run latency and the most runs seen at once on one thread.
+
+Usage: python -m benchmarks.bench_admission [--requests 200] [--quota 8] [--latency 0.1] [--calls 3]
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+from app.admission import ModelGate, Overloaded, RunScheduler
+
+
+class FakeResourceExhausted(Exception):
+    code = 429
+
+
+class FakeQuotaModel:
+    def __init__(self, quota: int, latency: float):
+        self.quota = quota
+        self.latency = latency
+        self.in_flight = 0
+        self.rejected = 0
+
+    async def generate(self) -> str:
+        if self.in_flight >= self.quota:
+            self.rejected += 1
+            await asyncio.sleep(0.005)
+            raise FakeResourceExhausted("429 Quota exceeded")
+        self.in_flight += 1
+        try:
+            await asyncio.sleep(self.latency * random.uniform(0.5, 1.5))
+            return "ok"
+        finally:
+            self.in_flight -= 1
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+async def run(args, admitted: bool) -> Dict[str, float]:
+    random.seed(args.seed)
+    model = FakeQuotaModel(args.quota, args.latency)
+    gate = ModelGate("fake", rpm=args.rpm, burst=args.quota, concurrency=args.quota, base_delay=0.05, max_delay=1.0)
+    scheduler = RunScheduler(max_running=args.max_running, max_queued=args.max_queued, max_per_thread=2, queue_timeout=args.queue_timeout)
+    active: Dict[str, int] = defaultdict(int)
+    overlap = {"max": 0}
+    outcome: Dict[str, int] = defaultdict(int)
+    latencies: List[float] = []
+
+    async def graph_run(thread_id: str) -> None:
+        active[thread_id] += 1
+        overlap["max"] = max(overlap["max"], active[thread_id])
+        try:
+            for _ in range(args.calls):
+                if admitted:
+                    await gate.acall(model.generate)
+                else:
+                    await model.generate()
+        finally:
+            active[thread_id] -= 1
+
+    async def request(i: int, thread_id: str) -> None:
+        await asyncio.sleep(args.arrival * i / args.requests)
+        start = time.perf_counter()
+        try:
+            if admitted:
+                async with scheduler.admit(thread_id):
+                    await graph_run(thread_id)
+            else:
+                await graph_run(thread_id)
+        except Overloaded:
+            outcome["shed (503)"] += 1
+            return
+        except FakeResourceExhausted:
+            outcome["failed (429)"] += 1
+            return
+        outcome["completed"] += 1
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(request(i, f"thread-{random.randrange(args.thread_pool)}") for i in range(args.requests)))
+    return {
+        "wall": time.perf_counter() - start, "completed": outcome["completed"], "failed": outcome["failed (429)"],
+        "shed": outcome["shed (503)"], "p50": _percentile(latencies, 50), "p99": _percentile(latencies, 99),
+        "overlap": overlap["max"], "upstream_429": model.rejected,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--arrival", type=float, default=1.0, help="seconds over which the runs arrive")
+    parser.add_argument("--thread-pool", type=int, default=60)
+    parser.add_argument("--calls", type=int, default=3, help="model calls per run")
+    parser.add_argument("--quota", type=int, default=8, help="concurrent calls the upstream accepts")
+    parser.add_argument("--rpm", type=float, default=0, help="gate requests per minute (0 = concurrency cap only)")
+    parser.add_argument("--latency", type=float, default=0.1)
+    parser.add_argument("--max-running", type=int, default=8)
+    parser.add_argument("--max-queued", type=int, default=64)
+    parser.add_argument("--queue-timeout", type=float, default=5.0)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    print(f"{'mode':>9} | {'done':>5} | {'429':>5} | {'503':>5} | {'p50 s':>6} | {'p99 s':>6} | {'wall s':>6} | {'per-thread':>10} | upstream 429s")
+    print("-" * 92)
+    for name, admitted in (("unguarded", False), ("admitted", True)):
+        r = asyncio.run(run(args, admitted))
+        print(f"{name:>9} | {r['completed']:>5} | {r['failed']:>5} | {r['shed']:>5} | {r['p50']:>6.2f} | {r['p99']:>6.2f} | "
+              f"{r['wall']:>6.2f} | {r['overlap']:>10} | {r['upstream_429']}")
+
+
+if __name__ == "__main__":
+    main()
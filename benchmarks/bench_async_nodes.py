@@ -0,0 +1,66 @@
+"""
+LOAD TEST - Concurrent conversations through the real `app.chain.graph`: blocking vs native async nodes.
+Runs on the bench_graph_load harness (FakeFirestoreClient behind the real CachedCheckpointSaver,
+FakeGeminiChatModel for both models, the build scenario: two turns, 5 model calls per conversation),
+so every hop goes through the real nodes: history budget, fast router, worker slots, checkpointer
+(the fakes replace the gated model classes, so the per-model gates are not in the path).
+  sync:  the same compiled topology with each node's sync body only, which LangGraph runs on the
+         loop's executor under ainvoke (how LangServe ran the nodes before they had async bodies)
+  async: `app.chain.graph` as served, awaiting each node's async body
+The executor is sized like LangServe's (anyio default: 40 threads) and shared with the
+checkpointer's to_thread calls in both modes. Model latency defaults to 1 s (Gemini calls take
+longer); with much shorter latencies the run is bound by the graph's own CPU time in both modes.
+
+Usage: python -m benchmarks.bench_async_nodes [--threads 10,100,200] [--latency 1.0] [--executor 40]
+"""
+
+import argparse
+import asyncio
+import copy
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict
+
+from langchain_core.runnables import RunnableLambda
+
+from benchmarks.bench_graph_load import _setup, run_level
+
+
+def sync_graph(chain):
+    """`chain.workflow` compiled again with the async body of every node removed."""
+    workflow = copy.copy(chain.workflow)
+    workflow.nodes = {
+        name: spec._replace(runnable=RunnableLambda(spec.runnable.func, name=name)) if isinstance(spec.runnable, RunnableLambda) else spec
+        for name, spec in chain.workflow.nodes.items()
+    }
+    return workflow.compile(checkpointer=chain.checkpointer)
+
+
+async def _level(env: Dict[str, Any], threads: int, tag: str, graph, executor: int) -> Dict[str, Any]:
+    asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=executor))
+    return await run_level(env, threads, tag, "build", graph)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--threads", default="10,100", help="comma-separated numbers of concurrent conversations")
+    parser.add_argument("--latency", type=float, default=1.0, help="seconds per fake model call")
+    parser.add_argument("--output-tokens", type=int, default=120)
+    parser.add_argument("--firestore-latency", type=float, default=0.0)
+    parser.add_argument("--executor", type=int, default=40, help="executor threads (LangServe/anyio default is 40)")
+    args = parser.parse_args()
+    args.scenario = "build"
+
+    env = _setup(args)
+    graphs = {"sync": sync_graph(env["chain"]), "async": env["chain"].graph}
+    tag = f"async-nodes-{int(time.time())}"
+    print(f"{'threads':>7} | {'mode':>5} | {'turns/s':>8} | {'p50 ms':>8} | {'p99 ms':>8} | {'model calls':>11}")
+    print("-" * 64)
+    for threads in (int(t) for t in args.threads.split(",") if t):
+        for mode, graph in graphs.items():
+            r = asyncio.run(_level(env, threads, f"{tag}-{mode}", graph, args.executor))
+            print(f"{threads:>7} | {mode:>5} | {r['turns_per_second']:>8.2f} | {r['p50_ms']:>8.1f} | {r['p99_ms']:>8.1f} | {r['llm_calls']:>11}")
+
+
+if __name__ == "__main__":
+    main()
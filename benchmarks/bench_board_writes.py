@@ -0,0 +1,69 @@
+"""
+BENCHMARK - update_board: synchronous set(merge=True) vs the write-behind BoardWriter.
+N concurrent agent threads each post K board updates with a short "model" pause between them,
+against the in-memory Firestore with a per-round-trip latency. Then the run ends (flush) and the
+final boards must match.
+
+Usage: python -m benchmarks.bench_board_writes [--threads 10] [--updates 6] [--latency 0.03]
+"""
+
+import argparse
+import threading
+import time
+
+from app.board import BoardWriter
+from benchmarks.fake_firestore import FakeFirestoreClient
+
+
+def _agent(writer: BoardWriter, thread_id: str, updates: int, pause: float, tool_seconds: list) -> None:
+    for step in range(updates):
+        start = time.perf_counter()
+        writer.submit(thread_id, {"phase": "Coding", "tasks": [f"task {n}" for n in range(step + 1)], "status": f"step {step}"})
+        tool_seconds.append(time.perf_counter() - start)
+        time.sleep(pause)
+    writer.flush(thread_id)  # graph completion
+
+
+def run(window: float, threads: int, updates: int, latency: float, pause: float):
+    client = FakeFirestoreClient(latency=latency)
+    writer = BoardWriter(client_factory=lambda: client, window=window)
+    tool_seconds: list = []
+    workers = [
+        threading.Thread(target=_agent, args=(writer, f"thread-{i}", updates, pause, tool_seconds))
+        for i in range(threads)
+    ]
+    start = time.perf_counter()
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    wall = time.perf_counter() - start
+    writer.close()
+    boards = {snap.id: snap.to_dict() for snap in client.collection("project_boards").stream()}
+    return writer.stats(), client.commits, sum(tool_seconds), wall, boards
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--threads", type=int, default=10)
+    parser.add_argument("--updates", type=int, default=6)
+    parser.add_argument("--latency", type=float, default=0.03, help="seconds per simulated Firestore round trip")
+    parser.add_argument("--pause", type=float, default=0.02, help="seconds of model time between board updates")
+    parser.add_argument("--window", type=float, default=0.5)
+    args = parser.parse_args()
+
+    print(f"{'mode':>12} | {'updates':>7} | {'docs':>5} | {'commits':>7} | {'saved':>5} | {'tool s':>7} | {'wall s':>6}")
+    print("-" * 68)
+    results = {}
+    for name, window in (("sync", 0.0), ("write-behind", args.window)):
+        stats, commits, tool_s, wall, boards = run(window, args.threads, args.updates, args.latency, args.pause)
+        results[name] = boards
+        print(f"{name:>12} | {stats['submitted']:>7} | {stats['docs_written']:>5} | {commits:>7} | "
+              f"{stats['writes_saved']:>5} | {tool_s:>7.3f} | {wall:>6.2f}")
+        if name == "write-behind":
+            print(f"\nestimated tool latency removed: {stats['estimated_tool_seconds_removed']:.3f}s")
+    print(f"final boards match: {results['sync'] == results['write-behind']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+BENCHMARK - Checkpoint payload size and encode/decode time per codec.
+Histories look like real sessions: user turns, supervisor instructions, and worker reports that
+embed generated file contents (the reports are what push long sessions past Firestore's 1 MiB
+document limit). Codecs: format 1 (JsonPlusSerializer JSON, what the saver used to write) and
+format 2 (binary) uncompressed / zlib / zstd (zstd only if `zstandard` is installed).
+
+Usage: python -m benchmarks.bench_checkpoint_codec [--turns 10,50,200] [--file-kb 6] [--repeat 5]
+"""
+
+import argparse
+import random
+import time
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+from app.checkpoint_codec import CheckpointCodec, JsonCodec, zstandard
+
+FIRESTORE_DOC_LIMIT = 1024 * 1024
+
+
+def _source_file(rng: random.Random, kb: int) -> str:
+    names = ["todos", "user", "theme", "session", "filter", "item", "list", "modal"]
+    lines = []
+    while sum(len(l) for l in lines) < kb * 1024:
+        a, b = rng.choice(names), rng.choice(names)
+        lines.append(f"export function use{a.title()}{b.title()}() {{ const [{a}, set{a.title()}] = useState<{b.title()}[]>([]); return {{ {a}, set{a.title()} }}; }}\n")
+    return "".join(lines)
+
+
+def history(turns: int, file_kb: int, seed: int = 7):
+    rng = random.Random(seed)
+    messages = []
+    for turn in range(turns):
+        messages.append(HumanMessage(content=f"Turn {turn}: please add the {rng.choice(['filter', 'theme', 'modal'])} feature."))
+        messages.append(HumanMessage(content=f"Context Thread ID: bench. Instruction: implement turn {turn}.", name="Supervisor"))
+        report = f"FRONTEND REPORT:\nWrote frontend/hooks/useFeature{turn}.ts:\n```ts\n{_source_file(rng, file_kb)}```"
+        messages.append(HumanMessage(content=report, name="Frontend"))
+        messages.append(AIMessage(content=f"The frontend team finished turn {turn}. Want anything else?"))
+    return {
+        "v": 1, "id": f"1ef-{turns}", "ts": "2025-12-06T00:00:00+00:00",
+        "channel_values": {"messages": messages, "next": "__end__", "summaries": {}},
+        "channel_versions": {"messages": turns * 4, "next": turns}, "versions_seen": {}, "pending_sends": [],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--turns", default="10,50,200")
+    parser.add_argument("--file-kb", type=int, default=6, help="size of the file embedded in each worker report")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    serde = JsonPlusSerializer()
+    codecs = [JsonCodec(serde), CheckpointCodec(serde, "none"), CheckpointCodec(serde, "zlib")]
+    if zstandard is not None:
+        codecs.append(CheckpointCodec(serde, "zstd"))
+
+    print(f"{'turns':>5} | {'codec':>13} | {'bytes':>10} | {'ratio':>6} | {'encode ms':>9} | {'decode ms':>9} | fits 1 MiB")
+    print("-" * 80)
+    for turns in (int(t) for t in args.turns.split(",") if t):
+        checkpoint = history(turns, args.file_kb)
+        baseline = None
+        for codec in codecs:
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                blob = codec.encode(checkpoint)
+            encode_ms = (time.perf_counter() - start) * 1000 / args.repeat
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                decoded = codec.decode(blob)
+            decode_ms = (time.perf_counter() - start) * 1000 / args.repeat
+            assert decoded["channel_values"]["messages"][-2].content == checkpoint["channel_values"]["messages"][-2].content
+            baseline = baseline or len(blob)
+            print(f"{turns:>5} | {codec.name:>13} | {len(blob):>10} | {baseline / len(blob):>5.1f}x | {encode_ms:>9.2f} | "
+                  f"{decode_ms:>9.2f} | {'yes' if len(blob) < FIRESTORE_DOC_LIMIT else 'no (chunks)'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+BENCHMARK - Checkpoint bytes written per step vs thread length.
+Runs CustomFirestoreSaver against the in-memory Firestore, full snapshots vs delta mode.
+
+Usage: python -m benchmarks.bench_checkpoint_delta [--steps 200] [--base-interval 20]
+"""
+
+import argparse
+import random
+from typing import Any, Dict
+
+from langchain_core.messages import AIMessage, HumanMessage
+
+from app.checkpointer import CustomFirestoreSaver
+from benchmarks.fake_firestore import FakeFirestoreClient
+
+WORDS = ["Wrote", "frontend/app/page.tsx", "layout", "hook", "useTodos", "filter", "theme", "modal", "state", "props", "test", "route"]
+
+
+def _report(step: int) -> str:
+    """A different report every turn (identical text would compress away and hide the write cost)."""
+    rng = random.Random(step)
+    return "ARCHITECT REPORT:\n" + " ".join(rng.choice(WORDS) + str(rng.randrange(1000)) for _ in range(120))
+
+
+def _checkpoint(step: int, messages) -> Dict[str, Any]:
+    return {
+        "v": 1,
+        "id": f"{step:08d}",
+        "ts": f"2025-01-01T00:00:{step:08d}",
+        "channel_values": {"messages": list(messages), "next": "supervisor"},
+        "channel_versions": {"messages": step, "next": step},
+        "versions_seen": {},
+        "pending_sends": [],
+    }
+
+
+def run(steps: int, delta_mode: bool, base_interval: int):
+    client = FakeFirestoreClient()
+    saver = CustomFirestoreSaver(client, "custom_checkpoints", delta_mode=delta_mode, base_interval=base_interval)
+    config = {"configurable": {"thread_id": "bench", "checkpoint_ns": ""}}
+    messages, per_step = [], []
+    for step in range(1, steps + 1):
+        messages.append(HumanMessage(content=f"Turn {step}: please continue the build.") if step % 2 else HumanMessage(content=_report(step), name="Architect"))
+        before = client.bytes_written
+        config = saver.put(config, _checkpoint(step, messages), {"step": step}, {"messages": step})
+        per_step.append(client.bytes_written - before)
+
+    restored = saver.get_tuple({"configurable": {"thread_id": "bench"}})
+    assert [m.content for m in restored.checkpoint["channel_values"]["messages"]] == [m.content for m in messages]
+    return per_step, client.bytes_written
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--steps", type=int, default=200)
+    parser.add_argument("--base-interval", type=int, default=20)
+    args = parser.parse_args()
+
+    full, full_total = run(args.steps, False, args.base_interval)
+    delta, delta_total = run(args.steps, True, args.base_interval)
+
+    print(f"{'step':>6} | {'full bytes':>12} | {'delta bytes':>12}")
+    print("-" * 38)
+    for step in sorted({1, 2, 5, 10, 25, 50, 100, 150, args.steps}):
+        if step <= args.steps:
+            print(f"{step:>6} | {full[step - 1]:>12,} | {delta[step - 1]:>12,}")
+    print("-" * 38)
+    print(f"{'total':>6} | {full_total:>12,} | {delta_total:>12,}  ({full_total / max(1, delta_total):.1f}x less)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+BENCHMARK - Checkpoint retention on the in-memory FakeFirestoreClient.
+Seeds `--threads` conversations through the real CustomFirestoreSaver (delta mode), `--steps` checkpoints
+per day over `--days` days (created_at backdated), a share of them idle long enough to pass the TTL,
+plus legacy flat docs for a few threads. Then runs a dry run and a real Compactor pass and reports docs
+and bytes before/after, deletes, commits and time. Every surviving checkpoint must still load with the
+same state (heads, recent window and compacted daily snapshots).
+
+Usage: python -m benchmarks.bench_checkpoint_retention [--threads 20] [--days 14] [--steps 30] [--keep-last 20] [--ttl-days 10]
+"""
+
+import argparse
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict
+
+from langchain_core.messages import AIMessage, HumanMessage
+
+from app.checkpoint_codec import JsonCodec
+from app.checkpointer import CustomFirestoreSaver
+from app.retention import Compactor, RetentionPolicy
+from benchmarks.fake_firestore import FakeFirestoreClient
+
+COLLECTION = "custom_checkpoints"
+
+
+def _backdate(client: FakeFirestoreClient, thread_id: str, checkpoint_id: str, when: datetime) -> None:
+    for path in ((COLLECTION, thread_id, "checkpoints", checkpoint_id), (COLLECTION, thread_id, "heads", "_root")):
+        doc = client._docs.get(path)
+        if doc is not None and doc["checkpoint_id"] == checkpoint_id:
+            doc["created_at"] = when
+
+
+def seed(client: FakeFirestoreClient, args, now: datetime) -> Dict[str, Dict[str, int]]:
+    """Writes the histories; returns thread_id -> {checkpoint_id: message count} for verification."""
+    saver = CustomFirestoreSaver(client, COLLECTION, base_interval=args.base_interval)
+    legacy = CustomFirestoreSaver(client, COLLECTION, codec=JsonCodec(saver.serde))
+    expected: Dict[str, Dict[str, int]] = {}
+    idle_days = int(args.ttl_days) + 1 if args.ttl_days else 0
+    for t in range(args.threads):
+        thread_id = f"thread-{t}"
+        expected[thread_id] = {}
+        last_day = args.days - idle_days if args.ttl_days and t % 4 == 0 else args.days
+        if t % 5 == 0:
+            # Flat docs from before the per-thread layout (ms-timestamp ids sort before uuid6 ones).
+            for i in range(args.steps):
+                checkpoint_id = f"{1700000000000 + i}_legacy"
+                checkpoint = {"id": checkpoint_id, "channel_values": {"messages": [HumanMessage(content=f"legacy {i}")]}}
+                legacy._legacy_ref(thread_id, checkpoint_id).set({
+                    "thread_id": thread_id, "checkpoint_ns": "", "checkpoint_id": checkpoint_id,
+                    "checkpoint": legacy.serde.dumps(checkpoint), "metadata": legacy.serde.dumps({"step": i}),
+                    "created_at": now - timedelta(days=args.days + 1),
+                })
+        config = {"configurable": {"thread_id": thread_id, "checkpoint_ns": ""}}
+        messages = []
+        for day in range(last_day):
+            for step in range(args.steps):
+                checkpoint_id = f"1ef{day:03d}{step:04d}"
+                messages = messages + [HumanMessage(content=f"day {day} step {step}"), AIMessage(content="ok " * 40)]
+                checkpoint = {"id": checkpoint_id, "channel_values": {"messages": messages, "next": "supervisor"}}
+                config = saver.put(config, checkpoint, {"step": day * args.steps + step}, {"messages": 1, "next": 1})
+                when = now - timedelta(days=args.days - day) + timedelta(minutes=step)
+                _backdate(client, thread_id, checkpoint_id, when)
+                expected[thread_id][checkpoint_id] = len(messages)
+    return expected
+
+
+def verify(client: FakeFirestoreClient, expected: Dict[str, Dict[str, int]]) -> int:
+    """Loads every surviving checkpoint from a fresh saver; returns how many were checked."""
+    saver = CustomFirestoreSaver(client, COLLECTION)
+    checked = 0
+    for thread_id, counts in expected.items():
+        config = {"configurable": {"thread_id": thread_id, "checkpoint_ns": ""}}
+        head = saver.get_tuple(config)
+        for saved in saver.list(config):
+            checkpoint_id = saved.config["configurable"]["checkpoint_id"]
+            assert len(saved.checkpoint["channel_values"]["messages"]) == counts[checkpoint_id], checkpoint_id
+            checked += 1
+        if head is not None and head.config["configurable"]["checkpoint_id"] in counts:
+            assert len(head.checkpoint["channel_values"]["messages"]) == counts[head.config["configurable"]["checkpoint_id"]]
+    return checked
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--threads", type=int, default=20)
+    parser.add_argument("--days", type=int, default=14)
+    parser.add_argument("--steps", type=int, default=30, help="checkpoints per thread per day")
+    parser.add_argument("--base-interval", type=int, default=20)
+    parser.add_argument("--keep-last", type=int, default=20)
+    parser.add_argument("--daily-days", type=int, default=7)
+    parser.add_argument("--ttl-days", type=float, default=10, help="0 disables the TTL")
+    args = parser.parse_args()
+
+    now = datetime.now(timezone.utc)
+    client = FakeFirestoreClient()
+    start = time.perf_counter()
+    expected = seed(client, args, now)
+    print(f"seeded {sum(len(c) for c in expected.values())} checkpoints in {time.perf_counter() - start:.1f}s")
+
+    policy = RetentionPolicy(keep_last=args.keep_last, daily_days=args.daily_days, ttl_days=args.ttl_days or None)
+    compactor = Compactor(CustomFirestoreSaver(client, COLLECTION), policy)
+    docs_before, bytes_before = client.document_count(COLLECTION), client.stored_bytes(COLLECTION)
+    dry = compactor.run(dry_run=True, now=now)
+    assert client.document_count(COLLECTION) == docs_before, "dry run must not delete"
+    report = compactor.run(now=now)
+    docs_after, bytes_after = client.document_count(COLLECTION), client.stored_bytes(COLLECTION)
+
+    print(f"{'':>10} | {'docs':>8} | {'bytes':>12}")
+    print("-" * 36)
+    print(f"{'before':>10} | {docs_before:>8} | {bytes_before:>12}")
+    print(f"{'after':>10} | {docs_after:>8} | {bytes_after:>12}")
+    print(f"\ndry run:   would delete {dry['deleted']} checkpoints, compact {dry['compacted']}, expire {dry['threads_expired']} threads")
+    print(f"real run:  deleted {report['deleted']} checkpoints + {report['writes_deleted']} writes + {report['chunks_deleted']} chunks, compacted {report['compacted']}, "
+          f"expired {report['threads_expired']} threads, kept {report['kept']}, {report['commits']} batch commits, {report['seconds']:.2f}s")
+    print(f"verified:  {verify(client, expected)} surviving checkpoints load with the original state")
+    again = compactor.run(now=now)
+    print(f"second run deletes {again['deleted']} (idempotent)")
+
+
+if __name__ == "__main__":
+    main()
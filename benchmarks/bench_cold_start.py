@@ -0,0 +1,100 @@
+"""
+BENCHMARK - Cold start of the real `app.chain`: how long `import app.chain` takes in a fresh process.
+Every run is a new interpreter (`--runs` per mode) with the in-memory FakeFirestoreClient (seeded
+agent_configs, `--firestore-latency` seconds per round trip) and FakeGeminiChatModel installed first.
+  sequential: the pre-registry path, one blocking `agent_configs` get() per agent (measured on the
+              same client, then added to the snapshot import, which does no config reads)
+  firestore:  no disk snapshot yet: AgentConfigRegistry does one batched get_all and writes it
+              (every production cold start: a new Cloud Run instance has no snapshot)
+  snapshot:   the snapshot from a previous start is on disk: no Firestore reads for configs
+Reports the median import time and the Firestore round trips made while importing. Most of the
+import is library loading, which no config strategy changes; the difference is the round trips
+(and on real Firestore the first one also pays gRPC channel and auth setup).
+
+Usage: python -m benchmarks.bench_cold_start [--runs 5] [--firestore-latency 0.08]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+AGENTS = ["project_manager", "technical_architect", "head_of_frontend"]
+
+
+def child(args) -> None:
+    """Runs in the fresh interpreter: installs the stand-ins, then times the import."""
+    os.environ["AGENT_CONFIG_WATCH"] = "0"
+    os.environ["AGENT_CONFIG_SNAPSHOT"] = args.snapshot
+    os.chdir(tempfile.mkdtemp(prefix="vibe-cold-"))
+    from app.clients import set_chat_model_factory, set_db
+    from benchmarks.fake_firestore import FakeFirestoreClient
+    from benchmarks.fake_llm import FakeGeminiChatModel
+
+    client = FakeFirestoreClient()
+    for agent_id in AGENTS:
+        client.collection("agent_configs").document(agent_id).set({"system_prompt": f"You are the {agent_id}."})
+    client.latency = args.firestore_latency
+    round_trips = [0]
+    sleep = client._round_trip
+
+    def counted() -> None:
+        round_trips[0] += 1
+        sleep()
+
+    client._round_trip = counted
+    set_db(client)
+    set_chat_model_factory(lambda cls, **kwargs: FakeGeminiChatModel(model_name=kwargs["model_name"], callbacks=kwargs.get("callbacks")))
+
+    start = time.perf_counter()
+    for agent_id in AGENTS:
+        client.collection("agent_configs").document(agent_id).get()
+    sequential = time.perf_counter() - start
+    before = round_trips[0]
+    start = time.perf_counter()
+    from app import chain
+    seconds = time.perf_counter() - start
+    print(json.dumps({"seconds": seconds, "sequential_reads_seconds": sequential, "round_trips": round_trips[0] - before, "source": chain.agent_configs.source}))
+
+
+def _run(args, snapshot: str) -> dict:
+    cmd = [sys.executable, "-m", "benchmarks.bench_cold_start", "--child", "--snapshot", snapshot, "--firestore-latency", str(args.firestore_latency)]
+    out = subprocess.run(cmd, capture_output=True, text=True, check=True, cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--firestore-latency", type=float, default=0.08, help="seconds per fake Firestore round trip")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--snapshot", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child(args)
+        return
+
+    rows = {"sequential": [], "firestore": [], "snapshot": []}
+    trips = {}
+    for _ in range(args.runs):
+        snapshot = os.path.join(tempfile.mkdtemp(prefix="vibe-snapshot-"), "agent_configs.snapshot.json")
+        first = _run(args, snapshot)  # no snapshot yet: writes it
+        second = _run(args, snapshot)  # next start reads it
+        assert (first["source"], second["source"]) == ("firestore", "snapshot")
+        rows["firestore"].append(first["seconds"])
+        rows["snapshot"].append(second["seconds"])
+        rows["sequential"].append(second["seconds"] + second["sequential_reads_seconds"])
+        trips.update({"firestore": first["round_trips"], "snapshot": second["round_trips"], "sequential": second["round_trips"] + len(AGENTS)})
+
+    print(f"{'mode':>10} | {'import ms (median)':>18} | firestore round trips")
+    print("-" * 50)
+    for mode, values in rows.items():
+        print(f"{mode:>10} | {statistics.median(values) * 1000:>18.1f} | {trips[mode]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""
+LOAD TEST - The real compiled `app.chain.graph`, fully offline.
+Firestore is the in-memory FakeFirestoreClient (checkpointer, board, agent configs) and both
+Gemini models are FakeGeminiChatModel, installed through app.clients before app.chain is
+imported. Each conversation thread plays two turns of the build scenario:
+  1. "Build me ..."  -> supervisor (Pro) -> architect (plan + board) -> plan review
+  2. "Go ahead."     -> frontend (writes files) -> results
+`--scenario parallel` plays one turn instead: supervisor -> Send(architect, frontend) -> join -> supervisor,
+which goes through the checkpointer's pending writes (put_writes).
+Reports turns/sec, p50/p99 turn latency, checkpoint bytes written and peak memory per
+concurrency level, and writes the numbers as JSON so runs can be compared (--baseline).
+
+Usage: python -m benchmarks.bench_graph_load [--threads 1,10,100] [--latency 0.05] [--scenario build|parallel] [--out results.json] [--baseline old.json]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Dict, List
+
+from benchmarks.fake_firestore import FakeFirestoreClient
+from benchmarks.fake_llm import FakeGeminiChatModel
+
+TURNS = {
+    "build": ["Build me a todo app with a calm, minimal vibe.", "Go ahead."],
+    "parallel": ["Build me a todo app with a calm, minimal vibe."],
+}
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def _setup(args) -> Dict[str, Any]:
+    """Installs the stand-ins, then imports the real graph. Must run before anything imports app.chain."""
+    workdir = tempfile.mkdtemp(prefix="vibe-bench-")
+    os.environ.setdefault("AGENT_CONFIG_WATCH", "0")
+    os.environ.setdefault("AGENT_CONFIG_SNAPSHOT", os.path.join(workdir, "agent_configs.snapshot.json"))
+    os.chdir(workdir)  # the workers write their files relative to the cwd
+
+    from app.clients import set_chat_model_factory, set_db
+    client = FakeFirestoreClient(latency=args.firestore_latency)
+    set_db(client)
+    models: Dict[str, FakeGeminiChatModel] = {}
+
+    def factory(cls, **kwargs):
+        model = FakeGeminiChatModel(
+            model_name=kwargs["model_name"], latency=args.latency, output_tokens=args.output_tokens,
+            cache=kwargs.get("cache"), callbacks=kwargs.get("callbacks"), scenario=args.scenario,
+        )
+        models[kwargs["model_name"]] = model
+        return model
+
+    set_chat_model_factory(factory)
+    from app import chain
+    return {"chain": chain, "client": client, "models": models}
+
+
+async def _conversation(graph, thread_id: str, turns: List[str], latencies: List[float]) -> None:
+    config = {"configurable": {"thread_id": thread_id}}
+    for text in turns:
+        start = time.perf_counter()
+        await graph.ainvoke({"messages": [("human", text)]}, config)
+        latencies.append(time.perf_counter() - start)
+
+
+async def run_level(env: Dict[str, Any], threads: int, tag: str, scenario: str = "build", graph=None) -> Dict[str, Any]:
+    """One concurrency level; `graph` defaults to `app.chain.graph`."""
+    client, chain = env["client"], env["chain"]
+    graph = graph if graph is not None else chain.graph
+    bytes_before, writes_before = client.bytes_written, client.writes
+    checkpoint_bytes_before = client.stored_bytes("custom_checkpoints")
+    llm_before = sum(m.calls for m in env["models"].values())
+    latencies: List[float] = []
+    start = time.perf_counter()
+    await asyncio.gather(*(_conversation(graph, f"{tag}-{threads}-{i}", TURNS[scenario], latencies) for i in range(threads)))
+    wall = time.perf_counter() - start
+    chain.get_board_writer().flush()
+    traced = tracemalloc.get_traced_memory()[1] if tracemalloc.is_tracing() else None
+    return {
+        "threads": threads,
+        "turns": len(latencies),
+        "wall_seconds": round(wall, 4),
+        "turns_per_second": round(len(latencies) / wall, 3) if wall else 0.0,
+        "p50_ms": round(_percentile(latencies, 50) * 1000, 2),
+        "p99_ms": round(_percentile(latencies, 99) * 1000, 2),
+        "firestore_bytes_written": client.bytes_written - bytes_before,
+        "firestore_writes": client.writes - writes_before,
+        "checkpoint_bytes_stored": client.stored_bytes("custom_checkpoints") - checkpoint_bytes_before,
+        "llm_calls": sum(m.calls for m in env["models"].values()) - llm_before,
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "peak_traced_mb": round(traced / 1024 / 1024, 1) if traced is not None else None,
+    }
+
+
+def _git_revision() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except OSError:
+        return ""
+
+
+def _print(results: List[Dict[str, Any]], baseline: Dict[int, Dict[str, Any]]) -> None:
+    print(f"{'threads':>7} | {'turns':>5} | {'turns/s':>8} | {'p50 ms':>8} | {'p99 ms':>8} | {'ckpt bytes':>10} | {'rss MB':>7}")
+    print("-" * 70)
+    for r in results:
+        print(f"{r['threads']:>7} | {r['turns']:>5} | {r['turns_per_second']:>8.2f} | {r['p50_ms']:>8.1f} | "
+              f"{r['p99_ms']:>8.1f} | {r['checkpoint_bytes_stored']:>10} | {r['peak_rss_mb']:>7.1f}")
+        old = baseline.get(r["threads"])
+        if old:
+            ratio = lambda key: r[key] / old[key] if old.get(key) else float("nan")
+            print(f"{'vs base':>7} | {'':>5} | {ratio('turns_per_second'):>7.2f}x | {ratio('p50_ms'):>7.2f}x | "
+                  f"{ratio('p99_ms'):>7.2f}x | {ratio('checkpoint_bytes_stored'):>9.2f}x | {ratio('peak_rss_mb'):>6.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--threads", default="1,10,100", help="comma-separated concurrency levels")
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds per fake model call")
+    parser.add_argument("--scenario", choices=sorted(TURNS), default="build")
+    parser.add_argument("--output-tokens", type=int, default=120, help="words per fake text reply")
+    parser.add_argument("--firestore-latency", type=float, default=0.0, help="seconds per fake Firestore round trip")
+    parser.add_argument("--tracemalloc", action="store_true", help="also report the Python heap peak (slower)")
+    parser.add_argument("--label", default="", help="free-form name stored with the results")
+    parser.add_argument("--out", default="bench_graph_load.json")
+    parser.add_argument("--baseline", help="results JSON from an earlier run to compare against")
+    args = parser.parse_args()
+
+    out_path = os.path.abspath(args.out)
+    baseline_path = os.path.abspath(args.baseline) if args.baseline else None
+    if args.tracemalloc:
+        tracemalloc.start()
+    env = _setup(args)
+    tag = f"bench-{int(time.time())}"
+    results = []
+    for threads in (int(t) for t in args.threads.split(",") if t):
+        results.append(asyncio.run(run_level(env, threads, tag, args.scenario)))
+
+    baseline = {}
+    if baseline_path:
+        with open(baseline_path, encoding="utf-8") as f:
+            baseline = {r["threads"]: r for r in json.load(f)["results"]}
+    _print(results, baseline)
+
+    report = {
+        "benchmark": "graph_load",
+        "label": args.label,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "git_revision": _git_revision(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "config": {k: v for k, v in vars(args).items() if k not in ("out", "baseline")},
+        "results": results,
+    }
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nresults written to {out_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+BENCHMARK - Supervisor prompt tokens per turn on a scripted 50-turn session.
+Each turn: user message -> supervisor delegation -> multi-KB worker report -> supervisor reply.
+Compares the raw history against HistoryBudget (fake Flash summarizer, so no network).
+
+Usage: python -m benchmarks.bench_history_budget [--turns 50] [--max-tokens 32000] [--keep-last 8]
+"""
+
+import argparse
+import uuid
+
+from langchain_core.messages import AIMessage, HumanMessage
+
+from app.history import HistoryBudget, count_tokens
+from benchmarks.fake_llm import FakeLatencyChatModel
+
+FILE_DUMP = "export default function Page() {\n  return <main className='p-4'>Hello</main>;\n}\n" * 40
+
+
+def _msg(cls, content, **kwargs):
+    return cls(content=content, id=str(uuid.uuid4()), **kwargs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--turns", type=int, default=50)
+    parser.add_argument("--max-tokens", type=int, default=32_000)
+    parser.add_argument("--keep-last", type=int, default=8)
+    args = parser.parse_args()
+
+    summarizer = FakeLatencyChatModel(responses=["Wrote frontend/app/page.tsx; build passes; nothing blocking."])
+    budget = HistoryBudget(summarizer, max_tokens=args.max_tokens, keep_last=args.keep_last)
+    history, summaries = [], {}
+    raw_total = budgeted_total = 0
+
+    print(f"{'turn':>5} | {'raw tokens':>10} | {'budgeted':>9} | {'summaries':>9}")
+    print("-" * 44)
+    for turn in range(1, args.turns + 1):
+        worker = "Frontend" if turn % 2 else "Architect"
+        history.append(_msg(HumanMessage, f"Turn {turn}: next feature please."))
+        history.append(_msg(HumanMessage, f"Context Thread ID: bench. Instruction: implement feature {turn}", name="Supervisor"))
+        history.append(_msg(HumanMessage, f"{worker.upper()} REPORT:\n{FILE_DUMP}", name=worker))
+
+        prompt, new = budget.prepare(history, summaries)
+        summaries.update(new)
+        raw, budgeted = count_tokens(history), count_tokens(prompt)
+        raw_total += raw
+        budgeted_total += budgeted
+        history.append(_msg(AIMessage, f"Feature {turn} is done. Anything else?"))
+        if turn in (1, 5, 10, 20, 30, 40, 50) or turn == args.turns:
+            print(f"{turn:>5} | {raw:>10,} | {budgeted:>9,} | {len(summaries):>9}")
+
+    print("-" * 44)
+    print(f"{'total':>5} | {raw_total:>10,} | {budgeted_total:>9,} | summarizer calls: {summarizer.calls}")
+
+
+if __name__ == "__main__":
+    main()
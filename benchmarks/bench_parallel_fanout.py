@@ -0,0 +1,132 @@
+"""
+BENCHMARK - The parallel fan-out path of the real compiled `app.chain.graph`, fully offline.
+Same stand-ins as bench_graph_load (FakeFirestoreClient behind the real CachedCheckpointSaver /
+CustomFirestoreSaver, FakeGeminiChatModel for both models).
+
+1. Serial vs parallel: wall clock for one turn with two independent worker tasks (plan + pages).
+   serial:   supervisor -> architect -> supervisor -> frontend -> supervisor -> end (3 Pro calls)
+   parallel: supervisor -> Send(architect, frontend) -> join_reports -> supervisor -> end (2 Pro calls)
+   The fast router is off for this part, so the supervisor decides every hop in both modes
+   (with it on, the serial turn would stop at the plan review after the architect).
+2. Load: `--threads` fan-out conversations at once; turns/sec, p50/p99, checkpoint + pending-write docs.
+3. Retry: the frontend task fails once (after the architect task finished), then the thread is
+   re-run from its latest checkpoint. With the finished task's writes persisted (put_writes) only
+   the failed task runs again; with the writes deleted both do. Reports model calls for both.
+
+Usage: python -m benchmarks.bench_parallel_fanout [--runs 5] [--threads 10] [--latency 0.05] [--firestore-latency 0.0]
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Any, Dict
+
+from langchain_core.runnables import RunnableLambda
+
+from app.checkpointer import WRITES
+from benchmarks.bench_graph_load import _setup, run_level
+
+
+def _llm_calls(env: Dict[str, Any]) -> int:
+    return sum(m.calls for m in env["models"].values())
+
+
+def _use(env: Dict[str, Any], scenario: str) -> None:
+    for model in env["models"].values():
+        model.scenario = scenario
+
+
+async def _turn(env: Dict[str, Any], thread_id: str) -> Dict[str, Any]:
+    calls, start = _llm_calls(env), time.perf_counter()
+    result = await env["chain"].graph.ainvoke({"messages": [("human", "Build me a todo app with a calm, minimal vibe.")]}, {"configurable": {"thread_id": thread_id}})
+    text = "\n".join(str(m.content) for m in result["messages"])
+    return {
+        "wall": time.perf_counter() - start, "llm_calls": _llm_calls(env) - calls,
+        "complete": "ARCHITECT REPORT" in text and "FRONTEND REPORT" in text,
+    }
+
+
+def compare(env: Dict[str, Any], runs: int, tag: str) -> Dict[str, Dict[str, Any]]:
+    """Median wall clock of `runs` single turns per mode, each on a fresh thread."""
+    router = env["chain"].pre_router
+    enabled, router.enabled = router.enabled, False
+    rows = {}
+    try:
+        for mode in ("serial", "parallel"):
+            _use(env, mode)
+            results = [asyncio.run(_turn(env, f"{tag}-{mode}-{i}")) for i in range(runs)]
+            rows[mode] = {
+                "wall": statistics.median(r["wall"] for r in results), "llm_calls": results[0]["llm_calls"],
+                "complete": all(r["complete"] for r in results),
+            }
+    finally:
+        router.enabled = enabled
+        _use(env, "parallel")
+    return rows
+
+
+async def _retry(env: Dict[str, Any], thread_id: str, drop_writes: bool, delay: float) -> Dict[str, Any]:
+    chain = env["chain"]
+    config = {"configurable": {"thread_id": thread_id}}
+
+    async def fail(_input, _config=None):
+        await asyncio.sleep(delay)  # let the architect task finish and save its writes first
+        raise RuntimeError("frontend failed")
+
+    frontend = chain.frontend_agent
+    chain.frontend_agent = RunnableLambda(fail)
+    try:
+        await chain.graph.ainvoke({"messages": [("human", "Build me a todo app with a calm, minimal vibe.")]}, config)
+    except RuntimeError:
+        pass
+    finally:
+        chain.frontend_agent = frontend
+    saver = chain.checkpointer.saver
+    head = saver.get_tuple(config)
+    pending = list(saver._thread_ref(thread_id).collection(WRITES).where("checkpoint_id", "==", head.config["configurable"]["checkpoint_id"]).stream())
+    if drop_writes:
+        for snap in pending:
+            snap.reference.delete()
+        chain.checkpointer._drop((thread_id, ""))
+    calls, start = _llm_calls(env), time.perf_counter()
+    result = await chain.graph.ainvoke(None, config)
+    return {
+        "writes": len(pending), "llm_calls": _llm_calls(env) - calls, "wall": time.perf_counter() - start,
+        "complete": "FRONTEND REPORT" in result["messages"][-2].content,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5, help="turns per mode for serial vs parallel")
+    parser.add_argument("--threads", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds per fake model call")
+    parser.add_argument("--output-tokens", type=int, default=120)
+    parser.add_argument("--firestore-latency", type=float, default=0.0)
+    args = parser.parse_args()
+    args.scenario = "parallel"
+
+    env = _setup(args)
+    tag = f"fanout-{int(time.time())}"
+    rows = compare(env, args.runs, tag)
+    print(f"{'mode':>8} | {'wall s (median)':>15} | {'model calls':>11} | both reports")
+    print("-" * 56)
+    for mode, row in rows.items():
+        print(f"{mode:>8} | {row['wall']:>15.3f} | {row['llm_calls']:>11} | {row['complete']}")
+    print(f"speedup: {rows['serial']['wall'] / rows['parallel']['wall']:.2f}x\n")
+
+    r = asyncio.run(run_level(env, args.threads, tag, "parallel"))
+    writes = sum(1 for path in env["client"]._docs if len(path) > 2 and path[2] == WRITES)
+    print(f"load:   {r['turns']} fan-out turns, {r['turns_per_second']:.2f} turns/s, p50 {r['p50_ms']:.0f} ms, "
+          f"p99 {r['p99_ms']:.0f} ms, {r['llm_calls']} model calls, {writes} pending-write docs stored")
+
+    print(f"\n{'retry':>14} | {'writes':>6} | {'model calls':>11} | {'wall s':>6} | both reports")
+    print("-" * 60)
+    for name, drop in (("writes kept", False), ("writes deleted", True)):
+        res = asyncio.run(_retry(env, f"{tag}-retry-{name.split()[1]}", drop, 20 * args.latency + 0.2))
+        print(f"{name:>14} | {res['writes']:>6} | {res['llm_calls']:>11} | {res['wall']:>6.2f} | {res['complete']}")
+
+
+if __name__ == "__main__":
+    main()
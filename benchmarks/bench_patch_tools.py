@@ -0,0 +1,90 @@
+"""
+BENCHMARK - Tool calls and argument size (= model output) for scaffolding and small edits.
+Scaffold: N files via one write_file call each vs one write_files call.
+Edit: change a few lines in each of M large files via write_file (resend every file) vs one
+apply_patch with SEARCH/REPLACE blocks. Both approaches must leave identical trees.
+
+Usage: python -m benchmarks.bench_patch_tools [--files 20] [--lines 300]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from app.tools import apply_patch, write_file, write_files
+
+
+def _files(count: int, lines: int) -> dict:
+    return {
+        f"frontend/components/Widget{i}.tsx": "".join(f"// widget {i} line {n}\n" for n in range(lines))
+        for i in range(count)
+    }
+
+
+def _edit(files: dict) -> dict:
+    return {path: content.replace("line 7\n", "line 7 (edited)\n", 1) for path, content in files.items()}
+
+
+def _snapshot(root: str) -> dict:
+    out = {}
+    for dirpath, _, names in os.walk(root):
+        for name in names:
+            with open(os.path.join(dirpath, name), encoding="utf-8") as f:
+                out[os.path.relpath(os.path.join(dirpath, name), root)] = f.read()
+    return out
+
+
+def run_old(files: dict, edited: dict):
+    calls = chars = 0
+    for group in (files, edited):
+        for path, content in group.items():
+            calls += 1
+            chars += len(path) + len(content)
+            write_file.invoke({"path": path, "content": content})
+    return calls, chars
+
+
+def run_batched(files: dict, edited: dict):
+    batch = [{"path": path, "content": content} for path, content in files.items()]
+    write_files.invoke({"files": batch})
+    chars = sum(len(f["path"]) + len(f["content"]) for f in batch)
+    patch = "".join(
+        f"{path}\n<<<<<<< SEARCH\n{line}=======\n{line.replace('line 7', 'line 7 (edited)')}>>>>>>> REPLACE\n"
+        for path in files
+        for line in [next(l for l in files[path].splitlines(keepends=True) if l.endswith("line 7\n"))]
+    )
+    result = apply_patch.invoke({"patch": patch})
+    if result.startswith("Error"):
+        raise RuntimeError(result)
+    return 2, chars + len(patch)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--files", type=int, default=20)
+    parser.add_argument("--lines", type=int, default=300)
+    args = parser.parse_args()
+
+    files = _files(args.files, args.lines)
+    edited = _edit(files)
+    cwd = os.getcwd()
+    trees = {}
+    print(f"{'toolset':>8} | {'tool calls':>10} | {'arg chars':>10} | {'ms':>7}")
+    print("-" * 46)
+    try:
+        for name, run in (("old", run_old), ("batched", run_batched)):
+            root = tempfile.mkdtemp()
+            os.chdir(root)
+            start = time.perf_counter()
+            calls, chars = run(files, edited)
+            ms = (time.perf_counter() - start) * 1000
+            trees[name] = _snapshot(root)
+            print(f"{name:>8} | {calls:>10} | {chars:>10} | {ms:>7.1f}")
+    finally:
+        os.chdir(cwd)
+    print(f"\nidentical trees: {trees['old'] == trees['batched']}")
+
+
+if __name__ == "__main__":
+    main()
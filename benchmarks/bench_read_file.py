@@ -0,0 +1,66 @@
+"""
+BENCHMARK - read_file memory and latency vs file size.
+"full" is the old behaviour (f.read() then slice to 200k chars); the rest are the mmap-backed modes.
+Peak memory is Python allocations (tracemalloc); mmap'd pages are not Python allocations.
+
+Usage: python -m benchmarks.bench_read_file [--sizes-mb 1 10 100]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+from app.tools import read_file
+
+
+def _old_read(path: str) -> str:
+    with open(path, "r", encoding="utf-8") as f:
+        content = f.read()
+    return content[:200_000] + ("\n...[truncated]" if len(content) > 200_000 else "")
+
+
+def _make(size_mb: int) -> str:
+    path = os.path.join(tempfile.mkdtemp(), f"bundle_{size_mb}mb.js")
+    line = '  "node_modules/some-package": { "version": "1.2.3", "resolved": "https://registry.npmjs.org/x" },\n'
+    with open(path, "w", encoding="utf-8") as f:
+        for _ in range(size_mb * 1024 * 1024 // len(line)):
+            f.write(line)
+    return path
+
+
+def _measure(fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    out = fn()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed * 1000, peak / (1024 * 1024), len(out)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes-mb", type=int, nargs="+", default=[1, 10, 100])
+    args = parser.parse_args()
+
+    print(f"{'size':>6} | {'mode':>12} | {'ms':>8} | {'peak MB':>8} | {'chars out':>9}")
+    print("-" * 56)
+    for size_mb in args.sizes_mb:
+        path = _make(size_mb)
+        modes = {
+            "full (old)": lambda: _old_read(path),
+            "range 400": lambda: read_file.invoke({"path": path}),
+            "range mid": lambda: read_file.invoke({"path": path, "offset": 50_000, "limit": 400}),
+            "tail 100": lambda: read_file.invoke({"path": path, "mode": "tail", "limit": 100}),
+            "grep 20": lambda: read_file.invoke({"path": path, "mode": "grep", "pattern": "version", "limit": 20}),
+        }
+        for name, fn in modes.items():
+            ms, peak, chars = _measure(fn)
+            print(f"{size_mb:>4}MB | {name:>12} | {ms:>8.1f} | {peak:>8.1f} | {chars:>9,}")
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
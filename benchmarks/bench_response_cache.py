@@ -0,0 +1,55 @@
+"""
+BENCHMARK - Response cache hit rate and latency on repeated discovery prompts.
+A fake LLM (fixed latency) sits behind ResponseCache; sessions open with near-identical requests.
+
+Usage: python -m benchmarks.bench_response_cache [--sessions 200] [--latency 0.05] [--similarity 0.8] [--backend memory]
+"""
+
+import argparse
+import random
+import tempfile
+import time
+import uuid
+
+from langchain_core.messages import HumanMessage, SystemMessage
+
+from app.response_cache import InMemoryBackend, ResponseCache, SQLiteBackend
+from benchmarks.fake_llm import FakeLatencyChatModel
+
+PM_PROMPT = "You are the Creative Director. PHASE 1: DISCOVERY - clarify the vision."
+OPENERS = [
+    "Build me a todo app", "build me a  todo app", "Build me a to-do app", "Build me a todo app please",
+    "I want a pacman game", "Make me a pacman game", "Create a landing page for my bakery",
+    "create a landing page for my bakery!", "Build a weather dashboard",
+]
+
+
+def run(sessions: int, latency: float, similarity, backend_name: str):
+    backend = SQLiteBackend(tempfile.mktemp(suffix=".db")) if backend_name == "sqlite" else InMemoryBackend()
+    cache = ResponseCache(backend, similarity=similarity)
+    llm = FakeLatencyChatModel(responses=["Who is this for? What is the vibe? Mobile or Web?"], latency=latency, cache=cache)
+    rng = random.Random(7)
+    start = time.perf_counter()
+    for _ in range(sessions):
+        llm.invoke([SystemMessage(content=PM_PROMPT), HumanMessage(content=rng.choice(OPENERS), id=str(uuid.uuid4()))])
+    return time.perf_counter() - start, llm.calls, cache.stats()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--similarity", type=float, default=0.8)
+    parser.add_argument("--backend", choices=["memory", "sqlite"], default="memory")
+    args = parser.parse_args()
+
+    print(f"{'mode':>16} | {'seconds':>8} | {'LLM calls':>9} | {'exact':>5} | {'similar':>7} | {'hit rate':>8}")
+    print("-" * 70)
+    for mode, similarity in (("exact", None), ("exact+similar", args.similarity)):
+        elapsed, calls, stats = run(args.sessions, args.latency, similarity, args.backend)
+        print(f"{mode:>16} | {elapsed:>8.2f} | {calls:>9} | {stats['exact_hits']:>5} | {stats['similar_hits']:>7} | {stats['hit_rate']:>8.0%}")
+    print(f"{'no cache':>16} | {args.sessions * args.latency:>8.2f} | {args.sessions:>9} | {'-':>5} | {'-':>7} | {'-':>8}")
+
+
+if __name__ == "__main__":
+    main()
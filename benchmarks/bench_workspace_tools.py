@@ -0,0 +1,90 @@
+"""
+BENCHMARK - Tool calls (= ReAct iterations) for a scripted exploration task.
+Task: "Which files use the useTodos hook, and where is it defined?" on a generated Next.js tree.
+The old toolset needs a list_files per directory and a read_file per source file; the indexed
+toolset answers with one tree + one search_code. Both scripted explorers must find the same files.
+
+Usage: python -m benchmarks.bench_workspace_tools [--components 40]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from app.tools import list_files, read_file, search_code, tree
+
+
+def _scaffold(root: str, components: int) -> set:
+    expected = set()
+    files = {
+        "frontend/package.json": '{"name": "todo"}',
+        "frontend/app/layout.tsx": "export default function Layout({ children }) { return children; }",
+        "frontend/app/page.tsx": "import TodoList from '../components/TodoList0';\nexport default function Page() { return <TodoList />; }",
+        "frontend/hooks/useTodos.ts": "export function useTodos() { return { todos: [] }; }",
+    }
+    expected.add(os.path.join("frontend", "hooks", "useTodos.ts"))
+    for i in range(components):
+        uses_hook = i % 5 == 0
+        body = "import { useTodos } from '../hooks/useTodos';\n" if uses_hook else ""
+        body += f"export default function TodoList{i}() {{ return <ul>{i}</ul>; }}\n"
+        path = f"frontend/components/group{i % 4}/TodoList{i}.tsx"
+        files[path] = body
+        if uses_hook:
+            expected.add(os.path.join(*path.split("/")))
+    for path, content in files.items():
+        full = os.path.join(root, path)
+        os.makedirs(os.path.dirname(full), exist_ok=True)
+        with open(full, "w", encoding="utf-8") as f:
+            f.write(content)
+    return expected
+
+
+def explore_old(root: str):
+    calls, found, queue = 0, set(), [root]
+    while queue:
+        directory = queue.pop(0)
+        calls += 1
+        for name in list_files.invoke({"path": directory}).splitlines():
+            full = os.path.join(directory, name)
+            if os.path.isdir(full):
+                queue.append(full)
+            elif full.endswith((".ts", ".tsx")):
+                calls += 1
+                if "useTodos" in read_file.invoke({"path": full}):
+                    found.add(os.path.relpath(full, root))
+    return calls, found
+
+
+def explore_indexed(root: str):
+    calls = 1
+    tree.invoke({"path": root})
+    calls += 1
+    hits = search_code.invoke({"query": "useTodos"})
+    found = {line.split(":", 1)[0] for line in hits.splitlines()}
+    return calls, found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--components", type=int, default=40)
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp()
+    expected = _scaffold(root, args.components)
+    cwd = os.getcwd()
+    os.chdir(root)  # the index (like the agents) works relative to the process cwd
+    try:
+        print(f"{'toolset':>8} | {'tool calls':>10} | {'ms':>7} | found all")
+        print("-" * 44)
+        for name, explore in (("old", explore_old), ("indexed", explore_indexed)):
+            start = time.perf_counter()
+            calls, found = explore(".")
+            ms = (time.perf_counter() - start) * 1000
+            print(f"{name:>8} | {calls:>10} | {ms:>7.1f} | {found == expected}")
+    finally:
+        os.chdir(cwd)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,257 @@
+"""
+In-memory stand-in for the subset of `google.cloud.firestore.Client` the backend uses.
+No network, no credentials. Tracks bytes written so benchmarks can report write cost.
+`latency` adds a sleep per simulated round trip (a document get/set/delete, or a batch commit).
+SERVER_TIMESTAMP fields are stored as the current UTC time, like the real server does.
+"""
+
+import copy
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+try:
+    from google.cloud.firestore import SERVER_TIMESTAMP
+except ImportError:
+    SERVER_TIMESTAMP = object()
+
+
+def _payload_size(value: Any) -> int:
+    """Rough Firestore-style size of a field value (bytes/str by length, containers recursively)."""
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, str):
+        return len(value.encode("utf-8")) + 1
+    if isinstance(value, dict):
+        return sum(len(str(k)) + 1 + _payload_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return sum(_payload_size(v) for v in value)
+    return 8
+
+
+class FakeSnapshot:
+    def __init__(self, reference: "FakeDocumentReference", data: Optional[Dict[str, Any]]):
+        self.reference = reference
+        self.id = reference.id
+        self._data = data
+
+    @property
+    def exists(self) -> bool:
+        return self._data is not None
+
+    def to_dict(self) -> Optional[Dict[str, Any]]:
+        return copy.copy(self._data) if self._data is not None else None
+
+    def get(self, field: str) -> Any:
+        return (self._data or {}).get(field)
+
+
+class FakeDocumentReference:
+    def __init__(self, client: "FakeFirestoreClient", path: Tuple[str, ...]):
+        self._client = client
+        self._path = path
+        self.id = path[-1]
+
+    @property
+    def path(self) -> str:
+        return "/".join(self._path)
+
+    def collection(self, name: str) -> "FakeCollectionReference":
+        return FakeCollectionReference(self._client, self._path + (name,))
+
+    def get(self, field_paths: Optional[List[str]] = None) -> FakeSnapshot:
+        self._client._round_trip()
+        self._client.reads += 1
+        data = self._client._docs.get(self._path)
+        if data is not None and field_paths is not None:
+            data = {k: v for k, v in data.items() if k in field_paths}
+        return FakeSnapshot(self, data)
+
+    def set(self, data: Dict[str, Any], merge: bool = False) -> None:
+        self._client._round_trip()
+        self._client._write(self._path, data, merge)
+
+    def update(self, data: Dict[str, Any]) -> None:
+        self._client._round_trip()
+        if self._path not in self._client._docs:
+            raise KeyError(f"No document to update: {self.path}")
+        self._client._write(self._path, data, True)
+
+    def delete(self) -> None:
+        self._client._round_trip()
+        self._client._delete(self._path)
+
+
+class FakeQuery:
+    def __init__(self, client: "FakeFirestoreClient", path: Tuple[str, ...], filters=(), orders=(), limit: Optional[int] = None, cursor=None, group: bool = False, fields=None):
+        self._client = client
+        self._fields = fields
+        self._path = path
+        self._group = group
+        self._filters = list(filters)
+        self._orders = list(orders)
+        self._limit = limit
+        self._cursor = cursor
+
+    def _copy(self, **kwargs) -> "FakeQuery":
+        params = dict(filters=self._filters, orders=self._orders, limit=self._limit, cursor=self._cursor, group=self._group, fields=self._fields)
+        params.update(kwargs)
+        return FakeQuery(self._client, self._path, **params)
+
+    def where(self, field: str, op: str, value: Any) -> "FakeQuery":
+        return self._copy(filters=self._filters + [(field, op, value)])
+
+    def order_by(self, field: str, direction: str = "ASCENDING") -> "FakeQuery":
+        return self._copy(orders=self._orders + [(field, direction)])
+
+    def limit(self, count: int) -> "FakeQuery":
+        return self._copy(limit=count)
+
+    def start_after(self, snapshot_or_values: Any) -> "FakeQuery":
+        return self._copy(cursor=snapshot_or_values)
+
+    def select(self, field_paths: List[str]) -> "FakeQuery":
+        return self._copy(fields=list(field_paths))
+
+    def _matches(self, data: Dict[str, Any]) -> bool:
+        ops = {
+            "==": lambda a, b: a == b, "!=": lambda a, b: a != b,
+            "<": lambda a, b: a is not None and a < b, "<=": lambda a, b: a is not None and a <= b,
+            ">": lambda a, b: a is not None and a > b, ">=": lambda a, b: a is not None and a >= b,
+            "in": lambda a, b: a in b,
+        }
+        return all(ops[op](data.get(field), value) for field, op, value in self._filters)
+
+    def _in_scope(self, path: Tuple[str, ...]) -> bool:
+        if self._group:
+            return len(path) % 2 == 0 and path[-2] == self._path[-1]
+        return len(path) == len(self._path) + 1 and path[:-1] == self._path
+
+    def stream(self) -> Iterable[FakeSnapshot]:
+        self._client._round_trip()
+        rows = [
+            (path, data) for path, data in list(self._client._docs.items())
+            if self._in_scope(path) and self._matches(data)
+            and all(field in data for field, _ in self._orders)  # like Firestore: order_by skips docs without the field
+        ]
+        for field, direction in reversed(self._orders):
+            rows.sort(key=lambda row: row[1].get(field), reverse=(direction == "DESCENDING"))
+        if self._cursor is not None:
+            cursor = self._cursor.to_dict() if isinstance(self._cursor, FakeSnapshot) else self._cursor
+            keys = [(field, direction) for field, direction in self._orders]
+
+            def after(data: Dict[str, Any]) -> bool:
+                for field, direction in keys:
+                    a, b = data.get(field), cursor.get(field)
+                    if a == b:
+                        continue
+                    return a < b if direction == "DESCENDING" else a > b
+                return False
+            rows = [row for row in rows if after(row[1])]
+        if self._limit is not None:
+            rows = rows[: self._limit]
+        self._client.reads += max(1, len(rows))
+        if self._fields is not None:
+            rows = [(path, {k: v for k, v in data.items() if k in self._fields}) for path, data in rows]
+        return iter([FakeSnapshot(FakeDocumentReference(self._client, path), data) for path, data in rows])
+
+    def get(self) -> List[FakeSnapshot]:
+        return list(self.stream())
+
+
+class FakeCollectionReference(FakeQuery):
+    def __init__(self, client: "FakeFirestoreClient", path: Tuple[str, ...]):
+        super().__init__(client, path)
+        self.id = path[-1]
+
+    def document(self, doc_id: str) -> FakeDocumentReference:
+        return FakeDocumentReference(self._client, self._path + (doc_id,))
+
+
+class FakeWriteBatch:
+    def __init__(self, client: "FakeFirestoreClient"):
+        self._client = client
+        self._ops: List[Tuple[str, FakeDocumentReference, Optional[Dict[str, Any]], bool]] = []
+
+    def set(self, reference: FakeDocumentReference, data: Dict[str, Any], merge: bool = False) -> None:
+        self._ops.append(("set", reference, data, merge))
+
+    def update(self, reference: FakeDocumentReference, data: Dict[str, Any]) -> None:
+        self._ops.append(("set", reference, data, True))
+
+    def delete(self, reference: FakeDocumentReference) -> None:
+        self._ops.append(("delete", reference, None, False))
+
+    def __len__(self) -> int:
+        return len(self._ops)
+
+    def commit(self) -> None:
+        if len(self._ops) > 500:
+            raise ValueError("A batch can contain at most 500 operations.")
+        self._client._round_trip()
+        with self._client._lock:
+            self._client.commits += 1
+        for op, reference, data, merge in self._ops:
+            if op == "delete":
+                self._client._delete(reference._path)
+            else:
+                self._client._write(reference._path, data, merge)
+        self._ops = []
+
+
+class FakeFirestoreClient:
+    """Drop-in for `firestore.Client` in benchmarks: collections, subcollections, collection groups, queries, get_all, batches."""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self._docs: Dict[Tuple[str, ...], Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self.reads = 0
+        self.writes = 0
+        self.deletes = 0
+        self.commits = 0
+        self.bytes_written = 0
+
+    def collection(self, name: str) -> FakeCollectionReference:
+        return FakeCollectionReference(self, (name,))
+
+    def collection_group(self, name: str) -> FakeQuery:
+        return FakeQuery(self, (name,), group=True)
+
+    def document(self, *path: str) -> FakeDocumentReference:
+        return FakeDocumentReference(self, tuple("/".join(path).split("/")))
+
+    def get_all(self, references: Iterable[FakeDocumentReference]) -> Iterable[FakeSnapshot]:
+        self._round_trip()
+        snapshots = []
+        for ref in references:
+            self.reads += 1
+            snapshots.append(FakeSnapshot(ref, self._docs.get(ref._path)))
+        return snapshots
+
+    def batch(self) -> FakeWriteBatch:
+        return FakeWriteBatch(self)
+
+    def _round_trip(self) -> None:
+        if self.latency:
+            time.sleep(self.latency)
+
+    def _write(self, path: Tuple[str, ...], data: Dict[str, Any], merge: bool) -> None:
+        with self._lock:
+            current = dict(self._docs.get(path, {})) if merge else {}
+            current.update({k: datetime.now(timezone.utc) if v is SERVER_TIMESTAMP else v for k, v in data.items()})
+            self._docs[path] = current
+            self.writes += 1
+            self.bytes_written += _payload_size(data)
+
+    def _delete(self, path: Tuple[str, ...]) -> None:
+        with self._lock:
+            if self._docs.pop(path, None) is not None:
+                self.deletes += 1
+
+    def stored_bytes(self, collection: Optional[str] = None) -> int:
+        return sum(_payload_size(d) for p, d in self._docs.items() if collection is None or p[0] == collection)
+
+    def document_count(self, collection: Optional[str] = None) -> int:
+        return sum(1 for p in self._docs if collection is None or p[0] == collection)
@@ -0,0 +1,158 @@
+"""
+Scriptable fake chat models for benchmarks. No network, no credentials.
+Sleeps `latency` seconds per call (time.sleep on the sync path, asyncio.sleep on the async path)
+so blocking vs non-blocking call sites show up in throughput numbers.
+
+`FakeGeminiChatModel` stands in for GeminiToolAdapter / ChatVertexAI inside the real graph (see
+`app.clients.set_chat_model_factory`): it supports bind_tools / with_structured_output and plays a
+fixed build scenario (supervisor routes to the architect; the architect writes the plan and
+updates the board; the frontend writes files), with `output_tokens` words per text reply.
+`scenario="parallel"` makes the supervisor answer a new request with `delegate_parallel` to both
+workers instead (the Send fan-out path); `scenario="serial"` hands the same two tasks off one after
+the other (architect, then frontend after the ARCHITECT REPORT). It also streams (`_stream` / `_astream`): text replies one
+word per chunk, tool calls as one chunk, so astream_events sees on_chat_model_stream like with Gemini.
+"""
+
+import asyncio
+import re
+import time
+import json
+import uuid
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Sequence
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage, HumanMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from pydantic import PrivateAttr
+
+
+class FakeLatencyChatModel(BaseChatModel):
+    responses: List[str] = ["OK."]
+    latency: float = 0.0
+    # Private, so it isn't part of the model params (and of LLM cache keys).
+    _calls: int = PrivateAttr(default=0)
+
+    @property
+    def calls(self) -> int:
+        return self._calls
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-latency-chat"
+
+    def _next(self) -> ChatResult:
+        text = self.responses[self._calls % len(self.responses)]
+        self._calls += 1
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=text))])
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager: Optional[Any] = None, **kwargs: Any) -> ChatResult:
+        time.sleep(self.latency)
+        return self._next()
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager: Optional[Any] = None, **kwargs: Any) -> ChatResult:
+        await asyncio.sleep(self.latency)
+        return self._next()
+
+
+_THREAD_ID = re.compile(r"Context Thread ID: (\S+?)\.")
+
+
+def _call(name: str, args: Dict[str, Any]) -> Dict[str, Any]:
+    return {"name": name, "args": args, "id": f"call_{uuid.uuid4().hex[:12]}", "type": "tool_call"}
+
+
+class FakeGeminiChatModel(FakeLatencyChatModel):
+    model_name: str = "fake-gemini"
+    output_tokens: int = 120
+    scenario: str = "build"
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-gemini"
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        return {"model_name": self.model_name, "output_tokens": self.output_tokens, "scenario": self.scenario}
+
+    def bind_tools(self, tools: Sequence[Any], *, tool_choice: Optional[Any] = None, **kwargs: Any):
+        return self.bind(tools=[convert_to_openai_tool(t) for t in tools], **kwargs)
+
+    def _text(self, lead: str) -> str:
+        return lead + " " + " ".join(f"word{i}" for i in range(max(0, self.output_tokens - len(lead.split()))))
+
+    def _script(self, messages: List[BaseMessage], tools: List[Dict[str, Any]]) -> AIMessage:
+        names = {t["function"]["name"] for t in tools}
+        last = messages[-1] if messages else HumanMessage(content="")
+        if "RoutingDecision" in names:
+            if self.scenario == "serial" and isinstance(last, HumanMessage) and last.name == "Architect":
+                request = next((m for m in messages if isinstance(m, HumanMessage) and not m.name), last)
+                decision = {"reasoning": "Plan done; pages next.", "action": "delegate_to_frontend", "response_content": f"Scaffold the pages for: {request.content}"}
+            elif isinstance(last, HumanMessage) and last.name in ("Architect", "Frontend", "Workers"):
+                decision = {"reasoning": "Worker finished.", "action": "respond_to_user", "response_content": self._text("Here is what the team did.")}
+            elif self.scenario == "parallel":
+                decision = {"reasoning": "Independent tasks.", "action": "delegate_parallel", "response_content": "Running both.", "delegations": [
+                    {"worker": "technical_architect", "instruction": f"Write the Master Plan for: {last.content}"},
+                    {"worker": "head_of_frontend", "instruction": f"Scaffold the pages for: {last.content}"},
+                ]}
+            else:
+                decision = {"reasoning": "Vision is clear.", "action": "delegate_to_architect", "response_content": f"Create the Master Plan for: {last.content}"}
+            return AIMessage(content="", tool_calls=[_call("RoutingDecision", decision)])
+        if names and not isinstance(last, ToolMessage):
+            first = next((m for m in messages if isinstance(m, HumanMessage)), last)
+            match = _THREAD_ID.search(str(first.content))
+            thread_id = match.group(1) if match else "unknown"
+            if "update_board" in names:
+                return AIMessage(content="", tool_calls=[
+                    _call("write_file", {"path": f"{thread_id}/master_plan.md", "content": self._text("# Master Plan")}),
+                    _call("update_board", {"thread_id": thread_id, "phase": "Blueprint", "tasks": ["Scaffold app", "Build pages"], "status": "Plan ready"}),
+                ])
+            if "write_files" in names:
+                return AIMessage(content="", tool_calls=[_call("write_files", {"files": [
+                    {"path": f"{thread_id}/frontend/app/page.tsx", "content": self._text("export default function Page() {}")},
+                    {"path": f"{thread_id}/frontend/hooks/useTodos.ts", "content": self._text("export function useTodos() {}")},
+                ]})])
+        return AIMessage(content=self._text("Done."))
+
+    def _reply(self, messages: List[BaseMessage], **kwargs: Any) -> ChatResult:
+        self._calls += 1
+        message = self._script(messages, kwargs.get("tools") or [])
+        prompt_tokens = sum(len(str(m.content)) for m in messages) // 4 + 1
+        completion_tokens = len(str(message.content).split()) + 20 * len(message.tool_calls)
+        message.usage_metadata = {"input_tokens": prompt_tokens, "output_tokens": completion_tokens, "total_tokens": prompt_tokens + completion_tokens}
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager: Optional[Any] = None, **kwargs: Any) -> ChatResult:
+        time.sleep(self.latency)
+        return self._reply(messages, **kwargs)
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager: Optional[Any] = None, **kwargs: Any) -> ChatResult:
+        await asyncio.sleep(self.latency)
+        return self._reply(messages, **kwargs)
+
+    def _chunks(self, messages: List[BaseMessage], **kwargs: Any) -> List[ChatGenerationChunk]:
+        message = self._reply(messages, **kwargs).generations[0].message
+        if message.tool_calls:
+            tool_call_chunks = [
+                {"name": c["name"], "args": json.dumps(c["args"]), "id": c["id"], "index": i} for i, c in enumerate(message.tool_calls)
+            ]
+            chunks = [AIMessageChunk(content="", tool_call_chunks=tool_call_chunks)]
+        else:
+            words = str(message.content).split(" ")
+            chunks = [AIMessageChunk(content=word if i == 0 else f" {word}") for i, word in enumerate(words)]
+        chunks[-1].usage_metadata = message.usage_metadata
+        return [ChatGenerationChunk(message=chunk) for chunk in chunks]
+
+    def _stream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager: Optional[Any] = None, **kwargs: Any) -> Iterator[ChatGenerationChunk]:
+        time.sleep(self.latency)
+        for chunk in self._chunks(messages, **kwargs):
+            if run_manager is not None:
+                run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+
+    async def _astream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager: Optional[Any] = None, **kwargs: Any) -> AsyncIterator[ChatGenerationChunk]:
+        await asyncio.sleep(self.latency)
+        for chunk in self._chunks(messages, **kwargs):
+            if run_manager is not None:
+                await run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
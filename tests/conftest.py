@@ -0,0 +1,44 @@
+import os
+
+import pytest
+
+from benchmarks.fake_firestore import FakeFirestoreClient
+from benchmarks.fake_llm import FakeGeminiChatModel
+
+
+@pytest.fixture(scope="session")
+def offline_chain(tmp_path_factory):
+    """The real `app.chain` on the in-memory stand-ins (installed before app.chain is first imported).
+    Returns {"chain", "client", "models"}; workers write their files under a temp cwd."""
+    from app.clients import set_chat_model_factory, set_db
+
+    workdir = tmp_path_factory.mktemp("workspace")
+    os.environ.setdefault("AGENT_CONFIG_WATCH", "0")
+    os.environ.setdefault("AGENT_CONFIG_SNAPSHOT", str(workdir / "agent_configs.snapshot.json"))
+    client = FakeFirestoreClient()
+    set_db(client)
+    models = {}
+
+    def factory(cls, **kwargs):
+        model = FakeGeminiChatModel(model_name=kwargs["model_name"], latency=0.0, output_tokens=12, callbacks=kwargs.get("callbacks"))
+        models[kwargs["model_name"]] = model
+        return model
+
+    set_chat_model_factory(factory)
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        from app import chain
+        yield {"chain": chain, "client": client, "models": models}
+    finally:
+        os.chdir(cwd)
+
+
+@pytest.fixture
+def scenario(offline_chain):
+    """Switches the fake models' scenario for one test."""
+    def use(name: str) -> None:
+        for model in offline_chain["models"].values():
+            model.scenario = name
+    yield use
+    use("build")
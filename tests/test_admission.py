@@ -0,0 +1,32 @@
+import asyncio
+
+import pytest
+from google.api_core import exceptions
+
+from app.admission import ModelGate, is_retryable
+
+
+@pytest.mark.parametrize("error", [
+    exceptions.ResourceExhausted("quota"), exceptions.ServiceUnavailable("down"),
+    exceptions.Aborted("contention"), exceptions.DeadlineExceeded("slow"),
+])
+def test_transient_vertex_errors_are_retryable(error):
+    assert is_retryable(error)
+
+
+@pytest.mark.parametrize("error", [exceptions.InvalidArgument("bad"), exceptions.PermissionDenied("no"), ValueError("x")])
+def test_other_errors_are_not(error):
+    assert not is_retryable(error)
+
+
+def test_gate_retries_aborted_and_deadline_exceeded():
+    gate = ModelGate("test", max_retries=3, base_delay=0.0, max_delay=0.0)
+    failures = [exceptions.Aborted("a"), exceptions.DeadlineExceeded("d")]
+
+    async def flaky():
+        if failures:
+            raise failures.pop(0)
+        return "ok"
+
+    assert asyncio.run(gate.acall(flaky)) == "ok"
+    assert not failures
@@ -0,0 +1,21 @@
+import os
+
+import app
+from app.agent_configs import SNAPSHOT_PATH, AgentConfigRegistry
+from benchmarks.fake_firestore import FakeFirestoreClient
+
+
+def test_default_snapshot_is_outside_the_package():
+    if not os.environ.get("AGENT_CONFIG_SNAPSHOT"):
+        assert not os.path.abspath(SNAPSHOT_PATH).startswith(os.path.dirname(os.path.abspath(app.__file__)))
+
+
+def test_snapshot_is_written_to_a_new_cache_dir_and_used_next_start(tmp_path):
+    client = FakeFirestoreClient()
+    client.collection("agent_configs").document("technical_architect").set({"system_prompt": "Plan it."})
+    path = str(tmp_path / "cache" / "vibe-coder" / "agent_configs.snapshot.json")
+    assert AgentConfigRegistry(client, ["technical_architect"], snapshot_path=path).load().source == "firestore"
+    reads = client.reads
+    registry = AgentConfigRegistry(client, ["technical_architect"], snapshot_path=path).load()
+    assert registry.source == "snapshot" and client.reads == reads
+    assert registry.get("technical_architect")["system_prompt"] == "Plan it."
@@ -0,0 +1,47 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+from app.checkpoint_codec import CheckpointCodec, JsonCodec, split, zstandard
+
+COMPRESSIONS = ["none", "zlib"] + (["zstd"] if zstandard is not None else [])
+
+
+def _checkpoint(i: int):
+    messages = [HumanMessage(content=f"turn {i} " + "x" * (i * 97 % 5000)), AIMessage(content=f"reply {i}")]
+    return {"v": 1, "id": f"cp-{i}", "channel_values": {"messages": messages, "next": "supervisor"}}
+
+
+@pytest.mark.parametrize("compression", COMPRESSIONS)
+def test_round_trip(compression):
+    codec = CheckpointCodec(JsonPlusSerializer(), compression)
+    decoded = codec.decode(codec.encode(_checkpoint(3)))
+    assert decoded["channel_values"]["messages"][0].content == _checkpoint(3)["channel_values"]["messages"][0].content
+
+
+@pytest.mark.parametrize("compression", COMPRESSIONS)
+def test_concurrent_encode(compression):
+    """The saver encodes from many threads at once (aput -> asyncio.to_thread)."""
+    codec = CheckpointCodec(JsonPlusSerializer(), compression)
+
+    def encode_decode(i: int) -> bool:
+        checkpoint = _checkpoint(i)
+        decoded = codec.decode(codec.encode(checkpoint))
+        return decoded["channel_values"]["messages"][0].content == checkpoint["channel_values"]["messages"][0].content
+
+    with ThreadPoolExecutor(max_workers=32) as pool:
+        assert all(pool.map(encode_decode, range(2000)))
+
+
+def test_blobs_decode_across_codec_settings():
+    serde = JsonPlusSerializer()
+    blob = CheckpointCodec(serde, "zlib").encode(_checkpoint(1))
+    assert CheckpointCodec(serde, "none").decode(blob)["id"] == "cp-1"
+    assert JsonCodec(serde).decode(JsonCodec(serde).encode({"a": 1})) == {"a": 1}
+
+
+def test_split():
+    assert b"".join(split(b"abcdefg", 3)) == b"abcdefg"
+    assert split(b"", 3) == [b""]
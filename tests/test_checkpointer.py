@@ -0,0 +1,80 @@
+import os
+
+from langchain_core.messages import AIMessage, HumanMessage
+
+from app.checkpointer import PAYLOAD_FIELDS, CachedCheckpointSaver, CustomFirestoreSaver
+from benchmarks.fake_firestore import FakeFirestoreClient
+
+COLLECTION = "custom_checkpoints"
+
+
+def _checkpoint(step: int, messages):
+    return {
+        "v": 1, "id": f"1ef{step:08d}", "ts": f"2025-01-01T00:00:{step:08d}",
+        "channel_values": {"messages": list(messages), "next": "supervisor"},
+        "channel_versions": {"messages": step, "next": step}, "versions_seen": {}, "pending_sends": [],
+    }
+
+
+def _write_steps(saver, steps: int, thread_id: str = "t"):
+    config = {"configurable": {"thread_id": thread_id, "checkpoint_ns": ""}}
+    messages = []
+    for step in range(1, steps + 1):
+        messages.append(HumanMessage(content=f"turn {step}") if step % 2 else AIMessage(content=f"reply {step}"))
+        config = saver.put(config, _checkpoint(step, messages), {"step": step}, {"messages": step})
+    return config, messages
+
+
+def test_head_is_a_pointer_and_latest_loads_through_it():
+    client = FakeFirestoreClient()
+    saver = CustomFirestoreSaver(client, COLLECTION, base_interval=5)
+    config, messages = _write_steps(saver, 12)
+    head = client.document(COLLECTION, "t", "heads", "_root").get().to_dict()
+    assert head["checkpoint_id"] == config["configurable"]["checkpoint_id"]
+    assert not any(field in head or f"{field}_chunks" in head for field in PAYLOAD_FIELDS)
+    assert head["kind"] == "delta" and head["chain"]
+
+    reads_before = client.reads
+    loaded = CustomFirestoreSaver(client, COLLECTION).get_tuple({"configurable": {"thread_id": "t"}})
+    assert [m.content for m in loaded.checkpoint["channel_values"]["messages"]] == [m.content for m in messages]
+    # head point read + one get_all of the checkpoint and its chain; no writes marker, so no writes query
+    assert client.reads - reads_before == 1 + 1 + len(head["chain"])
+    assert loaded.pending_writes == []
+
+
+def test_full_copy_heads_from_before_pointers_still_load():
+    client = FakeFirestoreClient()
+    saver = CustomFirestoreSaver(client, COLLECTION, delta_mode=False)
+    config, messages = _write_steps(saver, 3)
+    full = client.document(COLLECTION, "t", "checkpoints", config["configurable"]["checkpoint_id"]).get().to_dict()
+    client.document(COLLECTION, "t", "heads", "_root").set(full)
+    loaded = saver.get_tuple({"configurable": {"thread_id": "t"}})
+    assert len(loaded.checkpoint["channel_values"]["messages"]) == len(messages)
+
+
+def test_cache_revalidates_against_the_head_pointer():
+    client = FakeFirestoreClient()
+    cached = CachedCheckpointSaver(CustomFirestoreSaver(client, COLLECTION), trust_seconds=0)
+    config, _ = _write_steps(cached, 3)
+    assert cached.get_tuple({"configurable": {"thread_id": "t"}}).config["configurable"]["checkpoint_id"] == config["configurable"]["checkpoint_id"]
+    assert cached.stats()["stale"] == 0
+
+
+def test_pending_writes_round_trip_and_reach_the_cache_in_either_order():
+    client = FakeFirestoreClient()
+    cached = CachedCheckpointSaver(CustomFirestoreSaver(client, COLLECTION))
+    config, _ = _write_steps(cached, 2)
+    cached.put_writes(config, [("reports", {"worker": "a"}), ("messages", os.urandom(400_000).hex())], "task-a")
+    assert [w[:2] for w in CustomFirestoreSaver(client, COLLECTION).get_tuple(config).pending_writes] == [("task-a", "reports"), ("task-a", "messages")]
+    assert len(cached.get_tuple({"configurable": {"thread_id": "t"}}).pending_writes) == 2
+
+    # LangGraph runs put and put_writes as separate background tasks: writes may land first.
+    next_config = {"configurable": {**config["configurable"], "checkpoint_id": "1ef00000003"}}
+    cached.put_writes(next_config, [("reports", {"worker": "b"})], "task-b")
+    fresh = CustomFirestoreSaver(client, COLLECTION)
+    assert [c.config["configurable"]["checkpoint_id"] for c in fresh.list({"configurable": {"thread_id": "t"}})] == ["1ef00000002", "1ef00000001"]
+    assert fresh.get_tuple(next_config) is None
+    cached.put(config, _checkpoint(3, []), {"step": 3}, {"messages": 3})
+    assert cached.get_tuple({"configurable": {"thread_id": "t"}}).pending_writes == [("task-b", "reports", {"worker": "b"})]
+    # put merges around the marker, so a cold load still finds the writes.
+    assert fresh.get_tuple({"configurable": {"thread_id": "t"}}).pending_writes == [("task-b", "reports", {"worker": "b"})]
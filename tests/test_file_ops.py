@@ -0,0 +1,49 @@
+import pytest
+
+from app.file_ops import PatchError, commit, parse_unified_diff, plan_patch
+
+
+def test_removed_sql_comment_does_not_end_the_hunk(tmp_path):
+    path = tmp_path / "schema.sql"
+    path.write_text("create table a (id int);\n-- old comment\nselect 1;\n")
+    patch = f"""--- a/{path}
++++ b/{path}
+@@ -1,3 +1,3 @@
+ create table a (id int);
+--- old comment
++-- new comment
+ select 1;
+"""
+    assert plan_patch(patch)[str(path)] == "create table a (id int);\n-- new comment\nselect 1;\n"
+
+
+def test_bare_blank_line_is_blank_context(tmp_path):
+    path = tmp_path / "app.py"
+    path.write_text("import os\n\n\ndef main():\n    pass\n")
+    # The blank context lines lost their leading space, as editors and models often do.
+    patch = f"--- a/{path}\n+++ b/{path}\n@@ -1,5 +1,5 @@\n import os\n\n\n def main():\n-    pass\n+    return 0\n"
+    assert plan_patch(patch)[str(path)] == "import os\n\n\ndef main():\n    return 0\n"
+
+
+def test_hunk_counts_must_match():
+    short = "--- a/x.py\n+++ b/x.py\n@@ -1,3 +1,3 @@\n a\n-b\n+c\n"
+    with pytest.raises(PatchError, match="ends early"):
+        parse_unified_diff(short)
+    long = "--- a/x.py\n+++ b/x.py\n@@ -1,1 +1,1 @@\n a\n-b\n+c\n"
+    with pytest.raises(PatchError, match="more lines"):
+        parse_unified_diff(long)
+
+
+def test_two_files_with_no_newline_markers():
+    patch = "--- a/x\n+++ b/x\n@@ -1 +1 @@\n-a\n\\ No newline at end of file\n+b\n\\ No newline at end of file\n--- /dev/null\n+++ b/y\n@@ -0,0 +1 @@\n+y\n"
+    assert parse_unified_diff(patch) == [("x", "x", [(1, ["-a\n", "+b\n"])]), (None, "y", [(0, ["+y\n"])])]
+
+
+def test_failed_commit_leaves_no_temp_or_backup_files(tmp_path):
+    (tmp_path / "a.txt").write_text("old\n")
+    (tmp_path / "dir").mkdir()
+    # Copying a directory as a backup fails after its backup file was created.
+    with pytest.raises(OSError):
+        commit({str(tmp_path / "a.txt"): "new\n", str(tmp_path / "dir"): "x"})
+    assert (tmp_path / "a.txt").read_text() == "old\n"
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["a.txt", "dir"]
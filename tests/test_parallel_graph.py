@@ -0,0 +1,44 @@
+import asyncio
+
+from app.checkpointer import WRITES
+
+
+def _fanout(graph, config):
+    return next(s for s in graph.get_state_history(config) if "worker_task" in s.next)
+
+
+def test_parallel_delegation_runs_on_the_real_graph(offline_chain, scenario):
+    scenario("parallel")
+    graph = offline_chain["chain"].graph
+    for thread_id, run in (("par-async", lambda i, c: asyncio.run(graph.ainvoke(i, c))), ("par-sync", graph.invoke)):
+        config = {"configurable": {"thread_id": thread_id}}
+        result = run({"messages": [("human", "Build me a todo app")]}, config)
+        reports = next(m for m in result["messages"] if m.name == "Workers").content
+        assert "ARCHITECT REPORT" in reports and "FRONTEND REPORT" in reports
+        assert result["messages"][-1].content.startswith("Here is what the team did.")
+
+
+def test_fanout_writes_are_persisted_and_returned(offline_chain, scenario):
+    scenario("parallel")
+    chain = offline_chain["chain"]
+    config = {"configurable": {"thread_id": "par-writes"}}
+    asyncio.run(chain.graph.ainvoke({"messages": [("human", "Build me a todo app")]}, config))
+    fanout = _fanout(chain.graph, config)
+    checkpoint_id = fanout.config["configurable"]["checkpoint_id"]
+
+    docs = list(chain.checkpointer.saver._thread_ref("par-writes").collection(WRITES).where("checkpoint_id", "==", checkpoint_id).stream())
+    # LangGraph skips saving the superstep's last task (the next checkpoint covers it), so 1-2 tasks.
+    assert docs and all(doc.get("checkpoint_id") == checkpoint_id for doc in docs)
+    # A fresh saver (no cache) reads them back with the checkpoint.
+    saved = type(chain.checkpointer.saver)(offline_chain["client"], chain.checkpointer.saver.collection).get_tuple(fanout.config)
+    assert len(saved.pending_writes) == len(docs)
+    assert {value[0]["worker"] for _, channel, value in saved.pending_writes if channel == "reports"} <= {"technical_architect", "head_of_frontend"}
+    assert chain.checkpointer.get_tuple(fanout.config).pending_writes == saved.pending_writes
+
+
+def test_worker_sub_graphs_write_no_checkpoints(offline_chain, scenario):
+    scenario("parallel")
+    chain, client = offline_chain["chain"], offline_chain["client"]
+    asyncio.run(chain.graph.ainvoke({"messages": [("human", "Build me a todo app")]}, {"configurable": {"thread_id": "par-ns"}}))
+    namespaces = {doc.get("checkpoint_ns") for path, doc in client._docs.items() if path[:2] == (chain.checkpointer.saver.collection, "par-ns")}
+    assert namespaces == {""}
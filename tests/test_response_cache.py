@@ -0,0 +1,26 @@
+from langchain_core.load import dumps
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.outputs import ChatGeneration
+
+from app.response_cache import ResponseCache, normalize_prompt
+
+
+def _prompt(*messages):
+    return dumps(list(messages))
+
+
+def test_ids_and_metadata_do_not_change_the_key():
+    a = _prompt(HumanMessage(content="Build me an app", id="run-1"), AIMessage(content="ok", id="x", response_metadata={"t": 1}))
+    b = _prompt(HumanMessage(content="Build me an app", id="run-2"), AIMessage(content="ok", id="y", response_metadata={"t": 2}))
+    assert normalize_prompt(a) == normalize_prompt(b)
+
+
+def test_content_whitespace_is_significant():
+    python = _prompt(HumanMessage(content="def f():\n    return 1\n"))
+    flattened = _prompt(HumanMessage(content="def f(): return 1"))
+    assert normalize_prompt(python) != normalize_prompt(flattened)
+
+    cache = ResponseCache()
+    cache.update(python, "model", [ChatGeneration(message=AIMessage(content="indented"))])
+    assert cache.lookup(flattened, "model") is None
+    assert cache.lookup(python, "model")[0].message.content == "indented"
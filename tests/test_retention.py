@@ -0,0 +1,22 @@
+import os
+from datetime import datetime, timezone
+
+from app.checkpointer import WRITES, CustomFirestoreSaver
+from app.retention import Compactor, RetentionPolicy
+from benchmarks.fake_firestore import FakeFirestoreClient
+from tests.test_checkpointer import COLLECTION, _write_steps
+
+
+def test_pending_writes_go_with_their_checkpoint():
+    client = FakeFirestoreClient()
+    saver = CustomFirestoreSaver(client, COLLECTION, base_interval=5)
+    head, _ = _write_steps(saver, 30)
+    old = {"configurable": {**head["configurable"], "checkpoint_id": "1ef00000002"}}
+    saver.put_writes(old, [("reports", os.urandom(400_000).hex())], "task-old")
+    saver.put_writes(head, [("reports", "kept")], "task-head")
+
+    report = Compactor(saver, RetentionPolicy(keep_last=5, daily_days=0)).run(now=datetime.now(timezone.utc))
+    assert report["writes_deleted"] == 1 and report["chunks_deleted"] >= 1
+    remaining = [snap.get("checkpoint_id") for snap in saver._thread_ref("t").collection(WRITES).stream()]
+    assert remaining == [head["configurable"]["checkpoint_id"]]
+    assert saver.get_tuple(head).pending_writes == [("task-head", "reports", "kept")]
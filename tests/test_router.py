@@ -0,0 +1,89 @@
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+
+from app.router import PreRouter, approval, frontend_done, plan_review
+
+PLAN_QUESTION = AIMessage(content="Here is the Master Plan from our architect:\n\n...\n\nDoes this plan look good to you?")
+
+
+def _report(prefix: str, body: str = "did the work", name: str = "Worker") -> HumanMessage:
+    return HumanMessage(content=f"{prefix}:\n{body}", name=name)
+
+
+def test_frontend_done_presents_the_raw_report():
+    decision = frontend_done([HumanMessage(content="Go ahead."), _report("FRONTEND REPORT", "pages built", "Frontend")])
+    assert decision.action == "respond_to_user"
+    assert decision.response_content.endswith("Here is their report:\n\npages built")
+
+
+def test_plan_review_presents_the_plan_and_asks_for_approval():
+    decision = plan_review([HumanMessage(content="Build me a todo app"), _report("ARCHITECT REPORT", "# Master Plan", "Architect")])
+    assert decision.action == "respond_to_user"
+    assert "# Master Plan" in decision.response_content
+    assert decision.response_content.endswith("Does this plan look good to you?")
+
+
+@pytest.mark.parametrize("rule", [frontend_done, plan_review])
+def test_report_rules_only_fire_on_the_last_message(rule):
+    assert rule([]) is None
+    assert rule([HumanMessage(content="Build me a todo app")]) is None
+    assert rule([_report("FRONTEND REPORT"), _report("ARCHITECT REPORT"), AIMessage(content="Done.")]) is None
+    assert rule([_report("PARALLEL REPORTS")]) is None
+
+
+@pytest.mark.parametrize("text", ["Go ahead.", "yes, approved!", "LGTM", "ship it", "Yes, that is it"])
+def test_approval_of_a_plan_goes_to_the_frontend(text):
+    messages = [HumanMessage(content="Build me a todo app"), _report("ARCHITECT REPORT", name="Architect"), PLAN_QUESTION, HumanMessage(content=text)]
+    decision = approval(messages)
+    assert decision.action == "delegate_to_frontend"
+    assert PLAN_QUESTION.content in decision.response_content
+
+
+def test_approval_before_any_plan_goes_to_the_architect():
+    messages = [HumanMessage(content="Build me a todo app"), AIMessage(content="A calm, minimal todo app. Is that it?"), HumanMessage(content="Go ahead")]
+    assert approval(messages).action == "delegate_to_architect"
+
+
+@pytest.mark.parametrize("text", ["yes, but change the colours", "go ahead and make it blue", "no", "looks good?"])
+def test_anything_but_a_short_approval_goes_to_the_llm(text):
+    messages = [HumanMessage(content="Build me a todo app"), _report("ARCHITECT REPORT", name="Architect"), PLAN_QUESTION, HumanMessage(content=text)]
+    assert approval(messages) is None
+
+
+@pytest.mark.parametrize("prefix", ["FRONTEND REPORT", "PARALLEL REPORTS"])
+def test_approval_after_finished_work_goes_to_the_llm(prefix):
+    messages = [_report("ARCHITECT REPORT", name="Architect"), PLAN_QUESTION, HumanMessage(content="Go ahead."),
+                _report(prefix), AIMessage(content="All done. Anything else?"), HumanMessage(content="Go ahead.")]
+    assert approval(messages) is None
+
+
+def test_approval_needs_a_user_message_after_an_assistant_turn():
+    assert approval([HumanMessage(content="Go ahead.")]) is None
+    assert approval([HumanMessage(content="Build me a todo app"), HumanMessage(content="Go ahead.")]) is None
+    # A worker's or the supervisor's named message is not the user approving anything.
+    assert approval([PLAN_QUESTION, HumanMessage(content="Go ahead.", name="Supervisor")]) is None
+
+
+def test_pre_router_first_rule_wins_and_counts_hits():
+    router = PreRouter()
+    rule, decision = router.route([HumanMessage(content="Build me a todo app"), _report("ARCHITECT REPORT", name="Architect")])
+    assert rule == "plan_review" and decision.action == "respond_to_user"
+    assert router.route([HumanMessage(content="yes, but change the colours")]) is None
+    assert router.route([]) is None
+    assert PreRouter(enabled=False).route([_report("FRONTEND REPORT")]) is None
+
+
+def test_stats_fast_fraction_and_estimated_seconds_saved():
+    router = PreRouter()
+    assert router.stats() == {"hops": 0, "fast_hits": {}, "llm_calls": 0, "fast_fraction": 0.0, "avg_llm_seconds": 0.0, "estimated_seconds_saved": 0.0}
+    router.route([_report("FRONTEND REPORT")])
+    router.route([_report("FRONTEND REPORT")])
+    router.route([_report("ARCHITECT REPORT")])
+    router.record_llm(2.0)
+    router.record_llm(4.0)
+    stats = router.stats()
+    assert stats["hops"] == 5 and stats["llm_calls"] == 2
+    assert stats["fast_hits"] == {"frontend_done": 2, "plan_review": 1}
+    assert stats["fast_fraction"] == pytest.approx(3 / 5)
+    assert stats["avg_llm_seconds"] == pytest.approx(3.0)
+    assert stats["estimated_seconds_saved"] == pytest.approx(9.0)
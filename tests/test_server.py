@@ -0,0 +1,40 @@
+import pytest
+from fastapi.testclient import TestClient
+
+
+@pytest.fixture
+def http(offline_chain):
+    from app.server import app
+    with TestClient(app) as client:
+        yield client
+
+
+def _invoke(http, thread_id: str, text: str):
+    return http.post("/agent/invoke", json={
+        "input": {"messages": [{"type": "human", "content": text}]},
+        "config": {"configurable": {"thread_id": thread_id}},
+    })
+
+
+def test_health_answers_without_warm_up(http):
+    assert http.get("/health").json() == {"status": "IT WORKS"}
+
+
+def test_invoke_before_any_parallel_delegation(http, scenario):
+    # The frontend's only endpoint: `delegations` is never set on this thread and must still validate.
+    scenario("build")
+    response = _invoke(http, "http-build", "Build me a todo app")
+    assert response.status_code == 200, response.text
+    output = response.json()["output"]
+    assert output["delegations"] is None
+    assert output["messages"][-1]["content"]
+
+
+def test_invoke_after_parallel_delegation_clears_the_tasks(http, scenario):
+    scenario("parallel")
+    response = _invoke(http, "http-parallel", "Build me a todo app")
+    assert response.status_code == 200, response.text
+    output = response.json()["output"]
+    assert output["delegations"] is None and output["reports"] == []
+    assert any(m.get("name") == "Workers" for m in output["messages"])
+    assert output["messages"][-1]["content"].startswith("Here is what the team did.")
@@ -0,0 +1,83 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.fanout import WorkerLimiter
+from app.slots import Slots
+
+
+def test_threads_and_coroutines_share_the_limit():
+    slots, active, peak, lock = Slots(2), [0], [0], threading.Lock()
+
+    def enter():
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+
+    def leave():
+        with lock:
+            active[0] -= 1
+
+    def sync_worker():
+        slots.acquire()
+        enter()
+        time.sleep(0.02)
+        leave()
+        slots.release()
+
+    async def async_worker():
+        await slots.aacquire()
+        enter()
+        await asyncio.sleep(0.02)
+        leave()
+        slots.release()
+
+    async def main():
+        threads = [threading.Thread(target=sync_worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        await asyncio.gather(*(async_worker() for _ in range(6)))
+        await asyncio.to_thread(lambda: [thread.join() for thread in threads])
+
+    asyncio.run(main())
+    assert peak[0] == 2 and active[0] == 0
+
+
+def test_cancelled_waiter_does_not_keep_a_slot():
+    async def main():
+        slots = Slots(1)
+        await slots.aacquire()
+        waiter = asyncio.create_task(slots.aacquire())
+        await asyncio.sleep(0)
+        slots.release()  # handed to the waiter...
+        waiter.cancel()  # ...which is cancelled before it runs
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        await asyncio.wait_for(slots.aacquire(), 1)
+        assert slots.waiting == 0
+
+    asyncio.run(main())
+
+
+def test_release_wakes_the_next_waiter_directly():
+    async def main():
+        limiter = WorkerLimiter(1)
+        entered = asyncio.Event()
+
+        async def second():
+            async with limiter.aslot("technical_architect"):
+                entered.set()
+
+        async with limiter.aslot("technical_architect"):
+            task = asyncio.create_task(second())
+            await asyncio.sleep(0)
+            assert limiter._semaphore("technical_architect").waiting == 1
+        # No poll interval: the waiter runs on the next loop iterations.
+        for _ in range(3):
+            await asyncio.sleep(0)
+        assert entered.is_set()
+        await task
+
+    asyncio.run(main())
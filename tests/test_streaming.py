@@ -0,0 +1,27 @@
+import asyncio
+
+from app.streaming import TokenStreamingGraph
+
+
+def _stream(graph, thread_id: str, text: str):
+    async def collect():
+        return [chunk async for chunk in TokenStreamingGraph(graph).astream({"messages": [("human", text)]}, {"configurable": {"thread_id": thread_id}})]
+    return asyncio.run(collect())
+
+
+def test_worker_tokens_are_streamed_with_their_node_tag(offline_chain):
+    chunks = _stream(offline_chain["chain"].graph, "stream-build", "Build me a todo app")
+    tokens = {}
+    for chunk in chunks:
+        if "token" in chunk:
+            tokens[chunk["node"]] = tokens.get(chunk["node"], "") + chunk["token"]
+    assert tokens.get("technical_architect", "").startswith("Done.")
+    assert any(c.get("node") == "technical_architect" and c.get("tool") == "update_board" for c in chunks)
+    assert "messages" in chunks[-1]
+
+
+def test_parallel_worker_tokens_keep_their_worker_tag(offline_chain, scenario):
+    scenario("parallel")
+    chunks = _stream(offline_chain["chain"].graph, "stream-parallel", "Build me a todo app")
+    streamed = {c["node"] for c in chunks if "token" in c}
+    assert {"technical_architect", "head_of_frontend"} <= streamed
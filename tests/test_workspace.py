@@ -0,0 +1,40 @@
+import pytest
+
+from app.workspace import WorkspaceIndex, _regex_literals
+
+
+@pytest.mark.parametrize("pattern, literals", [
+    (r"\bfunction", ["function"]),
+    (r"\sfoo", ["foo"]),
+    (r"(abc)?function", ["function"]),
+    (r"abcd?", ["abc"]),
+    (r"ab{0,3}cdef", ["cdef"]),
+    (r"x[abc]yzw", ["yzw"]),
+    (r"\.json", [".json"]),
+    (r"foo|barbaz", []),
+    (r"import (foo|bar) from", ["import ", " from"]),
+])
+def test_regex_literals_are_required_by_every_match(pattern, literals):
+    assert _regex_literals(pattern) == literals
+
+
+@pytest.mark.parametrize("pattern", [r"\bfunction", r"\sfoo", r"(abc)?function", r"(xyz)*const\s"])
+def test_regex_search_finds_what_a_full_scan_finds(tmp_path, pattern):
+    (tmp_path / "a.js").write_text("export function foo() {}\nconst x = 1;\n")
+    (tmp_path / "b.js").write_text("let y = 2;\n")
+    index = WorkspaceIndex(str(tmp_path))
+    assert [rel for rel, _, _ in index.search(pattern, regex=True)] == ["a.js"]
+
+
+def test_scripted_exploration_needs_two_tool_calls_with_the_index(tmp_path, monkeypatch):
+    # "Which files use the useTodos hook, and where is it defined?" (benchmarks/bench_workspace_tools.py)
+    from benchmarks.bench_workspace_tools import _scaffold, explore_indexed, explore_old
+
+    expected = _scaffold(str(tmp_path), 20)
+    monkeypatch.chdir(tmp_path)
+    old_calls, old_found = explore_old(".")
+    calls, found = explore_indexed(".")
+    assert old_found == found == expected
+    # 9 directories listed + 23 .ts/.tsx files read, against one tree + one search_code.
+    assert old_calls == 9 + 23
+    assert calls == 2
@@ -25,6 +25,7 @@ PHASE 2: PLAN REVIEW (CRITICAL)
 
 PHASE 3: EXECUTION
 - ONLY after the user says "Approved" or "Go ahead" to the PLAN, delegate to `head_of_frontend`.
+- If the approved plan has independent tasks (e.g. frontend scaffolding while the architect updates docs), use `delegate_parallel` with one delegation per task.
 - When the Frontend finishes, present the results."""
 }
 